@@ -0,0 +1,591 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import personal_boss as pb
+
+
+def _legacy_conn(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+def _legacy_list_actions(path, project_id):
+    conn = _legacy_conn(path)
+    rows = conn.execute("""
+        SELECT a.*, p.name as project_name
+        FROM actions a
+        JOIN projects p ON p.id = a.project_id
+        WHERE a.project_id=?
+        ORDER BY a.is_complete ASC, a.created_at ASC
+    """, (project_id,)).fetchall()
+    conn.close()
+    return rows
+
+def _legacy_get_action_tags(path, action_id):
+    conn = _legacy_conn(path)
+    rows = conn.execute("""
+        SELECT t.* FROM tags t
+        JOIN action_tags at ON at.tag_id = t.id
+        WHERE at.action_id = ?
+        ORDER BY t.name COLLATE NOCASE
+    """, (action_id,)).fetchall()
+    conn.close()
+    return rows
+
+def _legacy_toggle_action_status(path, action_id):
+    conn = _legacy_conn(path)
+    row = conn.execute("SELECT is_complete FROM actions WHERE id=?", (action_id,)).fetchone()
+    conn.execute("UPDATE actions SET is_complete=? WHERE id=?", (0 if row[0] else 1, action_id))
+    conn.commit()
+    conn.close()
+
+
+def seed(n_actions, n_tags=9, name="bench"):
+    project_id = pb.create_project(name)
+    tag_ids = [t["id"] for t in pb.list_all_tags()][:n_tags]
+    for i in range(n_actions):
+        pb.create_action(project_id, f"acción {i}", tag_ids[i % len(tag_ids):][:2])
+    return project_id
+
+
+def timeit(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1e6
+
+
+def bench_connection_layer(path, project_id, repeat):
+    action_ids = [a["id"] for a in pb.list_actions(project_id)]
+    aid = action_ids[0]
+    cases = [
+        ("list_actions",
+         lambda: _legacy_list_actions(path, project_id),
+         lambda: pb.list_actions(project_id)),
+        ("get_action_tags",
+         lambda: _legacy_get_action_tags(path, aid),
+         lambda: pb.get_action_tags(aid)),
+        ("toggle_action_status",
+         lambda: _legacy_toggle_action_status(path, aid),
+         lambda: pb.toggle_action_status(aid)),
+        ("abrir proyecto (N+1)",
+         lambda: [_legacy_get_action_tags(path, a) for a in action_ids],
+         lambda: [pb.get_action_tags(a) for a in action_ids]),
+    ]
+    print(f"{'operación':<24}{'antes (µs)':>14}{'después (µs)':>14}{'x':>8}")
+    for name, before, after in cases:
+        t_before = timeit(before, repeat)
+        t_after = timeit(after, repeat)
+        print(f"{name:<24}{t_before:>14.1f}{t_after:>14.1f}{t_before / t_after:>8.1f}")
+
+
+def bench_project_selection(sizes, repeat):
+    print()
+    print(f"{'acciones':<12}{'N+1 (ms)':>12}{'batch (ms)':>12}{'x':>8}")
+    for n in sizes:
+        project_id = seed(n, name=f"selección {n}")
+
+        def n_plus_one():
+            for a in pb.list_actions(project_id):
+                [t["name"] for t in pb.get_action_tags(a["id"])]
+
+        t_before = timeit(n_plus_one, repeat) / 1000
+        t_after = timeit(lambda: pb.list_actions_with_tags(project_id), repeat) / 1000
+        print(f"{n:<12}{t_before:>12.2f}{t_after:>12.2f}{t_before / t_after:>8.1f}")
+
+
+def bench_first_page(sizes, repeat):
+    print()
+    print(f"{'acciones':<12}{'todo (ms)':>12}{'1ª página (ms)':>16}{'x':>8}")
+    for n in sizes:
+        project_id = seed(n, name=f"paginado {n}")
+        t_all = timeit(lambda: pb.list_actions_with_tags(project_id), repeat) / 1000
+        t_page = timeit(lambda: pb.list_actions_page(project_id), repeat) / 1000
+        print(f"{n:<12}{t_all:>12.2f}{t_page:>16.2f}{t_all / t_page:>8.1f}")
+
+
+def bench_write_burst(tmp, n_writes):
+    print()
+    print(f"{'perfil':<12}{'escrituras/s':>14}{'µs/escritura':>14}")
+    for profile in pb.DURABILITY_PROFILES:
+        pb.configure_db(os.path.join(tmp, f"burst_{profile}.db"), durability=profile)
+        pb.init_db()
+        project_id = seed(1, name="ráfaga")
+        aid = pb.list_actions(project_id)[0]["id"]
+        t0 = time.perf_counter()
+        for i in range(n_writes):
+            if i % 2:
+                pb.create_tag(f"ráfaga {i}")
+            else:
+                pb.toggle_action_status(aid)
+        elapsed = time.perf_counter() - t0
+        print(f"{profile:<12}{n_writes / elapsed:>14.0f}{elapsed / n_writes * 1e6:>14.1f}")
+        pb.close_pool()
+
+
+SEARCH_WORDS = (
+    "llamar comprar revisar enviar pagar preparar limpiar ordenar escribir leer "
+    "factura cliente informe reunión correo presupuesto auto casa jardín banco "
+    "médico turno proveedor contrato impuestos cocina garage oficina viaje regalo"
+).split()
+
+def bench_search(tmp, n_actions, repeat):
+    rng = random.Random(42)
+    pb.configure_db(os.path.join(tmp, "search.db"))
+    pb.init_db()
+    project_id = pb.create_project("búsqueda")
+    now = "2024-01-01T00:00:00"
+    with pb.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO actions(project_id, description, is_complete, position, created_at) VALUES (?, ?, 0, ?, ?)",
+            ((project_id, " ".join(rng.choices(SEARCH_WORDS, k=5)) + f" #{i}", i, now) for i in range(n_actions)),
+        )
+    print()
+    print(f"{'búsqueda (' + str(n_actions) + ' acciones)':<36}{'ms':>10}{'filas':>8}")
+    for text in ("factura", "fact", "pagar banco", "rev cli inf", "#12345"):
+        rows = pb.search_actions(text)
+        t = timeit(lambda: pb.search_actions(text), repeat) / 1000
+        print(f"{text:<36}{t:>10.2f}{len(rows):>8}")
+    pb.close_pool()
+
+
+def _sql_next_action(tag_ids, after=None):
+    query, params = pb.next_action_query(tag_ids)
+    if after is not None:
+        query = query.replace("ORDER BY", "AND (a.created_at, a.id) > (?, ?) ORDER BY")
+        params = params + [after["created_at"], after["id"]]
+    query = query.replace("ORDER BY a.created_at ASC", "ORDER BY a.created_at ASC, a.id ASC")
+    with pb.connection() as conn:
+        return conn.execute(query, params).fetchone()
+
+def bench_next_action(tmp, n_actions, repeat):
+    rng = random.Random(7)
+    pb.configure_db(os.path.join(tmp, "next.db"))
+    pb.init_db()
+    tag_ids = [t["id"] for t in pb.list_all_tags()]
+    project_id = pb.create_project("siguiente")
+    for i in range(n_actions):
+        pb.create_action(project_id, f"acción {i}", rng.sample(tag_ids, rng.randint(0, 3)))
+    combos = [[], tag_ids[:1], tag_ids[1:3], tag_ids[2:5]]
+
+    def same(a, b):
+        return (a and a["id"]) == (b and b["id"])
+
+    mismatches = 0
+    for step in range(200):
+        aid = rng.randint(1, n_actions)
+        if step % 3 == 0:
+            pb.toggle_action_status(aid)
+        elif step % 3 == 1:
+            pb.update_action(aid, f"editada {step}", rng.sample(tag_ids, 2))
+        else:
+            pb.create_action(project_id, f"nueva {step}", rng.sample(tag_ids, 2))
+        for combo in combos:
+            first = pb.find_next_action_by_tags(combo)
+            mismatches += not same(first, _sql_next_action(combo))
+            if first:
+                mismatches += not same(pb.find_next_action_by_tags(combo, after=first),
+                                       _sql_next_action(combo, after=first))
+    print()
+    print(f"{'siguiente acción (' + str(n_actions) + ')':<36}{'SQL (µs)':>12}{'índice (µs)':>12}")
+    for combo in combos:
+        t_sql = timeit(lambda: _sql_next_action(combo), repeat)
+        t_idx = timeit(lambda: pb.find_next_action_by_tags(combo), repeat)
+        print(f"{str(combo):<36}{t_sql:>12.1f}{t_idx:>12.1f}")
+    print(f"diferencias con SQL tras 200 mutaciones: {mismatches}")
+    pb.close_pool()
+
+
+def _sql_filter_ids(tag_filter):
+    clauses, params = [], []
+    for tid in tag_filter.all_of:
+        clauses.append("AND id IN (SELECT action_id FROM action_tags WHERE tag_id = ?)")
+        params.append(tid)
+    if tag_filter.any_of:
+        clauses.append(f"AND id IN (SELECT action_id FROM action_tags WHERE tag_id IN ({','.join('?' * len(tag_filter.any_of))}))")
+        params += list(tag_filter.any_of)
+    if tag_filter.none_of:
+        clauses.append(f"AND id NOT IN (SELECT action_id FROM action_tags WHERE tag_id IN ({','.join('?' * len(tag_filter.none_of))}))")
+        params += list(tag_filter.none_of)
+    with pb.connection() as conn:
+        return [r[0] for r in conn.execute(
+            f"SELECT id FROM actions WHERE is_complete = 0 {' '.join(clauses)} ORDER BY created_at, id", params)]
+
+def bench_tag_filters(tmp, n_actions, repeat):
+    rng = random.Random(9)
+    pb.configure_db(os.path.join(tmp, "bitmaps.db"))
+    pb.init_db()
+    tag_ids = [t["id"] for t in pb.list_all_tags()]
+    project_id = pb.create_project("bitmaps")
+    now = "2024-01-01T00:00:00"
+    with pb.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO actions(project_id, description, is_complete, position, created_at) VALUES (?, ?, ?, ?, ?)",
+            ((project_id, f"acción {i}", int(rng.random() < 0.3), i, f"{now}.{i:07d}") for i in range(n_actions)),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO action_tags(action_id, tag_id) VALUES (?, ?)",
+            ((rng.randint(1, n_actions), rng.choice(tag_ids)) for _ in range(n_actions * 2)),
+        )
+    filters = [
+        pb.TagFilter(any_of=tag_ids[:2]),
+        pb.TagFilter(all_of=tag_ids[:1], none_of=tag_ids[1:3]),
+        pb.TagFilter(any_of=tag_ids[2:6], none_of=tag_ids[:1]),
+        pb.TagFilter(none_of=tag_ids[:4]),
+    ]
+    t_build = timeit(pb.tag_bitmaps.rebuild, 1) / 1000
+    pb.tag_bitmaps.save_snapshot()
+    pb.tag_bitmaps.invalidate()
+    t_snapshot = timeit(lambda: pb.tag_bitmaps.load_snapshot() or pb.tag_bitmaps.rebuild(), 1) / 1000
+
+    mismatches = sum(pb.tag_bitmaps.ids(pb.tag_bitmaps.query(f)) != _sql_filter_ids(f) for f in filters)
+    for step in range(100):
+        aid = rng.randint(1, n_actions)
+        if step % 2:
+            pb.toggle_action_status(aid)
+        else:
+            pb.update_action(aid, f"editada {step}", rng.sample(tag_ids, 2))
+    pb.create_action(project_id, "nueva", tag_ids[:2])
+    mismatches += sum(pb.tag_bitmaps.ids(pb.tag_bitmaps.query(f)) != _sql_filter_ids(f) for f in filters)
+
+    print()
+    print(f"bitmaps ({n_actions} acciones): reconstrucción {t_build:.1f} ms, snapshot {t_snapshot:.1f} ms")
+    print(f"{'filtro':<44}{'SQL (µs)':>12}{'bitmap (µs)':>12}{'filas':>8}")
+    for f in filters:
+        t_sql = timeit(lambda: _sql_filter_ids(f)[:100], repeat)
+        t_bits = timeit(lambda: pb.tag_bitmaps.ids(pb.tag_bitmaps.query(f), limit=100), repeat)
+        label = f"Y{list(f.all_of)} O{list(f.any_of)} NO{list(f.none_of)}"
+        print(f"{label:<44}{t_sql:>12.1f}{t_bits:>12.1f}{len(pb.tag_bitmaps.query(f)):>8}")
+    print(f"diferencias con SQL: {mismatches}")
+    pb.close_pool()
+
+
+def bench_import(tmp, n_actions, batch_sizes):
+    # One create_action per row (what ActionEditor.save does) against the
+    # streaming importer; the per-row loop is timed on a sample only.
+    def records(n):
+        tags = [t["name"] for t in pb.list_all_tags()]
+        for i in range(n):
+            yield {"project": f"importado {i % 50}", "description": f"acción importada {i}",
+                   "tags": tags[i % len(tags):][:2], "is_complete": i % 4 == 0}
+
+    print()
+    print(f"{'importación/exportación (' + str(n_actions) + ')':<36}{'filas/s':>12}{'s':>10}")
+    pb.configure_db(os.path.join(tmp, "import_loop.db"))
+    pb.init_db()
+    sample = min(n_actions, 2000)
+    project_id = pb.create_project("bucle")
+    tag_ids = [t["id"] for t in pb.list_all_tags()]
+    t0 = time.perf_counter()
+    for i in range(sample):
+        pb.create_action(project_id, f"acción {i}", tag_ids[i % len(tag_ids):][:2])
+    rate = sample / (time.perf_counter() - t0)
+    print(f"{'create_action por fila':<36}{rate:>12.0f}{n_actions / rate:>10.1f}")
+    pb.close_pool()
+    for batch_size in batch_sizes:
+        pb.configure_db(os.path.join(tmp, f"import_{batch_size}.db"))
+        pb.init_db()
+        stats = pb.import_records(records(n_actions), batch_size=batch_size)
+        print(f"{'import_records lote ' + str(batch_size):<36}{pb.import_rate(stats):>12.0f}{stats.seconds:>10.1f}")
+    for name in ("export.ndjson", "export.ndjson.gz", "export.csv.gz"):
+        stats = pb.export_file(os.path.join(tmp, name))
+        print(f"{'export_file ' + name:<36}{stats.records / stats.seconds:>12.0f}{stats.seconds:>10.1f}")
+    pb.close_pool()
+
+
+def bench_archive(tmp, n_actions, batch_sizes, repeat):
+    # Archives the completed actions older than ARCHIVE_AFTER_DAYS from a
+    # synthetic year of work, then lists the biggest project before, after
+    # and including the archive.
+    print()
+    print(f"{'archivo (' + str(n_actions) + ')':<36}{'filas/s':>12}{'s':>10}")
+    for batch_size in batch_sizes:
+        generate_db(os.path.join(tmp, f"archive_{batch_size}.db"), max(5, n_actions // 200), n_actions, 30)
+        before = timeit(lambda: pb.list_actions_with_tags(1), repeat) / 1000
+        stats = pb.archive_completed_actions(batch_size=batch_size, pause=0)
+        print(f"{'archive_completed_actions lote ' + str(batch_size):<36}"
+              f"{pb.archive_rate(stats):>12.0f}{stats.seconds:>10.1f}")
+    after = timeit(lambda: pb.list_actions_with_tags(1), repeat) / 1000
+    archived = timeit(lambda: pb.list_actions_with_tags(1, include_archived=True), repeat) / 1000
+    print(f"{'list_actions_with_tags (ms)':<36}{'antes':>12}{'después':>10}{'+archivo':>10}")
+    print(f"{'proyecto 0':<36}{before:>12.2f}{after:>10.2f}{archived:>10.2f}")
+    pb.close_pool()
+
+
+CLI_COMMANDS = [
+    ["project", "list"],
+    ["tag", "list"],
+    ["action", "list", "bench"],
+    ["next", "-t", "casa"],
+    ["next", "--any", "casa", "--exclude", "noche"],
+    ["matching", "-t", "casa", "--limit", "50"],
+    ["action", "add", "bench", "desde la CLI", "-t", "casa"],
+]
+
+def bench_cli(path, repeat):
+    # Whole process (interpreter start, imports, schema check) against the
+    # time the command itself reports with --time.
+    print()
+    print(f"{'comando CLI':<44}{'proceso (ms)':>14}{'comando (ms)':>14}")
+    pb.close_pool()
+    for argv in CLI_COMMANDS:
+        walls, inner = [], []
+        for _ in range(max(3, repeat // 4)):
+            t0 = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, pb.__file__, "--db", path, "--format", "json", "--time", *argv],
+                capture_output=True, text=True, check=True,
+            )
+            walls.append((time.perf_counter() - t0) * 1000)
+            inner.append(json.loads(proc.stderr.strip().splitlines()[-1])["ms"])
+        print(f"{' '.join(argv):<44}{statistics.median(walls):>14.1f}{statistics.median(inner):>14.2f}")
+
+
+# ---------------------------- Synthetic data and suite ---------------------------- #
+
+DEFAULT_TAGS_PER_ACTION = (0.2, 0.4, 0.3, 0.1)  # P(0 tags), P(1 tag), ...
+
+def synthetic_records(n_projects, n_actions, tag_names, tags_per_action=DEFAULT_TAGS_PER_ACTION,
+                      completed_ratio=0.3, seed=1):
+    # Project sizes and tag popularity follow a Zipf-like skew, and actions
+    # are spread over the last year in creation order, as a real list would be.
+    rng = random.Random(seed)
+    project_weights = [1 / (r + 1) ** 0.8 for r in range(n_projects)]
+    tag_weights = [1 / (r + 1) for r in range(len(tag_names))]
+    counts = list(range(len(tags_per_action)))
+    start = datetime.datetime.now() - datetime.timedelta(days=365)
+    step = datetime.timedelta(days=365) / max(n_actions, 1)
+    for p in range(n_projects):
+        yield {"project": f"proyecto {p}"}
+    projects = rng.choices(range(n_projects), project_weights, k=n_actions)
+    for i, p in enumerate(projects):
+        k = min(rng.choices(counts, tags_per_action)[0], len(tag_names))
+        tags = set()
+        while len(tags) < k:
+            tags.add(rng.choices(tag_names, tag_weights)[0])
+        created_at = (start + step * i).isoformat()
+        yield {
+            "project": f"proyecto {p}",
+            "description": f"{' '.join(rng.sample(SEARCH_WORDS, 3))} {i}",
+            "tags": sorted(tags),
+            "is_complete": rng.random() < completed_ratio,
+            "created_at": created_at,
+            "completed_at": created_at,
+        }
+
+def generate_db(path, n_projects, n_actions, n_tags, tags_per_action=DEFAULT_TAGS_PER_ACTION,
+                completed_ratio=0.3, seed=1):
+    pb.configure_db(path)
+    pb.init_db()
+    tag_names = [t["name"] for t in pb.list_all_tags()][:n_tags]
+    tag_names += [f"etiqueta {i}" for i in range(len(tag_names), n_tags)]
+    stats = pb.import_records(synthetic_records(n_projects, n_actions, tag_names, tags_per_action,
+                                                completed_ratio, seed))
+    with pb.connection() as conn:
+        conn.execute("ANALYZE")
+    return stats
+
+def _samples(fn, args_list):
+    out = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        out.append((time.perf_counter() - t0) * 1e6)
+    return out
+
+def _summary(name, scale, samples):
+    samples = sorted(samples)
+    return {
+        "scale": scale,
+        "name": name,
+        "runs": len(samples),
+        "median_us": round(statistics.median(samples), 1),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+    }
+
+def run_suite(tmp, scales, repeat, n_tags=30, tags_per_action=DEFAULT_TAGS_PER_ACTION):
+    # Times every public DB helper on generated databases of each size.
+    # Reads run first; writes last since they change the data.
+    results = []
+    for n_actions in scales:
+        n_projects = max(5, n_actions // 200)
+        generate_db(os.path.join(tmp, f"suite_{n_actions}.db"), n_projects, n_actions, n_tags, tags_per_action)
+        rng = random.Random(n_actions)
+        project_ids = [p["id"] for p in pb.list_projects()]
+        tag_ids = [t["id"] for t in pb.list_all_tags()]
+        with pb.connection() as conn:
+            action_ids = [r[0] for r in conn.execute("SELECT id FROM actions")]
+        pick_projects = [(rng.choice(project_ids),) for _ in range(repeat)]
+        pick_actions = [(rng.choice(action_ids),) for _ in range(repeat)]
+        pick_tags = [(rng.sample(tag_ids[:8], rng.randint(1, 2)),) for _ in range(repeat)]
+        cases = [
+            ("list_projects", pb.list_projects, [()] * repeat),
+            ("list_all_tags", pb.list_all_tags, [()] * repeat),
+            ("list_actions", pb.list_actions, pick_projects),
+            ("list_actions_with_tags", pb.list_actions_with_tags, pick_projects),
+            ("list_actions_page", pb.list_actions_page, pick_projects),
+            ("get_action", pb.get_action, pick_actions),
+            ("get_action_tags", pb.get_action_tags, pick_actions),
+            ("find_next_action_by_tags", pb.find_next_action_by_tags, pick_tags),
+            ("find_actions_by_tags", pb.find_actions_by_tags, pick_tags),
+            ("find_actions_by_tags (página)", lambda ids: pb.find_actions_by_tags(ids, limit=pb.ACTIONS_PAGE_SIZE),
+             pick_tags),
+            ("find_actions_by_filter (página)",
+             lambda ids: pb.find_actions_by_filter(pb.TagFilter(any_of=ids), limit=pb.ACTIONS_PAGE_SIZE), pick_tags),
+            ("search_actions", pb.search_actions, [(rng.choice(SEARCH_WORDS),) for _ in range(repeat)]),
+        ]
+        # The in-memory indexes are built by their first query; time that apart.
+        cold = [
+            ("next_actions (carga)", pb.next_actions.invalidate, lambda: pb.next_actions.next_id([])),
+            ("tag_bitmaps (carga)", pb.tag_bitmaps.invalidate, pb.tag_bitmaps.warm),
+        ]
+        for name, reset, load in cold:
+            reset()
+            results.append(_summary(name, n_actions, _samples(load, [()])))
+        for name, fn, args_list in cases:
+            results.append(_summary(name, n_actions, _samples(fn, args_list)))
+
+        new_ids = []
+        writes = [
+            ("create_action", lambda pid: new_ids.append(pb.create_action(pid, "nueva", tag_ids[:2])["id"]),
+             pick_projects),
+            ("update_action", lambda aid: pb.update_action(aid, "editada", tag_ids[1:3]), pick_actions),
+            ("toggle_action_status", pb.toggle_action_status, pick_actions),
+            ("create_tag", pb.create_tag, [(f"suite {i}",) for i in range(repeat)]),
+        ]
+        for name, fn, args_list in writes:
+            results.append(_summary(name, n_actions, _samples(fn, args_list)))
+        results.append(_summary("delete_action", n_actions, _samples(pb.delete_action, [(i,) for i in new_ids])))
+        pb.close_pool()
+    return results
+
+def suite_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(pb.__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+def compare_results(old, new, threshold=0.25, floor_us=20.0):
+    # Prints new/old median per case; a case regresses when it is both
+    # `threshold` slower and at least `floor_us` slower (to ignore noise).
+    before = {(r["scale"], r["name"]): r for r in old["results"]}
+    regressions = 0
+    print(f"{'escala':>8}  {'caso':<36}{'antes (µs)':>12}{'ahora (µs)':>12}{'x':>8}")
+    for r in new["results"]:
+        o = before.get((r["scale"], r["name"]))
+        if o is None:
+            continue
+        ratio = r["median_us"] / o["median_us"] if o["median_us"] else float("inf")
+        slower = ratio > 1 + threshold and r["median_us"] - o["median_us"] > floor_us
+        regressions += slower
+        mark = "  REGRESIÓN" if slower else ""
+        print(f"{r['scale']:>8}  {r['name']:<36}{o['median_us']:>12.1f}{r['median_us']:>12.1f}{ratio:>8.2f}{mark}")
+    return regressions
+
+
+def check_query_plans():
+    failures = 0
+    for name, (sql, params), required, forbidden in pb.HOT_QUERY_PLANS:
+        plan, problems = pb.query_plan_problems(sql, params, required, forbidden)
+        status = "OK" if not problems else "FALLA: " + "; ".join(problems)
+        print(f"{name:<36}{status}")
+        if problems:
+            failures += 1
+            for line in plan:
+                print(f"    {line}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de la capa de datos de Personal Boss.")
+    parser.add_argument("--actions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--search-actions", type=int, default=100_000)
+    parser.add_argument("--import-actions", type=int, default=200_000)
+    parser.add_argument("--check-plans", action="store_true",
+                        help="Solo verificar que las consultas críticas usan índices (sale con código 1 si no).")
+    parser.add_argument("--suite", action="store_true",
+                        help="Medir cada helper de datos a varias escalas y emitir JSON.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10_000, 100_000],
+                        help="Cantidades de acciones para --suite.")
+    parser.add_argument("--tags", type=int, default=30, help="Etiquetas de los datos sintéticos.")
+    parser.add_argument("--tags-per-action", type=float, nargs="+", default=list(DEFAULT_TAGS_PER_ACTION),
+                        metavar="P", help="Probabilidad de 0, 1, 2, ... etiquetas por acción.")
+    parser.add_argument("--json", metavar="RUTA", help="Guardar los resultados de --suite en este archivo.")
+    parser.add_argument("--compare", metavar="RUTA",
+                        help="Comparar --suite con un JSON anterior (sale con código 1 si hay regresiones).")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="Fracción de lentitud que --compare considera regresión.")
+    parser.add_argument("--generate", metavar="RUTA",
+                        help="Solo generar una base sintética de --actions acciones en RUTA.")
+    args = parser.parse_args()
+
+    if args.generate:
+        stats = generate_db(args.generate, max(5, args.actions // 200), args.actions, args.tags,
+                            args.tags_per_action)
+        pb.close_pool()
+        print(f"{stats.actions} acciones en {stats.seconds:.1f} s -> {args.generate}")
+        return
+
+    if args.suite:
+        with tempfile.TemporaryDirectory() as tmp:
+            doc = {"meta": suite_metadata(),
+                   "results": run_suite(tmp, args.scales, args.repeat, args.tags, args.tags_per_action)}
+        text = json.dumps(doc, ensure_ascii=False, indent=1)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                regressions = compare_results(json.load(f), doc, args.threshold)
+            raise SystemExit(1 if regressions else 0)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        pb.configure_db(path)
+        pb.init_db()
+        project_id = seed(args.actions)
+        if args.check_plans:
+            failures = check_query_plans()
+            pb.close_pool()
+            raise SystemExit(1 if failures else 0)
+        bench_connection_layer(path, project_id, args.repeat)
+        bench_cli(path, args.repeat)
+        bench_project_selection(args.sizes, args.repeat)
+        bench_first_page(args.sizes + [50_000], args.repeat)
+        bench_write_burst(tmp, args.writes)
+        bench_search(tmp, args.search_actions, args.repeat)
+        bench_next_action(tmp, args.actions, args.repeat)
+        bench_tag_filters(tmp, args.search_actions, args.repeat)
+        bench_import(tmp, args.import_actions, [1000, pb.IMPORT_BATCH_SIZE])
+        bench_archive(tmp, args.import_actions, [100, pb.ARCHIVE_BATCH_SIZE, 5000], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
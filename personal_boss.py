@@ -1,11 +1,19 @@
+import time
+_STARTED = time.perf_counter()  # --profile-startup counts module imports from here
 
 import sqlite3
 import os
 import sys
-import shutil
 import datetime
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+import queue
+import re
+import marshal
+from array import array
+import threading
+import functools
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, OrderedDict, namedtuple
+from contextlib import contextmanager
 
 APP_TITLE = "Personal Boss"
 
@@ -35,27 +43,565 @@ DEFAULT_TAGS = [
 def ensure_db_location():
     if not os.path.exists(DB_PATH) and os.path.exists(LEGACY_DB_PATH):
         try:
-            shutil.copy2(LEGACY_DB_PATH, DB_PATH)
+            copy_database(LEGACY_DB_PATH, DB_PATH, pause=0)
         except Exception as e:
             print(f"Advertencia: no se pudo migrar la DB legacy: {e}")
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
+POOL_SIZE = 4
+STATEMENT_CACHE_SIZE = 256
+
+# Pragmas applied to every pooled connection. "normal" (WAL +
+# synchronous=NORMAL) cannot corrupt the DB; a power cut may only lose the
+# last commits. "full" also fsyncs the WAL on every commit, and "legacy"
+# keeps SQLite's rollback journal for tools that do not understand WAL.
+_PERF_PRAGMAS = {
+    "mmap_size": 64 * 1024 * 1024,
+    "cache_size": -16000,
+    "temp_store": "MEMORY",
+    "wal_autocheckpoint": 1000,
+}
+DURABILITY_PROFILES = {
+    "normal": {"journal_mode": "WAL", "synchronous": "NORMAL", **_PERF_PRAGMAS},
+    "full": {"journal_mode": "WAL", "synchronous": "FULL", **_PERF_PRAGMAS},
+    "legacy": {"journal_mode": "DELETE", "synchronous": "FULL"},
+}
+DURABILITY = os.environ.get("PERSONAL_BOSS_DURABILITY", "normal")
+
+# Idle checkpoint policy: once no write happened for CHECKPOINT_IDLE_SECONDS,
+# fold the WAL back into the main file without blocking readers.
+CHECKPOINT_IDLE_SECONDS = 30
+CHECKPOINT_POLL_MS = 10_000
+
+# ---------------------------- Instrumentation ---------------------------- #
+
+# Opt-in (PERSONAL_BOSS_INSTRUMENT=1, --instrument or --stats): connections
+# opened while it is enabled time every statement, DB helpers decorated with
+# @instrumented time each call, and UI handlers decorated with @ui_event
+# count the queries they cause, including those run later on the DB worker.
+SLOW_QUERY_MS = 50
+SLOW_QUERY_LOG_SIZE = 100
+
+class LatencyHistogram:
+    # Power-of-two microsecond buckets: bucket b holds samples in [2^(b-1), 2^b).
+    __slots__ = ("count", "total_us", "max_us", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self.buckets = {}
+
+    def add(self, us):
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+        b = int(us).bit_length()
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+
+    def percentile(self, p):
+        # Upper bound of the bucket holding the p-th percentile.
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= self.count * p:
+                return min(float(1 << b), self.max_us)
+        return self.max_us
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_us / 1000, 3),
+            "mean_us": round(self.total_us / self.count, 1) if self.count else 0.0,
+            "p50_us": self.percentile(0.5),
+            "p95_us": self.percentile(0.95),
+            "max_us": round(self.max_us, 1),
+            "buckets": {f"<{1 << b}us": n for b, n in sorted(self.buckets.items())},
+        }
+
+
+class EventStats:
+    __slots__ = ("count", "queries", "query_us")
+
+    def __init__(self):
+        self.count = 0
+        self.queries = 0
+        self.query_us = 0.0
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    # A statement's latency runs from execute() until its rows have been
+    # fetched (or the cursor is reused or closed). Statements without a
+    # result set are recorded as soon as they run. Nothing is recorded from
+    # __del__: a finalizer may run on any thread, mid-statement on the
+    # connection.
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, time.perf_counter() - t0]
+            if self.description is None:
+                self._finish()
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._pending = [sql, None, time.perf_counter() - t0]
+            self._finish()
+
+    def _timed(self, fetch, *args):
+        t0 = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - t0
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        self._finish()
+        return row
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            instrumentation.record_statement(self.connection, *pending)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class Instrumentation:
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_ms = SLOW_QUERY_MS
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._normalized = {}
+        self.reset()
+
+    def enable(self, slow_query_ms=None):
+        if slow_query_ms is not None:
+            self.slow_query_ms = slow_query_ms
+        if not self.enabled:
+            self.enabled = True
+            # Pooled connections are reopened with the instrumented factory.
+            close_pool()
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            close_pool()
+
+    def reset(self):
+        with self._lock:
+            self.statements = {}
+            self.functions = {}
+            self.events = {}
+            self.slow_queries = []
+            self.started = time.time()
+
+    def _normalize(self, sql):
+        key = self._normalized.get(sql)
+        if key is None:
+            key = " ".join(sql.split())
+            # IN lists of any length share one entry.
+            key = re.sub(r"\?(?:\s*,\s*\?)+", "?, …", key)
+            if len(self._normalized) < 10_000:
+                self._normalized[sql] = key
+        return key
+
+    def _context(self):
+        return getattr(self._local, "function", None), getattr(self._local, "event", None)
+
+    def record_statement(self, conn, sql, params, seconds):
+        if not self.enabled:
+            return
+        us = seconds * 1e6
+        key = self._normalize(sql)
+        function, event = self._context()
+        with self._lock:
+            self.statements.setdefault(key, LatencyHistogram()).add(us)
+            if event is not None:
+                stats = self.events.setdefault(event, EventStats())
+                stats.queries += 1
+                stats.query_us += us
+        if us >= self.slow_query_ms * 1000 and not key.upper().startswith("EXPLAIN"):
+            self._log_slow(conn, sql, params, us, function, event)
+
+    def _log_slow(self, conn, sql, params, us, function, event):
+        plan = []
+        if self._normalize(sql).upper().startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")):
+            try:
+                # A plain cursor, so the plan lookup is not itself recorded.
+                cur = conn.cursor(sqlite3.Cursor)
+                plan = [r[3] for r in cur.execute("EXPLAIN QUERY PLAN " + sql, params or ())]
+            except (sqlite3.Error, ValueError) as e:
+                plan = [f"(sin plan: {e})"]
+        entry = {
+            "at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "ms": round(us / 1000, 2),
+            "sql": self._normalize(sql),
+            "params": [repr(p)[:80] for p in params] if isinstance(params, (list, tuple)) else None,
+            "function": function,
+            "event": event,
+            "plan": plan,
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+            del self.slow_queries[:-SLOW_QUERY_LOG_SIZE]
+
+    def record_function(self, name, seconds):
+        with self._lock:
+            self.functions.setdefault(name, LatencyHistogram()).add(seconds * 1e6)
+
+    @contextmanager
+    def function(self, name):
+        outer = getattr(self._local, "function", None)
+        self._local.function = name
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_function(name, time.perf_counter() - t0)
+            self._local.function = outer
+
+    @contextmanager
+    def event(self, name):
+        outer = getattr(self._local, "event", None)
+        self._local.event = name
+        with self._lock:
+            self.events.setdefault(name, EventStats()).count += 1
+        try:
+            yield
+        finally:
+            self._local.event = outer
+
+    def bind(self, fn):
+        # Carry the current UI event over to the thread that will run fn.
+        event = getattr(self._local, "event", None)
+        if event is None:
+            return fn
+
+        def bound(*args, **kwargs):
+            outer = getattr(self._local, "event", None)
+            self._local.event = event
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.event = outer
+        return bound
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "since": datetime.datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "functions": {k: h.as_dict() for k, h in self.functions.items()},
+                "statements": {k: h.as_dict() for k, h in self.statements.items()},
+                "events": {
+                    k: {"count": e.count, "queries": e.queries,
+                        "queries_per_event": round(e.queries / e.count, 2) if e.count else None,
+                        "query_ms": round(e.query_us / 1000, 3)}
+                    for k, e in self.events.items()
+                },
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def report(self, top=20):
+        snap = self.snapshot()
+        lines = [f"Instrumentación desde {snap['since']}", ""]
+
+        def table(title, rows, width=60):
+            lines.append(f"{title:<{width}}{'n':>8}{'total ms':>11}{'p50 µs':>10}{'p95 µs':>10}{'max µs':>11}")
+            for name, h in sorted(rows.items(), key=lambda kv: -kv[1]["total_ms"])[:top]:
+                label = name if len(name) <= width - 2 else name[:width - 3] + "…"
+                lines.append(f"{label:<{width}}{h['count']:>8}{h['total_ms']:>11.1f}"
+                             f"{h['p50_us']:>10.0f}{h['p95_us']:>10.0f}{h['max_us']:>11.0f}")
+            lines.append("")
+
+        table("función", snap["functions"], 40)
+        table("sentencia", snap["statements"])
+        lines.append(f"{'evento':<48}{'veces':>8}{'consultas':>11}{'por evento':>12}{'ms':>10}")
+        for name, e in sorted(snap["events"].items(), key=lambda kv: -kv[1]["queries"]):
+            lines.append(f"{name:<48}{e['count']:>8}{e['queries']:>11}"
+                         f"{e['queries_per_event'] or 0:>12.1f}{e['query_ms']:>10.1f}")
+        lines.append("")
+        lines.append(f"Consultas lentas (>= {self.slow_query_ms} ms): {len(snap['slow_queries'])}")
+        for q in snap["slow_queries"][-top:]:
+            lines.append(f"  {q['at']}  {q['ms']} ms  {q['function'] or '-'}  {q['event'] or '-'}")
+            lines.append(f"    {q['sql']}")
+            lines.extend(f"      {step}" for step in q["plan"])
+        return "\n".join(lines)
+
+instrumentation = Instrumentation()
+instrumentation.enabled = bool(os.environ.get("PERSONAL_BOSS_INSTRUMENT"))
+
+def instrumented(fn):
+    # Per-call latency for a DB helper; statements it runs are attributed to it.
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not instrumentation.enabled:
+            return fn(*args, **kwargs)
+        with instrumentation.function(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def ui_event(method):
+    # Counts the queries a UI handler causes, on this thread or the DB worker.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not instrumentation.enabled:
+            return method(self, *args, **kwargs)
+        with instrumentation.event(f"{type(self).__name__}.{method.__name__}"):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def get_conn(path=None, durability=None):
+    profile = DURABILITY_PROFILES.get(durability or DURABILITY)
+    if profile is None:
+        raise ValueError(
+            f"Perfil de durabilidad desconocido: {durability or DURABILITY!r} "
+            f"(opciones: {', '.join(DURABILITY_PROFILES)})"
+        )
+    conn = sqlite3.connect(
+        path or DB_PATH,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        factory=InstrumentedConnection if instrumentation.enabled else sqlite3.Connection,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    for pragma, value in profile.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
     return conn
 
-def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
+
+class ConnectionPool:
+    # Long-lived connections shared by every DB helper. A thread keeps the
+    # connection it checked out for nested connection()/transaction() blocks,
+    # so helpers can be composed inside a single transaction.
+    def __init__(self, path, size=POOL_SIZE, durability=None):
+        self.path = path
+        self.size = size
+        self.durability = durability or DURABILITY
+        self.last_write = None
+        self.last_checkpoint = None
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("El pool de conexiones está cerrado.")
+            if self._opened < self.size:
+                self._opened += 1
+                return get_conn(self.path, self.durability)
+        return self._idle.get()
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        # immediate takes the write lock up front, for writers that read
+        # before they write (e.g. pre-assigned ids); nested blocks inherit
+        # the lock mode of the outermost transaction.
+        with self.connection() as conn:
+            if conn.in_transaction:
+                depth = getattr(self._local, "savepoints", 0) + 1
+                self._local.savepoints = depth
+                name = f"sp_{depth}"
+                hooks_mark = len(self._local.commit_hooks)
+                conn.execute(f"SAVEPOINT {name}")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute(f"ROLLBACK TO {name}")
+                    conn.execute(f"RELEASE {name}")
+                    del self._local.commit_hooks[hooks_mark:]
+                    raise
+                else:
+                    conn.execute(f"RELEASE {name}")
+                finally:
+                    self._local.savepoints = depth - 1
+                return
+            self._local.commit_hooks = []
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                self._local.commit_hooks = []
+                raise
+            else:
+                conn.commit()
+                self.last_write = time.monotonic()
+                hooks, self._local.commit_hooks = self._local.commit_hooks, []
+                for hook in hooks:
+                    hook()
+
+    def after_commit(self, fn):
+        # Defer fn until the outermost transaction of this thread commits;
+        # it is dropped if that transaction (or its savepoint) rolls back.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or not conn.in_transaction:
+            fn()
+        else:
+            self._local.commit_hooks.append(fn)
+
+    def uses_wal(self):
+        return DURABILITY_PROFILES[self.durability]["journal_mode"] == "WAL"
+
+    def checkpoint(self, mode="PASSIVE"):
+        if not self.uses_wal():
+            return None
+        with self.connection() as conn:
+            busy, wal_pages, moved = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        self.last_checkpoint = time.monotonic()
+        return busy, wal_pages, moved
+
+    def checkpoint_if_idle(self, idle_seconds=CHECKPOINT_IDLE_SECONDS):
+        if self.last_write is None:
+            return None
+        if self.last_checkpoint is not None and self.last_checkpoint >= self.last_write:
+            return None
+        if time.monotonic() - self.last_write < idle_seconds:
+            return None
+        return self.checkpoint("PASSIVE")
+
+    def close(self):
+        try:
+            self.checkpoint("TRUNCATE")
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH, durability=DURABILITY)
+    return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def configure_db(path=None, durability=None):
+    global DB_PATH, DURABILITY
+    if durability is not None and durability not in DURABILITY_PROFILES:
+        raise ValueError(f"Perfil de durabilidad desconocido: {durability!r}")
+    close_pool()
+    tag_catalog.invalidate()
+    notify_action_indexes("invalidate")
+    position_allocator.invalidate()
+    if path is not None:
+        DB_PATH = path
+    if durability is not None:
+        DURABILITY = durability
+
+def connection():
+    return get_pool().connection()
+
+def transaction(immediate=False):
+    return get_pool().transaction(immediate)
+
+def after_commit(fn):
+    get_pool().after_commit(fn)
+
+# ---------------------------- Schema migrations ---------------------------- #
+# Each migration runs once, in its own transaction, and bumps PRAGMA
+# user_version to its position in MIGRATIONS (1-based).
+
+def _migration_base_schema(conn):
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS projects (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE NOT NULL,
             created_at TEXT NOT NULL
         )
     """)
-    cur.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS actions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             project_id INTEGER NOT NULL,
@@ -66,13 +612,13 @@ def init_db():
             FOREIGN KEY(project_id) REFERENCES projects(id) ON DELETE CASCADE
         )
     """)
-    cur.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS tags (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE NOT NULL
         )
     """)
-    cur.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS action_tags (
             action_id INTEGER NOT NULL,
             tag_id INTEGER NOT NULL,
@@ -81,885 +627,2131 @@ def init_db():
             FOREIGN KEY(tag_id) REFERENCES tags(id) ON DELETE CASCADE
         )
     """)
-    conn.commit()
 
-    for t in DEFAULT_TAGS:
-        try:
-            cur.execute("INSERT OR IGNORE INTO tags(name) VALUES (?)", (t,))
-        except sqlite3.Error:
-            pass
-    conn.commit()
-    conn.close()
+def _migration_hot_query_indexes(conn):
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_actions_project_status_created
+        ON actions(project_id, is_complete, created_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_actions_status_created
+        ON actions(is_complete, created_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_action_tags_tag
+        ON action_tags(tag_id, action_id)
+    """)
+    conn.execute("ANALYZE")
+
+# The per-row insert triggers stand aside while a bulk_load row exists; see
+# _migration_bulk_load.
+BULK_LOAD_OFF = "NOT EXISTS (SELECT 1 FROM bulk_load)"
+
+ACTIONS_FTS_INSERT_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS actions_fts_ai AFTER INSERT ON actions WHEN {BULK_LOAD_OFF} BEGIN
+        INSERT INTO actions_fts(rowid, description) VALUES (new.id, new.description);
+    END
+"""
+
+def _migration_actions_fts(conn):
+    # Builds without FTS5 skip the index; search_actions() then falls back
+    # to LIKE.
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS actions_fts USING fts5(
+                description,
+                content='actions',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"Advertencia: FTS5 no disponible, la búsqueda usará LIKE: {e}")
+        return
+    conn.execute(ACTIONS_FTS_INSERT_TRIGGER)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS actions_fts_ad AFTER DELETE ON actions BEGIN
+            INSERT INTO actions_fts(actions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS actions_fts_au AFTER UPDATE OF description ON actions BEGIN
+            INSERT INTO actions_fts(actions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+            INSERT INTO actions_fts(rowid, description) VALUES (new.id, new.description);
+        END
+    """)
+    conn.execute("INSERT INTO actions_fts(actions_fts) VALUES ('rebuild')")
+
+# Actions are listed by (is_complete, position, id). New actions go
+# POSITION_GAP past the last one, so a move can take the midpoint of its new
+# neighbours and rewrite a single row.
+POSITION_GAP = 1024
+
+def _migration_action_positions(conn):
+    # Existing actions keep the creation order they were listed in.
+    conn.execute(f"""
+        UPDATE actions SET position = r.rank * {POSITION_GAP}
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY project_id ORDER BY created_at, id) AS rank
+            FROM actions
+        ) AS r
+        WHERE r.id = actions.id
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_actions_project_status_created")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_actions_project_status_position
+        ON actions(project_id, is_complete, position)
+    """)
+    conn.execute("ANALYZE actions")
+
+# Change feed: every write to projects, actions, action_tags and tags
+# appends (kind, row_id, op) to `changes`, so other processes can follow
+# the DB by sequence number. Tag links are reported as an update of their
+# action. AUTOINCREMENT keeps seq increasing after old rows are pruned.
+def _change_trigger(table, event, kind, row_id, op, when=None):
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS changes_{table}_{event[0].lower()} AFTER {event} ON {table}
+        {f"WHEN {when}" if when else ""} BEGIN
+            INSERT INTO changes(kind, row_id, op) VALUES ('{kind}', {row_id}, '{op}');
+        END
+    """
+
+CHANGE_TRIGGERS = {
+    "projects": [_change_trigger("projects", "INSERT", "project", "new.id", "insert"),
+                 _change_trigger("projects", "UPDATE", "project", "new.id", "update"),
+                 _change_trigger("projects", "DELETE", "project", "old.id", "delete")],
+    "actions": [_change_trigger("actions", "INSERT", "action", "new.id", "insert", when=BULK_LOAD_OFF),
+                _change_trigger("actions", "UPDATE", "action", "new.id", "update"),
+                _change_trigger("actions", "DELETE", "action", "old.id", "delete")],
+    "action_tags": [_change_trigger("action_tags", "INSERT", "action", "new.action_id", "update",
+                                    when=BULK_LOAD_OFF),
+                    # Links removed by an action's delete cascade are left
+                    # out: the action itself is already reported as deleted.
+                    _change_trigger("action_tags", "DELETE", "action", "old.action_id", "update",
+                                    when="EXISTS (SELECT 1 FROM actions WHERE id = old.action_id)")],
+    "tags": [_change_trigger("tags", "INSERT", "tag", "new.id", "insert"),
+             _change_trigger("tags", "UPDATE", "tag", "new.id", "update"),
+             _change_trigger("tags", "DELETE", "tag", "old.id", "delete")],
+}
+
+def _migration_change_feed(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    """)
+    for triggers in CHANGE_TRIGGERS.values():
+        for sql in triggers:
+            conn.execute(sql)
+
+# Archive tier: actions completed long ago move, with their tag links, to
+# archived_actions / archived_action_tags, so the hot tables and their
+# indexes only grow with live work. Both stay in this file, so backups,
+# foreign keys and transactions cover them without an ATTACH. The all_*
+# views add the archive back for queries that ask for it; completed_at
+# dates the completion. Actions already completed when it was added get
+# the upgrade time, so nothing is archived before ARCHIVE_AFTER_DAYS pass.
+ARCHIVE_COLUMNS = "id, project_id, description, is_complete, position, created_at, completed_at"
+
+def _migration_archive(conn):
+    conn.execute("ALTER TABLE actions ADD COLUMN completed_at TEXT")
+    conn.execute("UPDATE actions SET completed_at = ? WHERE is_complete = 1",
+                 (datetime.datetime.now().isoformat(),))
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_actions_status_completed
+        ON actions(is_complete, completed_at)
+    """)
+    # Archiving deletes actions; their cascaded tag links stay out of the feed.
+    conn.execute("DROP TRIGGER IF EXISTS changes_action_tags_d")
+    conn.execute(CHANGE_TRIGGERS["action_tags"][1])
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archived_actions (
+            id INTEGER PRIMARY KEY,
+            project_id INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            is_complete INTEGER NOT NULL DEFAULT 1,
+            position INTEGER,
+            created_at TEXT NOT NULL,
+            completed_at TEXT,
+            archived_at TEXT NOT NULL,
+            FOREIGN KEY(project_id) REFERENCES projects(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archived_action_tags (
+            action_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY (action_id, tag_id),
+            FOREIGN KEY(action_id) REFERENCES archived_actions(id) ON DELETE CASCADE,
+            FOREIGN KEY(tag_id) REFERENCES tags(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_archived_actions_project_status_position
+        ON archived_actions(project_id, is_complete, position)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_archived_action_tags_tag
+        ON archived_action_tags(tag_id, action_id)
+    """)
+    conn.execute(f"""
+        CREATE VIEW IF NOT EXISTS all_actions AS
+        SELECT {ARCHIVE_COLUMNS}, NULL AS archived_at FROM actions
+        UNION ALL
+        SELECT {ARCHIVE_COLUMNS}, archived_at FROM archived_actions
+    """)
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS all_action_tags AS
+        SELECT action_id, tag_id FROM action_tags
+        UNION ALL
+        SELECT action_id, tag_id FROM archived_action_tags
+    """)
 
+# Bulk import: row-at-a-time FTS and change-feed maintenance dominates a
+# large load, so an import batch inserts a bulk_load row, does the set-based
+# equivalent itself and deletes the row before it commits. The row is never
+# visible outside that transaction, and no DDL runs per batch, so the
+# prepared statements of other connections stay valid.
+def _migration_bulk_load(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS bulk_load (id INTEGER PRIMARY KEY CHECK (id = 1))")
+    if has_fts(conn):
+        conn.execute("DROP TRIGGER IF EXISTS actions_fts_ai")
+        conn.execute(ACTIONS_FTS_INSERT_TRIGGER)
+    conn.execute("DROP TRIGGER IF EXISTS changes_actions_i")
+    conn.execute(CHANGE_TRIGGERS["actions"][0])
+    conn.execute("DROP TRIGGER IF EXISTS changes_action_tags_i")
+    conn.execute(CHANGE_TRIGGERS["action_tags"][0])
+
+MIGRATIONS = [
+    _migration_base_schema,
+    _migration_hot_query_indexes,
+    _migration_actions_fts,
+    _migration_action_positions,
+    _migration_change_feed,
+    _migration_archive,
+    _migration_bulk_load,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    current = get_schema_version(conn)
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"La base de datos usa el esquema v{current}, más nuevo que el soportado (v{SCHEMA_VERSION})."
+        )
+    for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+        with transaction():
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+    return current
+
+@instrumented
+def init_db():
+    # An up-to-date user_version means the schema and the default tags are
+    # already there, so a normal start costs a single PRAGMA read. The default
+    # tags are seeded only when the schema is created or upgraded, so a
+    # deleted default tag stays deleted.
+    with connection() as conn:
+        if get_schema_version(conn) == SCHEMA_VERSION:
+            return False
+        migrate(conn)
+        with transaction():
+            conn.executemany("INSERT OR IGNORE INTO tags(name) VALUES (?)", [(t,) for t in DEFAULT_TAGS])
+        return True
+
+def explain_query_plan(sql, params=()):
+    with connection() as conn:
+        return [row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+@instrumented
 def list_projects():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM projects ORDER BY created_at ASC")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with connection() as conn:
+        return conn.execute("SELECT * FROM projects ORDER BY created_at ASC").fetchall()
 
+@instrumented
 def create_project(name):
-    conn = get_conn()
-    cur = conn.cursor()
     now = datetime.datetime.now().isoformat()
-    cur.execute("INSERT INTO projects(name, created_at) VALUES (?, ?)", (name, now))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cur = conn.execute("INSERT INTO projects(name, created_at) VALUES (?, ?)", (name, now))
+        return cur.lastrowid
 
+@instrumented
 def update_project(project_id, new_name):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE projects SET name=? WHERE id=?", (new_name, project_id))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("UPDATE projects SET name=? WHERE id=?", (new_name, project_id))
 
+@instrumented
 def delete_project(project_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM projects WHERE id=?", (project_id,))
-    conn.commit()
-    conn.close()
-
-def list_actions(project_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT a.*, p.name as project_name
+    with transaction() as conn:
+        conn.execute("DELETE FROM projects WHERE id=?", (project_id,))
+        after_commit(lambda: notify_action_indexes("invalidate"))
+
+@instrumented
+def get_action(action_id, include_archived=False):
+    sql = "SELECT * FROM actions WHERE id=?"
+    with connection() as conn:
+        return conn.execute(with_archive(sql) if include_archived else sql, (action_id,)).fetchone()
+
+_TAG_NAMES_SUBQUERY = """
+    (SELECT GROUP_CONCAT(name, ', ') FROM (
+        SELECT t.name FROM action_tags at
+        JOIN tags t ON t.id = at.tag_id
+        WHERE at.action_id = a.id
+        ORDER BY t.name COLLATE NOCASE
+    )) AS tag_names
+"""
+
+# SQLite cannot push the correlated a.id into a UNION ALL view, so the
+# tag names of a row read through all_actions look in both link tables
+# directly instead of through all_action_tags.
+_ALL_TAG_NAMES_SUBQUERY = """
+    (SELECT GROUP_CONCAT(name, ', ') FROM (
+        SELECT t.name FROM action_tags at
+        JOIN tags t ON t.id = at.tag_id
+        WHERE at.action_id = a.id
+        UNION ALL
+        SELECT t.name FROM archived_action_tags at
+        JOIN tags t ON t.id = at.tag_id
+        WHERE at.action_id = a.id
+        ORDER BY 1 COLLATE NOCASE
+    )) AS tag_names
+"""
+
+_HOT_TABLES_RE = re.compile(r"\b(FROM|JOIN)\s+(actions|action_tags)\b")
+
+def with_archive(sql):
+    # The same query over the hot tables plus the archive: every read of
+    # actions / action_tags goes through the all_* views instead. Rows that
+    # come from the archive have a non-NULL archived_at.
+    sql = sql.replace(_TAG_NAMES_SUBQUERY, "{tag_names}")
+    return _HOT_TABLES_RE.sub(r"\1 all_\2", sql).replace("{tag_names}", _ALL_TAG_NAMES_SUBQUERY)
+
+def only_archive(sql):
+    # The same query over the archive tables alone.
+    return _HOT_TABLES_RE.sub(r"\1 archived_\2", sql)
+
+def is_archived(row):
+    return "archived_at" in row.keys() and row["archived_at"] is not None
+
+LIST_ACTIONS_SQL = """
+    SELECT a.*, p.name as project_name
+    FROM actions a
+    JOIN projects p ON p.id = a.project_id
+    WHERE a.project_id=?
+    ORDER BY a.is_complete ASC, a.position ASC, a.id ASC
+"""
+
+LIST_ACTIONS_WITH_TAGS_SQL = f"""
+    SELECT a.*, p.name AS project_name, {_TAG_NAMES_SUBQUERY}
+    FROM actions a
+    JOIN projects p ON p.id = a.project_id
+    WHERE a.project_id=?
+    ORDER BY a.is_complete ASC, a.position ASC, a.id ASC
+"""
+
+# Same columns as a list row, for handing a single changed action back to the UI.
+ACTION_ROW_SQL = f"""
+    SELECT a.*, p.name AS project_name, {_TAG_NAMES_SUBQUERY}
+    FROM actions a
+    JOIN projects p ON p.id = a.project_id
+    WHERE a.id=?
+"""
+
+def _action_row(conn, action_id):
+    return conn.execute(ACTION_ROW_SQL, (action_id,)).fetchone()
+
+@instrumented
+def list_actions(project_id, include_archived=False):
+    sql = with_archive(LIST_ACTIONS_SQL) if include_archived else LIST_ACTIONS_SQL
+    with connection() as conn:
+        return conn.execute(sql, (project_id,)).fetchall()
+
+@instrumented
+def list_actions_with_tags(project_id, include_archived=False):
+    sql = with_archive(LIST_ACTIONS_WITH_TAGS_SQL) if include_archived else LIST_ACTIONS_WITH_TAGS_SQL
+    with connection() as conn:
+        return conn.execute(sql, (project_id,)).fetchall()
+
+ACTIONS_PAGE_SIZE = 200
+
+def action_list_key(row):
+    return (row["is_complete"], row["position"], row["id"])
+
+def action_creation_key(row):
+    return (row["created_at"], row["id"])
+
+def list_actions_page_query(project_id, after=None, limit=ACTIONS_PAGE_SIZE, include_archived=False):
+    # Keyset page of a project's actions in list order. `after` is the
+    # action_list_key() of the last row already shown.
+    keyset = "AND (a.is_complete, a.position, a.id) > (?, ?, ?)" if after is not None else ""
+    params = [project_id] + (list(after) if after is not None else []) + [limit]
+    sql = f"""
+        SELECT a.*, p.name AS project_name, {_TAG_NAMES_SUBQUERY}
         FROM actions a
         JOIN projects p ON p.id = a.project_id
-        WHERE a.project_id=?
-        ORDER BY a.is_complete ASC, a.created_at ASC
-    """, (project_id,))
-    rows = cur.fetchall()
-    conn.close()
-    return rows
-
+        WHERE a.project_id=? {keyset}
+        ORDER BY a.is_complete ASC, a.position ASC, a.id ASC
+        LIMIT ?
+    """
+    return (with_archive(sql) if include_archived else sql), params
+
+@instrumented
+def list_actions_page(project_id, after=None, limit=ACTIONS_PAGE_SIZE, include_archived=False):
+    sql, params = list_actions_page_query(project_id, after, limit, include_archived)
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+@instrumented
 def get_action_tags(action_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT t.* FROM tags t
-        JOIN action_tags at ON at.tag_id = t.id
-        WHERE at.action_id = ?
-        ORDER BY t.name COLLATE NOCASE
-    """, (action_id,))
-    rows = cur.fetchall()
-    conn.close()
-    return rows
-
+    with connection() as conn:
+        return conn.execute("""
+            SELECT t.* FROM tags t
+            JOIN action_tags at ON at.tag_id = t.id
+            WHERE at.action_id = ?
+            ORDER BY t.name COLLATE NOCASE
+        """, (action_id,)).fetchall()
+
+class PositionAllocator:
+    # Positions for actions appended to a project. The last position of a
+    # project is read once and then counted here, so inserts skip the
+    # MAX(position) lookup. A rolled-back insert just leaves a gap.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = {}
+
+    def allocate(self, conn, project_id, count=1):
+        with self._lock:
+            last = self._last.get(project_id)
+            if last is None:
+                last = conn.execute(
+                    "SELECT COALESCE(MAX(position), 0) FROM actions WHERE project_id=?", (project_id,)
+                ).fetchone()[0]
+            first = (int(last) // POSITION_GAP + 1) * POSITION_GAP
+            self._last[project_id] = first + (count - 1) * POSITION_GAP
+            return first
+
+    def invalidate(self, project_id=None):
+        with self._lock:
+            if project_id is None:
+                self._last.clear()
+            else:
+                self._last.pop(project_id, None)
+
+position_allocator = PositionAllocator()
+
+@instrumented
 def create_action(project_id, description, tag_ids):
-    conn = get_conn()
-    cur = conn.cursor()
     now = datetime.datetime.now().isoformat()
-    cur.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM actions WHERE project_id=?", (project_id,))
-    position = cur.fetchone()[0]
-    cur.execute("""
-        INSERT INTO actions(project_id, description, is_complete, position, created_at)
-        VALUES (?, ?, 0, ?, ?)
-    """, (project_id, description, position, now))
-    action_id = cur.lastrowid
-    for tid in tag_ids:
-        cur.execute("INSERT OR IGNORE INTO action_tags(action_id, tag_id) VALUES (?, ?)", (action_id, tid))
-    conn.commit()
-    conn.close()
-    return action_id
+    with transaction(immediate=True) as conn:
+        position = position_allocator.allocate(conn, project_id)
+        cur = conn.execute("""
+            INSERT INTO actions(project_id, description, is_complete, position, created_at)
+            VALUES (?, ?, 0, ?, ?)
+        """, (project_id, description, position, now))
+        action_id = cur.lastrowid
+        conn.executemany(
+            "INSERT OR IGNORE INTO action_tags(action_id, tag_id) VALUES (?, ?)",
+            [(action_id, tid) for tid in tag_ids],
+        )
+        after_commit(lambda: notify_action_indexes("upsert", action_id, now, tag_ids))
+        return _action_row(conn, action_id)
 
+@instrumented
 def update_action(action_id, description, tag_ids, is_complete=None):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE actions SET description=? WHERE id=?", (description, action_id))
+    # Only the tags that differ from the stored ones are written; use an
+    # ActionBatch directly to get that TagDiff back.
+    batch = ActionBatch().set_description(action_id, description).set_tags(action_id, tag_ids)
     if is_complete is not None:
-        cur.execute("UPDATE actions SET is_complete=? WHERE id=?", (1 if is_complete else 0, action_id))
-    cur.execute("DELETE FROM action_tags WHERE action_id=?", (action_id,))
-    for tid in tag_ids:
-        cur.execute("INSERT OR IGNORE INTO action_tags(action_id, tag_id) VALUES (?, ?)", (action_id, tid))
-    conn.commit()
-    conn.close()
-
+        batch.set_status([action_id], is_complete)
+    changes = batch.commit()
+    return changes.updated[0] if changes.updated else None
+
+# completed_at keeps the first completion time when an action is marked
+# complete again, and is cleared when it is reopened.
+SET_STATUS_SQL = """
+    UPDATE actions SET is_complete = ?1, completed_at = CASE WHEN ?1 THEN COALESCE(completed_at, ?2) END
+    WHERE id = ?3
+"""
+
+@instrumented
 def toggle_action_status(action_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT is_complete FROM actions WHERE id=?", (action_id,))
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        return
-    new_val = 0 if row[0] else 1
-    cur.execute("UPDATE actions SET is_complete=? WHERE id=?", (new_val, action_id))
-    conn.commit()
-    conn.close()
-
+    now = datetime.datetime.now().isoformat()
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE actions SET is_complete = CASE is_complete WHEN 0 THEN 1 ELSE 0 END,
+                               completed_at = CASE is_complete WHEN 0 THEN ? END
+            WHERE id=?
+        """, (now, action_id))
+        after_commit(lambda: refresh_action_indexes(action_id))
+        return _action_row(conn, action_id)
+
+@instrumented
+def set_action_status(action_id, is_complete):
+    now = datetime.datetime.now().isoformat()
+    with transaction() as conn:
+        conn.execute(SET_STATUS_SQL, (1 if is_complete else 0, now, action_id))
+        after_commit(lambda: refresh_action_indexes(action_id))
+        return _action_row(conn, action_id)
+
+def _renumber_positions(conn, project_id):
+    # Respace a project's positions once repeated moves have used up the
+    # precision between two neighbours. Order is preserved.
+    conn.execute(f"""
+        UPDATE actions SET position = r.rank * {POSITION_GAP}
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY position, id) AS rank
+            FROM actions WHERE project_id = ?
+        ) AS r
+        WHERE r.id = actions.id
+    """, (project_id,))
+    position_allocator.invalidate(project_id)
+
+def _position_between(conn, action, anchor, after):
+    # Position that puts `action` right before (or after) `anchor` among the
+    # actions of its project that share its status.
+    key = (anchor["position"], anchor["id"])
+    params = (action["project_id"], action["is_complete"], action["id"]) + key
+    cmp_lo, cmp_hi = ("<=", ">") if after else ("<", ">=")
+    lo = conn.execute(f"""
+        SELECT MAX(position) FROM actions
+        WHERE project_id=? AND is_complete=? AND id != ? AND (position, id) {cmp_lo} (?, ?)
+    """, params).fetchone()[0]
+    hi = conn.execute(f"""
+        SELECT MIN(position) FROM actions
+        WHERE project_id=? AND is_complete=? AND id != ? AND (position, id) {cmp_hi} (?, ?)
+    """, params).fetchone()[0]
+    if lo is None and hi is None:
+        return action["position"]
+    if hi is None:
+        return position_allocator.allocate(conn, action["project_id"])
+    if lo is None:
+        return hi - POSITION_GAP
+    position = (lo + hi) / 2
+    return position if lo < position < hi else None
+
+@instrumented
+def move_action(action_id, before_id=None, after_id=None):
+    # Reorder an action inside its project by giving it a position between
+    # its new neighbours; only the moved row is written. With neither anchor
+    # it goes to the end. Returns the moved row.
+    with transaction(immediate=True) as conn:
+        action = conn.execute("SELECT id, project_id, is_complete, position FROM actions WHERE id=?",
+                              (action_id,)).fetchone()
+        if action is None:
+            return None
+        anchor_id = before_id if before_id is not None else after_id
+        if anchor_id == action_id:
+            return _action_row(conn, action_id)
+        if anchor_id is None:
+            position = position_allocator.allocate(conn, action["project_id"])
+        else:
+            anchor = conn.execute("SELECT id, project_id, position FROM actions WHERE id=?", (anchor_id,)).fetchone()
+            if anchor is None or anchor["project_id"] != action["project_id"]:
+                raise ValueError("Solo se puede mover una acción junto a otra del mismo proyecto.")
+            position = _position_between(conn, action, anchor, after=before_id is None)
+            if position is None:
+                _renumber_positions(conn, action["project_id"])
+                action = conn.execute("SELECT id, project_id, is_complete, position FROM actions WHERE id=?",
+                                      (action_id,)).fetchone()
+                anchor = conn.execute("SELECT id, project_id, position FROM actions WHERE id=?", (anchor_id,)).fetchone()
+                position = _position_between(conn, action, anchor, after=before_id is None)
+        conn.execute("UPDATE actions SET position=? WHERE id=?", (position, action_id))
+        return _action_row(conn, action_id)
+
+@instrumented
 def delete_action(action_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM actions WHERE id=?", (action_id,))
-    conn.commit()
-    conn.close()
-
+    # Returns the row as it was before deletion, or None if it did not exist.
+    with transaction(immediate=True) as conn:
+        row = _action_row(conn, action_id)
+        conn.execute("DELETE FROM actions WHERE id=?", (action_id,))
+        after_commit(lambda: notify_action_indexes("remove", action_id))
+        return row
+
+@instrumented
 def list_all_tags():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM tags ORDER BY name COLLATE NOCASE ASC")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with connection() as conn:
+        return conn.execute("SELECT * FROM tags ORDER BY name COLLATE NOCASE ASC").fetchall()
 
+@instrumented
 def create_tag(name):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO tags(name) VALUES (?)", (name,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        tag_id = conn.execute("INSERT INTO tags(name) VALUES (?)", (name,)).lastrowid
+        after_commit(lambda: tag_catalog.apply_created(tag_id, name))
+    return tag_id
 
+@instrumented
 def rename_tag(tag_id, new_name):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE tags SET name=? WHERE id=?", (new_name, tag_id))
-    conn.commit()
-    conn.close()
+    with transaction(immediate=True) as conn:
+        row = conn.execute("SELECT name FROM tags WHERE id=?", (tag_id,)).fetchone()
+        conn.execute("UPDATE tags SET name=? WHERE id=?", (new_name, tag_id))
+        if row:
+            after_commit(lambda: tag_catalog.apply_renamed(tag_id, new_name, row["name"]))
 
+@instrumented
 def delete_tag(tag_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM tags WHERE id=?", (tag_id,))
-    conn.commit()
-    conn.close()
-
-def find_next_action_by_tags(selected_tag_ids):
-    conn = get_conn()
-    cur = conn.cursor()
-    if not selected_tag_ids:
-        cur.execute("""
-            SELECT a.*, p.name AS project_name
-            FROM actions a
-            JOIN projects p ON p.id = a.project_id
-            WHERE a.is_complete = 0
-            ORDER BY a.created_at ASC
-            LIMIT 1
-        """)
-    else:
-        placeholders = ",".join("?" * len(selected_tag_ids))
-        query = f"""
+    with transaction() as conn:
+        conn.execute("DELETE FROM tags WHERE id=?", (tag_id,))
+        after_commit(lambda: tag_catalog.apply_deleted(tag_id))
+        after_commit(lambda: notify_action_indexes("drop_tag", tag_id))
+
+def _all_tags_clause(selected_tag_ids):
+    tag_ids = list(dict.fromkeys(selected_tag_ids))
+    if not tag_ids:
+        return "", []
+    # One index search on action_tags(tag_id, action_id) per tag.
+    subqueries = " INTERSECT ".join(["SELECT action_id FROM action_tags WHERE tag_id = ?"] * len(tag_ids))
+    return f"AND a.id IN ({subqueries})", tag_ids
+
+def next_action_query(selected_tag_ids):
+    tag_clause, params = _all_tags_clause(selected_tag_ids)
+    query = f"""
+        SELECT a.*, p.name AS project_name
+        FROM actions a
+        JOIN projects p ON p.id = a.project_id
+        WHERE a.is_complete = 0
+        {tag_clause}
+        ORDER BY a.created_at ASC
+        LIMIT 1
+    """
+    return query, params
+
+def matching_actions_query(selected_tag_ids, include_completed=False, after=None, limit=None,
+                           include_archived=False):
+    # `after` is the action_creation_key() of the last row of the previous page.
+    # Archived actions are all completed, so they only show up together with
+    # include_completed.
+    status_clause = "" if include_completed else "AND a.is_complete = 0"
+    tag_clause, params = _all_tags_clause(selected_tag_ids)
+    keyset = ""
+    if after is not None:
+        keyset = "AND (a.created_at, a.id) > (?, ?)"
+        params += list(after)
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = "LIMIT ?"
+        params.append(limit)
+    query = f"""
+        SELECT a.*, p.name AS project_name, {_TAG_NAMES_SUBQUERY}
+        FROM actions a
+        JOIN projects p ON p.id = a.project_id
+        WHERE 1=1 {status_clause}
+        {tag_clause}
+        {keyset}
+        ORDER BY a.created_at ASC, a.id ASC
+        {limit_clause}
+    """
+    return (with_archive(query) if include_archived else query), params
+
+@instrumented
+def find_next_action_by_tags(selected_tag_ids, after=None):
+    # `after` is an action row (or its (created_at, id) key) to skip past.
+    if after is not None and not isinstance(after, tuple):
+        after = action_creation_key(after)
+    action_id = next_actions.next_id(selected_tag_ids, after)
+    if action_id is None:
+        return None
+    with connection() as conn:
+        return conn.execute("""
             SELECT a.*, p.name AS project_name
             FROM actions a
             JOIN projects p ON p.id = a.project_id
-            WHERE a.is_complete = 0
-            AND a.id IN (
-                SELECT action_id
-                FROM action_tags
-                WHERE tag_id IN ({placeholders})
-                GROUP BY action_id
-                HAVING COUNT(DISTINCT tag_id) = {len(selected_tag_ids)}
-            )
-            ORDER BY a.created_at ASC
-            LIMIT 1
-        """
-        cur.execute(query, selected_tag_ids)
-    row = cur.fetchone()
-    conn.close()
-    return row
-
-def find_actions_by_tags(selected_tag_ids, include_completed=False):
-    conn = get_conn()
-    cur = conn.cursor()
+            WHERE a.id=?
+        """, (action_id,)).fetchone()
+
+@instrumented
+def find_actions_by_tags(selected_tag_ids, include_completed=False, after=None, limit=None,
+                         include_archived=False):
+    query, params = matching_actions_query(selected_tag_ids, include_completed, after, limit, include_archived)
+    with connection() as conn:
+        return conn.execute(query, params).fetchall()
+
+SEARCH_PAGE_SIZE = 100
+# bm25 has to score every match before the LIMIT applies; queries broader
+# than this are returned in creation order instead.
+SEARCH_RANK_LIMIT = 1000
+
+def has_fts(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='actions_fts'"
+    ).fetchone() is not None
+
+def fts_match_expression(text):
+    # Every word becomes a quoted prefix term; FTS5 ANDs them together.
+    terms = [w.replace('"', '""') for w in text.split()]
+    return " ".join(f'"{t}"*' for t in terms if t)
+
+def search_actions_query(text, include_completed=False, limit=SEARCH_PAGE_SIZE, offset=0,
+                         use_fts=True, ranked=True, include_archived=False):
     status_clause = "" if include_completed else "AND a.is_complete = 0"
-    if not selected_tag_ids:
+    if use_fts:
+        order = "f.rank" if ranked else "f.rowid"
         query = f"""
-            SELECT a.*, p.name AS project_name,
-                   GROUP_CONCAT(t.name, ', ') AS tag_names
-            FROM actions a
-            JOIN projects p ON p.id = a.project_id
-            LEFT JOIN action_tags at ON at.action_id = a.id
-            LEFT JOIN tags t ON t.id = at.tag_id
-            WHERE 1=1 {status_clause}
-            GROUP BY a.id
-            ORDER BY a.created_at ASC
-        """
-        cur.execute(query)
-    else:
-        placeholders = ",".join("?" * len(selected_tag_ids))
-        query = f"""
-            SELECT a.*, p.name AS project_name,
-                   GROUP_CONCAT(t.name, ', ') AS tag_names
-            FROM actions a
+            SELECT a.*, p.name AS project_name, {_TAG_NAMES_SUBQUERY}
+            FROM actions_fts f
+            JOIN actions a ON a.id = f.rowid
             JOIN projects p ON p.id = a.project_id
-            LEFT JOIN action_tags at ON at.action_id = a.id
-            LEFT JOIN tags t ON t.id = at.tag_id
-            WHERE 1=1 {status_clause}
-              AND a.id IN (
-                SELECT action_id
-                FROM action_tags
-                WHERE tag_id IN ({placeholders})
-                GROUP BY action_id
-                HAVING COUNT(DISTINCT tag_id) = {len(selected_tag_ids)}
-              )
-            GROUP BY a.id
-            ORDER BY a.created_at ASC
+            WHERE actions_fts MATCH ? {status_clause}
+            ORDER BY {order}
+            LIMIT ? OFFSET ?
         """
-        cur.execute(query, selected_tag_ids)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+        return query, [fts_match_expression(text), limit, offset]
+    words = text.split()
+    like_clause = " ".join("AND a.description LIKE ?" for _ in words)
+    query = f"""
+        SELECT a.*, p.name AS project_name, {_TAG_NAMES_SUBQUERY}
+        FROM actions a
+        JOIN projects p ON p.id = a.project_id
+        WHERE 1=1 {status_clause} {like_clause}
+        ORDER BY a.created_at ASC
+        LIMIT ? OFFSET ?
+    """
+    return (with_archive(query) if include_archived else query), [f"%{w}%" for w in words] + [limit, offset]
+
+@instrumented
+def search_actions(text, include_completed=False, limit=SEARCH_PAGE_SIZE, offset=0, include_archived=False):
+    # The FTS index only covers the hot table; searches that include the
+    # archive use the LIKE scan over both.
+    if not text.split():
+        return []
+    with connection() as conn:
+        use_fts = has_fts(conn) and not include_archived
+        ranked = use_fts and conn.execute(
+            "SELECT COUNT(*) FROM actions_fts WHERE actions_fts MATCH ?", (fts_match_expression(text),)
+        ).fetchone()[0] <= SEARCH_RANK_LIMIT
+        query, params = search_actions_query(text, include_completed, limit, offset, use_fts, ranked,
+                                             include_archived)
+        return conn.execute(query, params).fetchall()
+
+
+# The hot queries and the plan each must keep: (name, (sql, params), plan
+# fragments that must appear, plan fragments that must not). Checked by
+# bench.py --check-plans and the test suite on a seeded database.
+HOT_QUERY_PLANS = [
+    ("list_actions", (LIST_ACTIONS_SQL, (1,)),
+     ["idx_actions_project_status_position"], ["SCAN a", "TEMP B-TREE"]),
+    ("list_actions_with_tags", (LIST_ACTIONS_WITH_TAGS_SQL, (1,)),
+     ["idx_actions_project_status_position"], ["SCAN a", "SCAN at"]),
+    ("find_next_action_by_tags([])", next_action_query([]),
+     ["idx_actions_status_created"], ["SCAN a", "TEMP B-TREE"]),
+    ("find_next_action_by_tags([1, 2])", next_action_query([1, 2]),
+     ["idx_action_tags_tag"], ["SCAN action_tags"]),
+    ("find_actions_by_tags([1, 2])", matching_actions_query([1, 2]),
+     ["idx_action_tags_tag"], ["SCAN action_tags", "SCAN at"]),
+    ("list_actions_page(after=…)", list_actions_page_query(1, (0, 1024, 1)),
+     ["idx_actions_project_status_position"], ["SCAN a", "SCAN at"]),
+    ("find_actions_by_tags([1], after=…)", matching_actions_query([1], after=("2024-01-01", 1), limit=200),
+     ["idx_action_tags_tag"], ["SCAN action_tags", "SCAN at"]),
+]
 
-# ---------------------------- UI Components ---------------------------- #
-
-class TagManager(tk.Toplevel):
-    def __init__(self, master, on_close=None):
-        super().__init__(master)
-        self.title("Gestionar etiquetas")
-        self.geometry("460x420")
-        self.on_close = on_close
-        self.configure(padx=10, pady=10)
-
-        ttk.Label(self, text="Buscar etiqueta:").grid(row=0, column=0, sticky="w")
-        self.search_var = tk.StringVar()
-        self.search_entry = ttk.Entry(self, textvariable=self.search_var)
-        self.search_entry.grid(row=0, column=1, columnspan=2, sticky="ew")
-        self.grid_columnconfigure(1, weight=1)
-        self.search_var.trace_add("write", lambda *args: self._apply_filter())
-
-        self.tag_list = tk.Listbox(self, height=12)
-        self.tag_list.grid(row=1, column=0, columnspan=3, sticky="nsew", pady=(6,10))
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_columnconfigure(0, weight=0)
-
-        self.refresh_tags()
-
-        ttk.Label(self, text="Nueva etiqueta:").grid(row=2, column=0, sticky="w")
-        self.new_tag_entry = ttk.Entry(self)
-        self.new_tag_entry.grid(row=2, column=1, sticky="ew")
-        ttk.Button(self, text="Agregar", command=self.add_tag).grid(row=2, column=2, sticky="e")
-
-        ttk.Label(self, text="Renombrar seleccionada a:").grid(row=3, column=0, sticky="w", pady=(10,0))
-        self.rename_entry = ttk.Entry(self)
-        self.rename_entry.grid(row=3, column=1, sticky="ew", pady=(10,0))
-        ttk.Button(self, text="Renombrar", command=self.rename_selected).grid(row=3, column=2, pady=(10,0))
-
-        ttk.Button(self, text="Eliminar seleccionada", command=self.delete_selected).grid(row=4, column=0, columnspan=3, pady=(12,0))
-
-        self.protocol("WM_DELETE_WINDOW", self._on_close)
-
-    def _on_close(self):
-        if self.on_close:
-            self.on_close()
-        self.destroy()
-
-    def refresh_tags(self):
-        self.all_tags = list_all_tags()
-        self._apply_filter()
-
-    def _apply_filter(self):
-        term = (self.search_var.get() or "").strip().lower()
-        if term:
-            self.filtered_tags = [t for t in self.all_tags if term in t["name"].lower()]
-        else:
-            self.filtered_tags = list(self.all_tags)
-        self.tag_list.delete(0, tk.END)
-        for t in self.filtered_tags:
-            self.tag_list.insert(tk.END, t["name"])
-
-    def add_tag(self):
-        name = self.new_tag_entry.get().strip()
-        if not name:
-            return
-        try:
-            create_tag(name)
-            self.new_tag_entry.delete(0, tk.END)
-            self.refresh_tags()
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", f"La etiqueta '{name}' ya existe.")
-
-    def _get_selected_tag_row(self):
-        idx = self.tag_list.curselection()
-        if not idx:
-            return None
-        return self.filtered_tags[idx[0]]
+def query_plan_problems(sql, params, required, forbidden):
+    plan = explain_query_plan(sql, params)
+    text = "\n".join(plan)
+    problems = [f"falta {r}" for r in required if r not in text]
+    problems += [f"contiene {f}" for f in forbidden if f in text]
+    return plan, problems
 
-    def rename_selected(self):
-        t = self._get_selected_tag_row()
-        if not t:
-            messagebox.showinfo("Info", "Selecciona una etiqueta para renombrar.")
-            return
-        new_name = self.rename_entry.get().strip()
-        if not new_name:
-            messagebox.showinfo("Info", "Ingresá el nuevo nombre.")
-            return
-        try:
-            rename_tag(t["id"], new_name)
-            self.rename_entry.delete(0, tk.END)
-            self.refresh_tags()
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", f"Ya existe una etiqueta con el nombre '{new_name}'.")
-
-    def delete_selected(self):
-        t = self._get_selected_tag_row()
-        if not t:
-            messagebox.showinfo("Info", "Selecciona una etiqueta para eliminar.")
-            return
-        if messagebox.askyesno("Confirmar", f"¿Eliminar etiqueta '{t['name']}'?\nEsto la quitará de las acciones que la tengan."):
-            delete_tag(t["id"])
-            self.refresh_tags()
-
-
-class ActionEditor(tk.Toplevel):
-    def __init__(self, master, project_id, action=None, on_save=None, refresh_tags_cb=None):
-        super().__init__(master)
-        self.title("Acción")
-        self.geometry("620x520")
-        self.project_id = project_id
-        self.action = action
-        self.on_save = on_save
-        self.refresh_tags_cb = refresh_tags_cb
-
-        self.configure(padx=10, pady=10)
-        ttk.Label(self, text="Descripción:").grid(row=0, column=0, sticky="w")
-        self.desc_entry = ttk.Entry(self, width=60)
-        self.desc_entry.grid(row=0, column=1, columnspan=3, sticky="ew")
-        self.grid_columnconfigure(1, weight=1)
-
-        ttk.Label(self, text="Buscar etiqueta:").grid(row=1, column=0, sticky="w", pady=(10,0))
-        self.search_var = tk.StringVar()
-        self.search_entry = ttk.Entry(self, textvariable=self.search_var)
-        self.search_entry.grid(row=1, column=1, sticky="ew", pady=(10,0))
-        self.search_var.trace_add("write", lambda *args: self._refresh_results())
-
-        ttk.Button(self, text="Nueva etiqueta…", command=self.create_new_tag).grid(row=1, column=2, sticky="w", padx=(8,0), pady=(10,0))
-
-        ttk.Label(self, text="Etiquetas disponibles (doble clic para añadir):").grid(row=2, column=0, columnspan=2, sticky="w", pady=(8,0))
-        results_frame = ttk.Frame(self)
-        results_frame.grid(row=3, column=0, columnspan=3, sticky="nsew")
-        self.grid_rowconfigure(3, weight=1)
-        self.available_list = tk.Listbox(results_frame, height=10, selectmode=tk.BROWSE)
-        vscroll_av = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.available_list.yview)
-        self.available_list.configure(yscrollcommand=vscroll_av.set)
-        self.available_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vscroll_av.pack(side=tk.RIGHT, fill=tk.Y)
-        self.available_list.bind("<Double-1>", lambda e: self.add_selected_from_results())
-        self.search_entry.bind("<Return>", lambda e: self.add_selected_from_results(first_only=True))
-
-        ttk.Button(self, text="Añadir seleccionada", command=self.add_selected_from_results).grid(row=4, column=0, sticky="w", pady=(6,0))
-
-        ttk.Label(self, text="Etiquetas de la acción:").grid(row=5, column=0, sticky="w", pady=(10,0))
-        self.selected_tags_list = tk.Listbox(self, height=8, selectmode=tk.SINGLE)
-        self.selected_tags_list.grid(row=6, column=0, columnspan=2, sticky="nsew")
-        self.grid_rowconfigure(6, weight=1)
-        ttk.Button(self, text="Quitar etiqueta", command=self.remove_selected_tag).grid(row=6, column=2, sticky="n", padx=(8,0))
-
-        self.status_var = tk.BooleanVar(value=False)
-        self.status_check = ttk.Checkbutton(self, text="Marcar como completada", variable=self.status_var)
-        self.status_check.grid(row=7, column=0, columnspan=2, sticky="w", pady=(10,0))
-
-        btn_frame = ttk.Frame(self)
-        btn_frame.grid(row=8, column=0, columnspan=3, sticky="e", pady=(12,0))
-        ttk.Button(btn_frame, text="Guardar", command=self.save).grid(row=0, column=0, padx=(0,6))
-        ttk.Button(btn_frame, text="Cancelar", command=self.destroy).grid(row=0, column=1)
-
-        self.selected_tag_ids = []
-        self._load_all_tags()
-
-        if self.action:
-            self.desc_entry.insert(0, self.action["description"])
-            self.status_var.set(bool(self.action["is_complete"]))
-            current = get_action_tags(self.action["id"])
-            for t in current:
-                self.selected_tags_list.insert(tk.END, t["name"])
-                self.selected_tag_ids.append(t["id"])
-            self._refresh_results()
-
-    def _load_all_tags(self):
-        self.all_tags = list_all_tags()
-        self._refresh_results()
-
-    def _refresh_results(self):
-        term = (self.search_var.get() or "").strip().lower()
-        available = [t for t in self.all_tags if t["id"] not in self.selected_tag_ids]
-        if term:
-            available = [t for t in available if term in t["name"].lower()]
-        self.filtered_available = available
-        self.available_list.delete(0, tk.END)
-        for t in self.filtered_available:
-            self.available_list.insert(tk.END, t["name"])
-
-    def add_selected_from_results(self, first_only=False):
-        idx = None
-        if first_only:
-            if self.filtered_available:
-                idx = 0
-        else:
-            sel = self.available_list.curselection()
-            if sel:
-                idx = sel[0]
-        if idx is None:
-            return
-        t = self.filtered_available[idx]
-        if t["id"] in self.selected_tag_ids:
-            return
-        self.selected_tag_ids.append(t["id"])
-        self.selected_tags_list.insert(tk.END, t["name"])
-        self._refresh_results()
+# ---------------------------- Tag catalogue ---------------------------- #
 
-    def create_new_tag(self):
-        name = simpledialog.askstring("Nueva etiqueta", "Nombre de la etiqueta:", parent=self)
-        if not name:
-            return
-        name = name.strip()
-        if not name:
-            return
-        try:
-            create_tag(name)
-            if self.refresh_tags_cb:
-                self.refresh_tags_cb()
-            self._load_all_tags()
-            self.search_var.set(name)
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", f"Ya existe la etiqueta '{name}'.")
-
-    def remove_selected_tag(self):
-        idx = self.selected_tags_list.curselection()
-        if not idx:
-            return
-        self.selected_tags_list.delete(idx[0])
-        del self.selected_tag_ids[idx[0]]
-        self._refresh_results()
-
-    def save(self):
-        desc = self.desc_entry.get().strip()
-        if not desc:
-            messagebox.showinfo("Info", "La descripción no puede estar vacía.")
-            return
-        if self.action:
-            update_action(self.action["id"], desc, self.selected_tag_ids, is_complete=self.status_var.get())
-        else:
-            create_action(self.project_id, desc, self.selected_tag_ids)
-        if self.on_save:
-            self.on_save()
-        self.destroy()
-
-
-class NextActionDialog(tk.Toplevel):
-    def __init__(self, master, action_row, tags_for_action, focus_project_cb, mark_done_cb):
-        super().__init__(master)
-        self.title("Siguiente acción")
-        self.geometry("520x240")
-        self.configure(padx=12, pady=12)
-
-        ttk.Label(self, text="Proyecto:", font=("TkDefaultFont", 10, "bold")).grid(row=0, column=0, sticky="w")
-        ttk.Label(self, text=action_row["project_name"]).grid(row=0, column=1, sticky="w")
-
-        ttk.Label(self, text="Acción:", font=("TkDefaultFont", 10, "bold")).grid(row=1, column=0, sticky="w", pady=(6,0))
-        ttk.Label(self, text=action_row["description"], wraplength=380).grid(row=1, column=1, sticky="w", pady=(6,0))
-
-        ttk.Label(self, text="Etiquetas:", font=("TkDefaultFont", 10, "bold")).grid(row=2, column=0, sticky="w", pady=(6,0))
-        ttk.Label(self, text=", ".join(tags_for_action)).grid(row=2, column=1, sticky="w", pady=(6,0))
-
-        btnf = ttk.Frame(self)
-        btnf.grid(row=3, column=0, columnspan=2, sticky="e", pady=(16,0))
-        ttk.Button(btnf, text="Marcar como completada", command=lambda: (mark_done_cb(action_row["id"]), self._close())).grid(row=0, column=0, padx=(0,8))
-        ttk.Button(btnf, text="Ir al proyecto", command=lambda: (focus_project_cb(action_row["project_id"], action_row["id"]), self._close())).grid(row=0, column=1)
-        ttk.Button(btnf, text="Cerrar", command=self._close).grid(row=0, column=2, padx=(8,0))
-
-    def _close(self):
-        self.destroy()
-
-
-class MatchingActionsDialog(tk.Toplevel):
-    def __init__(self, master, tag_ids, focus_project_cb, mark_done_cb):
-        super().__init__(master)
-        self.title("Acciones coincidentes (pendientes)")
-        self.geometry("900x420")
-        self.configure(padx=12, pady=12)
-        self.tag_ids = tag_ids
-        self.focus_project_cb = focus_project_cb
-        self.mark_done_cb = mark_done_cb
-
-        ttk.Label(self, text="Resultados", font=("TkDefaultFont", 10, "bold")).pack(anchor="w")
-
-        cols = ("id", "proyecto", "descripcion", "tags", "creada")
-        self.tree = ttk.Treeview(self, columns=cols, show="headings", height=14)
-        self.tree.heading("id", text="ID")
-        self.tree.heading("proyecto", text="Proyecto")
-        self.tree.heading("descripcion", text="Descripción")
-        self.tree.heading("tags", text="Etiquetas")
-        self.tree.heading("creada", text="Creada")
-        self.tree.column("id", width=50, anchor="center")
-        self.tree.column("proyecto", width=160)
-        self.tree.column("descripcion", width=320)
-        self.tree.column("tags", width=200)
-        self.tree.column("creada", width=150, anchor="center")
-        self.tree.pack(fill=tk.BOTH, expand=True, pady=(6,8))
-
-        btnf = ttk.Frame(self)
-        btnf.pack(fill=tk.X)
-        ttk.Button(btnf, text="Marcar como completada", command=self._mark_selected).pack(side=tk.LEFT)
-        ttk.Button(btnf, text="Ir al proyecto", command=self._goto_selected).pack(side=tk.LEFT, padx=(8,0))
-        ttk.Button(btnf, text="Cerrar", command=self.destroy).pack(side=tk.RIGHT)
-
-        self._load_results()
-
-    def _load_results(self):
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
-        rows = find_actions_by_tags(self.tag_ids, include_completed=False)
-        if not rows:
-            messagebox.showinfo("Sin resultados", "No hay acciones pendientes que coincidan con las etiquetas seleccionadas.")
-            self.destroy()
-            return
-        for r in rows:
-            tag_names = r.get("tag_names") if isinstance(r, dict) else r["tag_names"]
-            self.tree.insert("", tk.END, values=(r["id"], r["project_name"], r["description"], tag_names or "", r["created_at"]))
+TagEvent = namedtuple("TagEvent", "version kind tag old_name")
 
-    def _get_selected_action_id(self):
-        sel = self.tree.selection()
-        if not sel:
-            return None
-        vals = self.tree.item(sel[0], "values")
-        return int(vals[0])
+def tag_sort_key(tag):
+    return (tag["name"].lower(), tag["id"])
 
-    def _mark_selected(self):
-        aid = self._get_selected_action_id()
-        if not aid:
-            messagebox.showinfo("Info", "Selecciona una acción en la lista.")
+class TagCatalog:
+    # Process-wide cache of the tags table, indexed by id and by name.
+    # create_tag/rename_tag/delete_tag publish a TagEvent after commit
+    # ("created", "renamed", "deleted"; "reloaded" when the cache is dropped).
+    # Listeners run on the thread that committed the change.
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._by_id = {}
+        self._by_name = {}
+        self._sorted = None
+        self._loaded = False
+        self.version = 0
+
+    def _ensure_loaded(self):
+        if self._loaded:
             return
-        self.mark_done_cb(aid)
-        self._load_results()
-
-    def _goto_selected(self):
-        aid = self._get_selected_action_id()
-        if not aid:
-            messagebox.showinfo("Info", "Selecciona una acción en la lista.")
+        rows = list_all_tags()
+        self._by_id = {r["id"]: {"id": r["id"], "name": r["name"]} for r in rows}
+        self._by_name = {t["name"]: t for t in self._by_id.values()}
+        self._sorted = None
+        self._loaded = True
+
+    def all(self):
+        with self._lock:
+            self._ensure_loaded()
+            if self._sorted is None:
+                self._sorted = sorted(self._by_id.values(), key=tag_sort_key)
+            return list(self._sorted)
+
+    def get(self, tag_id):
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_id.get(tag_id)
+
+    def by_name(self, name):
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_name.get(name)
+
+    def subscribe(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _publish(self, kind, tag, old_name=None):
+        with self._lock:
+            self.version += 1
+            event = TagEvent(self.version, kind, tag, old_name)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+
+    def apply_created(self, tag_id, name):
+        tag = {"id": tag_id, "name": name}
+        with self._lock:
+            if self._loaded:
+                self._by_id[tag_id] = tag
+                self._by_name[name] = tag
+                self._sorted = None
+        self._publish("created", tag)
+
+    def apply_renamed(self, tag_id, new_name, old_name):
+        tag = {"id": tag_id, "name": new_name}
+        with self._lock:
+            if self._loaded:
+                self._by_name.pop(old_name, None)
+                self._by_id[tag_id] = tag
+                self._by_name[new_name] = tag
+                self._sorted = None
+        self._publish("renamed", tag, old_name)
+
+    def apply_deleted(self, tag_id):
+        with self._lock:
+            tag = self._by_id.pop(tag_id, None) if self._loaded else None
+            if tag is not None:
+                self._by_name.pop(tag["name"], None)
+                self._sorted = None
+        self._publish("deleted", tag or {"id": tag_id, "name": None})
+
+    def sync(self, tag_id, name):
+        # Bring one tag in line with the DB (name None: deleted) after a
+        # change made elsewhere; publishes an event only if the cache differs.
+        with self._lock:
+            if not self._loaded:
+                return
+            cached = self._by_id.get(tag_id)
+        if name is None:
+            if cached is not None:
+                self.apply_deleted(tag_id)
+        elif cached is None:
+            self.apply_created(tag_id, name)
+        elif cached["name"] != name:
+            self.apply_renamed(tag_id, name, cached["name"])
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._by_id = {}
+            self._by_name = {}
+            self._sorted = None
+        self._publish("reloaded", None)
+
+tag_catalog = TagCatalog()
+
+
+# ---------------------------- In-memory action indexes ---------------------------- #
+# Indexes over pending actions implement upsert(action_id, created_at,
+# tag_ids), remove(action_id), drop_tag(tag_id) and invalidate(). The DB
+# helpers notify every index in ACTION_INDEXES after their transaction
+# commits; an index that is not loaded yet ignores the notification.
+
+def load_pending_action_tags(conn):
+    tags = {r[0]: set() for r in conn.execute("SELECT id FROM actions WHERE is_complete = 0")}
+    for r in conn.execute("""
+        SELECT at.action_id, at.tag_id FROM action_tags at
+        JOIN actions a ON a.id = at.action_id
+        WHERE a.is_complete = 0
+    """):
+        tags[r[0]].add(r[1])
+    return {aid: frozenset(t) for aid, t in tags.items()}
+
+def notify_action_indexes(method, *args):
+    for index in ACTION_INDEXES:
+        getattr(index, method)(*args)
+
+def refresh_action_indexes(action_id):
+    # Re-read one action after an update whose effect on the indexes is not
+    # known up front (toggles, edits).
+    with connection() as conn:
+        row = conn.execute("SELECT created_at, is_complete FROM actions WHERE id=?", (action_id,)).fetchone()
+        if row is None or row["is_complete"]:
+            notify_action_indexes("remove", action_id)
             return
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT project_id FROM actions WHERE id=?", (aid,))
-        row = cur.fetchone()
-        conn.close()
-        if row:
-            self.focus_project_cb(row["project_id"], aid)
-            self.destroy()
+        tag_ids = [r[0] for r in conn.execute("SELECT tag_id FROM action_tags WHERE action_id=?", (action_id,))]
+    notify_action_indexes("upsert", action_id, row["created_at"], tag_ids)
+
 
+class NextActionIndex:
+    # In-memory view of pending actions for "Siguiente acción". Each action is
+    # keyed by (created_at, id), the order find_next_action_by_tags uses.
+    # For every tag combination that has been queried we keep a sorted list
+    # of matching keys, built lazily by intersecting per-tag id sets and then
+    # patched by the mutation helpers, so "next" is a lookup and "the one
+    # after X" is a bisect.
+    MAX_COMBOS = 64
 
-class App(tk.Tk):
     def __init__(self):
-        super().__init__()
-        self.title(APP_TITLE)
-        self.geometry("1100x640")
-        self.minsize(980, 560)
-
-        self._build_main_area()
-        self._load_projects()
-        self._refresh_filter_tags()
-
-    def _build_main_area(self):
-        main = ttk.Panedwindow(self, orient=tk.HORIZONTAL)
-        main.pack(fill=tk.BOTH, expand=True)
-
-        left = ttk.Frame(main, padding=(10,10))
-        main.add(left, weight=1)
-
-        ttk.Label(left, text="Proyectos").pack(anchor="w")
-
-        # --- Project search ---
-        search_row = ttk.Frame(left)
-        search_row.pack(fill=tk.X, pady=(2,4))
-        self.project_search_var = tk.StringVar()
-        self.project_search_entry = ttk.Entry(search_row, textvariable=self.project_search_var)
-        self.project_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        clear_btn = ttk.Button(search_row, text="Limpiar", width=8, command=lambda: self.project_search_var.set(""))
-        clear_btn.pack(side=tk.LEFT, padx=(6,0))
-        self.project_search_var.trace_add("write", lambda *args: self._apply_project_filter())
-
-        self.projects_list = tk.Listbox(left, height=12, exportselection=False)
-        self.projects_list.pack(fill=tk.BOTH, expand=True, pady=(4,6))
-        self.projects_list.bind("<<ListboxSelect>>", self._on_project_selected)
-
-        proj_btns = ttk.Frame(left)
-        proj_btns.pack(fill=tk.X, pady=(0,6))
-        ttk.Button(proj_btns, text="Agregar proyecto", command=self._add_project).pack(side=tk.LEFT)
-        ttk.Button(proj_btns, text="Renombrar", command=self._rename_project).pack(side=tk.LEFT, padx=(6,0))
-        ttk.Button(proj_btns, text="Eliminar", command=self._delete_project).pack(side=tk.LEFT, padx=(6,0))
-
-        center = ttk.Frame(main, padding=(10,10))
-        main.add(center, weight=3)
-
-        ttk.Label(center, text="Acciones del proyecto seleccionado").pack(anchor="w")
-        columns = ("id", "descripcion", "tags", "estado", "creada")
-        self.actions_tree = ttk.Treeview(center, columns=columns, show="headings", height=16)
-        self.actions_tree.heading("id", text="ID")
-        self.actions_tree.heading("descripcion", text="Descripción")
-        self.actions_tree.heading("tags", text="Etiquetas")
-        self.actions_tree.heading("estado", text="Estado")
-        self.actions_tree.heading("creada", text="Creada")
-        self.actions_tree.column("id", width=40, anchor="center")
-        self.actions_tree.column("descripcion", width=360)
-        self.actions_tree.column("tags", width=240)
-        self.actions_tree.column("estado", width=100, anchor="center")
-        self.actions_tree.column("creada", width=180, anchor="center")
-        self.actions_tree.pack(fill=tk.BOTH, expand=True, pady=(4,6))
-
-        self.actions_tree.bind("<Double-1>", self._edit_selected_action)
-
-        act_btns = ttk.Frame(center)
-        act_btns.pack(fill=tk.X)
-        ttk.Button(act_btns, text="Agregar acción", command=self._add_action).pack(side=tk.LEFT)
-        ttk.Button(act_btns, text="Editar", command=self._edit_selected_action).pack(side=tk.LEFT, padx=(6,0))
-        ttk.Button(act_btns, text="Alternar completa", command=self._toggle_selected_action).pack(side=tk.LEFT, padx=(6,0))
-        ttk.Button(act_btns, text="Eliminar", command=self._delete_selected_action).pack(side=tk.LEFT, padx=(6,0))
-
-        right = ttk.Frame(main, padding=(10,10))
-        main.add(right, weight=1)
-
-        ttk.Label(right, text="Filtrar por etiquetas").pack(anchor="w")
-
-        list_frame = ttk.Frame(right)
-        list_frame.pack(fill=tk.BOTH, expand=True, pady=(4,6))
-
-        self.filter_tags_list = tk.Listbox(list_frame, selectmode=tk.EXTENDED, exportselection=False)
-        vscroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.filter_tags_list.yview)
-        self.filter_tags_list.configure(yscrollcommand=vscroll.set)
-
-        self.filter_tags_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vscroll.pack(side=tk.RIGHT, fill=tk.Y)
-
-        ttk.Button(right, text="Siguiente acción", command=self._show_next_action).pack(fill=tk.X, pady=(6,4))
-        ttk.Button(right, text="Ver acciones coincidentes", command=self._show_matching_actions).pack(fill=tk.X, pady=(0,4))
-        ttk.Button(right, text="Gestionar etiquetas…", command=self._open_tag_manager).pack(fill=tk.X)
-
-    # -------- Projects filtering -------- #
-    def _apply_project_filter(self):
-        term = (self.project_search_var.get() or "").strip().lower()
-        current = self._get_selected_project()
-        current_id = current["id"] if current else None
-
-        if term:
-            self._filtered_projects = [p for p in self._projects_cache if term in p["name"].lower()]
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._keys = {}
+        self._tags = {}
+        self._by_tag = {}
+        self._combos = OrderedDict()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with connection() as conn:
+            self._keys = {
+                r["id"]: (r["created_at"], r["id"])
+                for r in conn.execute("SELECT id, created_at FROM actions WHERE is_complete = 0")
+            }
+            self._tags = load_pending_action_tags(conn)
+        self._by_tag = {}
+        for aid, tag_ids in self._tags.items():
+            for tid in tag_ids:
+                self._by_tag.setdefault(tid, set()).add(aid)
+        self._combos.clear()
+        self._loaded = True
+
+    def _combo(self, tag_ids):
+        combo = self._combos.get(tag_ids)
+        if combo is not None:
+            self._combos.move_to_end(tag_ids)
+            return combo
+        if not tag_ids:
+            ids = self._keys
         else:
-            self._filtered_projects = list(self._projects_cache)
-
-        self.projects_list.delete(0, tk.END)
-        for p in self._filtered_projects:
-            self.projects_list.insert(tk.END, p["name"])
-
-        target_index = None
-        if current_id is not None:
-            for i, p in enumerate(self._filtered_projects):
-                if p["id"] == current_id:
-                    target_index = i
-                    break
-        if target_index is None and self._filtered_projects:
-            target_index = 0
-        if target_index is not None:
-            self.projects_list.selection_set(target_index)
-            self.projects_list.see(target_index)
-            self._on_project_selected(None)
+            postings = sorted((self._by_tag.get(tid, set()) for tid in tag_ids), key=len)
+            ids = set(postings[0]).intersection(*postings[1:])
+        combo = sorted(self._keys[aid] for aid in ids)
+        self._combos[tag_ids] = combo
+        if len(self._combos) > self.MAX_COMBOS:
+            self._combos.popitem(last=False)
+        return combo
+
+    def next_id(self, tag_ids, after=None):
+        # `after` is the (created_at, id) key of the action to skip past.
+        with self._lock:
+            self._ensure_loaded()
+            combo = self._combo(frozenset(tag_ids))
+            i = bisect_right(combo, tuple(after)) if after is not None else 0
+            return combo[i][1] if i < len(combo) else None
+
+    def upsert(self, action_id, created_at, tag_ids):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._discard(action_id)
+            key = (created_at, action_id)
+            tags = frozenset(tag_ids)
+            self._keys[action_id] = key
+            self._tags[action_id] = tags
+            for tid in tags:
+                self._by_tag.setdefault(tid, set()).add(action_id)
+            for combo_tags, combo in self._combos.items():
+                if combo_tags <= tags:
+                    insort(combo, key)
+
+    def remove(self, action_id):
+        with self._lock:
+            if self._loaded:
+                self._discard(action_id)
+
+    def _discard(self, action_id):
+        key = self._keys.pop(action_id, None)
+        if key is None:
+            return
+        tags = self._tags.pop(action_id)
+        for tid in tags:
+            self._by_tag[tid].discard(action_id)
+        for combo_tags, combo in self._combos.items():
+            if combo_tags <= tags:
+                i = bisect_left(combo, key)
+                if i < len(combo) and combo[i] == key:
+                    del combo[i]
+
+    def drop_tag(self, tag_id):
+        with self._lock:
+            if not self._loaded:
+                return
+            for aid in self._by_tag.pop(tag_id, ()):
+                self._tags[aid] = self._tags[aid] - {tag_id}
+            for combo_tags in [c for c in self._combos if tag_id in c]:
+                del self._combos[combo_tags]
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._keys = {}
+            self._tags = {}
+            self._by_tag = {}
+            self._combos.clear()
+
+next_actions = NextActionIndex()
+
+
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+class Bitmap:
+    # Roaring-style bitmap: positions are split into 65536-wide chunks and
+    # only non-empty chunks are stored, each as a Python int bitset, so
+    # AND/OR/AND-NOT run chunk by chunk in C.
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks=None):
+        self.chunks = chunks if chunks is not None else {}
+
+    @classmethod
+    def from_positions(cls, positions):
+        buffers = {}
+        for pos in positions:
+            buf = buffers.get(pos >> CHUNK_BITS)
+            if buf is None:
+                buf = buffers[pos >> CHUNK_BITS] = bytearray(1 << (CHUNK_BITS - 3))
+            lo = pos & CHUNK_MASK
+            buf[lo >> 3] |= 1 << (lo & 7)
+        return cls({hi: int.from_bytes(buf, "little") for hi, buf in buffers.items()})
+
+    def copy(self):
+        return Bitmap(dict(self.chunks))
+
+    def add(self, pos):
+        hi = pos >> CHUNK_BITS
+        self.chunks[hi] = self.chunks.get(hi, 0) | (1 << (pos & CHUNK_MASK))
+
+    def discard(self, pos):
+        hi = pos >> CHUNK_BITS
+        bits = self.chunks.get(hi, 0) & ~(1 << (pos & CHUNK_MASK))
+        if bits:
+            self.chunks[hi] = bits
         else:
-            self._reload_actions_for_current_project()
-
-    def _refresh_projects_view_only(self):
-        self.projects_list.delete(0, tk.END)
-        for p in self._filtered_projects:
-            self.projects_list.insert(tk.END, p["name"])
-
-    def _load_projects(self):
-        self._projects_cache = list_projects()
-        if not hasattr(self, "_filtered_projects"):
-            self._filtered_projects = list(self._projects_cache)
-        self._apply_project_filter()
-
-    def _get_selected_project(self):
-        idxs = self.projects_list.curselection()
-        if not idxs:
-            return None
-        return self._filtered_projects[idxs[0]]
+            self.chunks.pop(hi, None)
+
+    def __contains__(self, pos):
+        return bool(self.chunks.get(pos >> CHUNK_BITS, 0) >> (pos & CHUNK_MASK) & 1)
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self.chunks.values())
+
+    def __and__(self, other):
+        small, big = (self, other) if len(self.chunks) <= len(other.chunks) else (other, self)
+        out = {}
+        for hi, bits in small.chunks.items():
+            both = bits & big.chunks.get(hi, 0)
+            if both:
+                out[hi] = both
+        return Bitmap(out)
+
+    def __or__(self, other):
+        out = dict(self.chunks)
+        for hi, bits in other.chunks.items():
+            out[hi] = out.get(hi, 0) | bits
+        return Bitmap(out)
+
+    def __sub__(self, other):
+        out = {}
+        for hi, bits in self.chunks.items():
+            rest = bits & ~other.chunks.get(hi, 0)
+            if rest:
+                out[hi] = rest
+        return Bitmap(out)
+
+    def iter_from(self, start=0):
+        # Walk 64-bit words: peeling bits off the whole 8 KiB chunk int would
+        # cost O(chunk) per set bit.
+        for hi in sorted(self.chunks):
+            base = hi << CHUNK_BITS
+            if base + (1 << CHUNK_BITS) <= start:
+                continue
+            words = array("Q", self.chunks[hi].to_bytes(1 << (CHUNK_BITS - 3), "little"))
+            if sys.byteorder == "big":
+                words.byteswap()
+            first = max(start - base, 0)
+            first_word = first >> 6
+            for wi in range(first_word, len(words)):
+                w = words[wi]
+                if wi == first_word:
+                    w &= ~((1 << (first & 63)) - 1)
+                while w:
+                    low = w & -w
+                    yield base + (wi << 6) + low.bit_length() - 1
+                    w ^= low
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+
+TagFilter = namedtuple("TagFilter", "all_of any_of none_of", defaults=((), (), ()))
+
+def is_all_of_filter(tag_filter):
+    return not tag_filter.any_of and not tag_filter.none_of
+
+class TagBitmapIndex:
+    # Inverted index tag_id -> Bitmap of pending actions. Every action owns a
+    # slot assigned in (created_at, id) order, so iterating a bitmap yields
+    # ids in creation order. New actions append a slot; an action created
+    # with an older timestamp (e.g. an import) forces a rebuild. _seq is the
+    # change-feed sequence the index is known to reflect.
+    SNAPSHOT_VERSION = 2
 
-    def _on_project_selected(self, event):
-        self._reload_actions_for_current_project()
-
-    def _reload_actions_for_current_project(self):
-        p = self._get_selected_project()
-        self.actions_tree.delete(*self.actions_tree.get_children())
-        if not p:
-            return
-        actions = list_actions(p["id"])
-        for a in actions:
-            tag_names = [t["name"] for t in get_action_tags(a["id"])]
-            estado = "Completada" if a["is_complete"] else "Pendiente"
-            self.actions_tree.insert("", tk.END, values=(a["id"], a["description"], ", ".join(tag_names), estado, a["created_at"]))
-
-    def _refresh_filter_tags(self):
-        selected_names = [self.filter_tags_list.get(i) for i in self.filter_tags_list.curselection()]
-        self.filter_tags_list.delete(0, tk.END)
-        self.all_tags = list_all_tags()
-        for t in self.all_tags:
-            self.filter_tags_list.insert(tk.END, t["name"])
-        to_select = []
-        for i, t in enumerate(self.all_tags):
-            if t["name"] in selected_names:
-                to_select.append(i)
-        for i in to_select:
-            self.filter_tags_list.selection_set(i)
-
-    def _get_selected_filter_tag_ids(self):
-        indices = self.filter_tags_list.curselection()
-        ids = []
-        for i in indices:
-            ids.append(self.all_tags[i]["id"])
-        return ids
-
-    def _show_next_action(self):
-        tag_ids = self._get_selected_filter_tag_ids()
-        row = find_next_action_by_tags(tag_ids)
-        if not row:
-            messagebox.showinfo("Sin resultados", "No hay acciones pendientes que coincidan con las etiquetas seleccionadas.")
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._slot_of = {}
+        self._slot_ids = []
+        self._slot_keys = []
+        self._pending = Bitmap()
+        self._by_tag = {}
+        self._tags = {}
+        self._seq = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
             return
-        tags = [t["name"] for t in get_action_tags(row["id"])]
-        NextActionDialog(
-            self,
-            row,
-            tags,
-            focus_project_cb=self._focus_project_and_action,
-            mark_done_cb=self._mark_action_done_and_refresh,
-        )
-
-    def _show_matching_actions(self):
-        tag_ids = self._get_selected_filter_tag_ids()
-        MatchingActionsDialog(
-            self,
-            tag_ids,
-            focus_project_cb=self._focus_project_and_action,
-            mark_done_cb=self._mark_action_done_and_refresh
-        )
-
-    def _open_tag_manager(self):
-        TagManager(self, on_close=self._refresh_after_tag_manager)
-
-    def _refresh_after_tag_manager(self):
-        self._refresh_filter_tags()
-        self._reload_actions_for_current_project()
-
-    def _mark_action_done_and_refresh(self, action_id):
-        toggle_action_status(action_id)
-        self._reload_actions_for_current_project()
-
-    def _focus_project_and_action(self, project_id, action_id):
-        target_index = None
-        for idx, p in enumerate(getattr(self, "_filtered_projects", [])):
-            if p["id"] == project_id:
-                target_index = idx
-                break
-        if target_index is None:
-            self.project_search_var.set("")
-            for idx, p in enumerate(self._filtered_projects):
-                if p["id"] == project_id:
-                    target_index = idx
-                    break
-
-        if target_index is not None:
-            self.projects_list.selection_clear(0, tk.END)
-            self.projects_list.selection_set(target_index)
-            self.projects_list.see(target_index)
-            self._on_project_selected(None)
-            for iid in self.actions_tree.get_children():
-                if self.actions_tree.set(iid, "id") == str(action_id):
-                    self.actions_tree.selection_set(iid)
-                    self.actions_tree.see(iid)
+        if not self.load_snapshot():
+            self.rebuild()
+
+    def rebuild(self):
+        with self._lock, connection() as conn:
+            self._reset()
+            # Read first: anything committed during the rebuild is past _seq
+            # and gets replayed before a snapshot is saved.
+            self._seq = latest_change_seq(conn)
+            for r in conn.execute("SELECT id, created_at FROM actions ORDER BY created_at, id"):
+                self._slot_of[r[0]] = len(self._slot_ids)
+                self._slot_ids.append(r[0])
+                self._slot_keys.append((r[1], r[0]))
+            self._tags = load_pending_action_tags(conn)
+            positions = {}
+            for aid, tag_ids in self._tags.items():
+                slot = self._slot_of[aid]
+                for tid in tag_ids:
+                    positions.setdefault(tid, []).append(slot)
+            self._pending = Bitmap.from_positions(self._slot_of[aid] for aid in self._tags)
+            self._by_tag = {tid: Bitmap.from_positions(p) for tid, p in positions.items()}
+            self._loaded = True
+
+    def save_snapshot(self, path=None):
+        # The snapshot is keyed on the feed sequence it reflects. The feed
+        # since _seq is replayed first: entries carry the current rows, so
+        # writes already applied here are harmless and those of other
+        # processes are caught up. A gap or reload drops the index instead.
+        path = path or snapshot_path("tags")
+        with self._lock:
+            if not self._loaded:
+                return False
+            feed = ChangeFeed()
+            feed.seq = self._seq
+            update = feed.poll()
+            while update is not None:
+                feed.apply(update)
+                update = feed.poll()
+            if not self._loaded:
+                return False
+            self._seq = feed.seq
+            data = {
+                "version": self.SNAPSHOT_VERSION,
+                "seq": self._seq,
+                "slot_ids": self._slot_ids,
+                "slot_keys": self._slot_keys,
+                "pending": self._pending.chunks,
+                "by_tag": {tid: b.chunks for tid, b in self._by_tag.items()},
+                "tags": {aid: tuple(t) for aid, t in self._tags.items()},
+            }
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(tmp, path)
+            return True
+
+    def load_snapshot(self, path=None):
+        path = path or snapshot_path("tags")
+        try:
+            with open(path, "rb") as f:
+                data = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        with self._lock, connection() as conn:
+            if not isinstance(data, dict) or data.get("version") != self.SNAPSHOT_VERSION:
+                return False
+            if data["seq"] != latest_change_seq(conn):
+                return False
+            self._reset()
+            self._seq = data["seq"]
+            self._slot_ids = data["slot_ids"]
+            self._slot_keys = [tuple(k) for k in data["slot_keys"]]
+            self._slot_of = {aid: i for i, aid in enumerate(self._slot_ids)}
+            self._pending = Bitmap(data["pending"])
+            self._by_tag = {tid: Bitmap(chunks) for tid, chunks in data["by_tag"].items()}
+            self._tags = {aid: frozenset(t) for aid, t in data["tags"].items()}
+            self._loaded = True
+            return True
+
+    def query(self, tag_filter):
+        with self._lock:
+            self._ensure_loaded()
+            empty = Bitmap()
+            result = self._pending
+            for tid in tag_filter.all_of:
+                result = result & self._by_tag.get(tid, empty)
+            if tag_filter.any_of:
+                any_bits = Bitmap()
+                for tid in tag_filter.any_of:
+                    any_bits = any_bits | self._by_tag.get(tid, empty)
+                result = result & any_bits
+            for tid in tag_filter.none_of:
+                result = result - self._by_tag.get(tid, empty)
+            return result
+
+    def ids(self, bitmap, after=None, limit=None):
+        # Action ids of `bitmap` in creation order, strictly after the
+        # (created_at, id) key `after`.
+        with self._lock:
+            start = bisect_right(self._slot_keys, tuple(after)) if after is not None else 0
+            out = []
+            for slot in bitmap.iter_from(start):
+                out.append(self._slot_ids[slot])
+                if limit is not None and len(out) >= limit:
                     break
+            return out
+
+    def creation_key(self, action_id):
+        with self._lock:
+            return self._slot_keys[self._slot_of[action_id]]
+
+    def upsert(self, action_id, created_at, tag_ids):
+        with self._lock:
+            if not self._loaded:
+                return
+            slot = self._slot_of.get(action_id)
+            if slot is None:
+                key = (created_at, action_id)
+                if self._slot_keys and key < self._slot_keys[-1]:
+                    self._loaded = False
+                    self._reset()
+                    return
+                slot = self._slot_of[action_id] = len(self._slot_ids)
+                self._slot_ids.append(action_id)
+                self._slot_keys.append(key)
+            self._clear(action_id, slot)
+            tags = frozenset(tag_ids)
+            self._tags[action_id] = tags
+            self._pending.add(slot)
+            for tid in tags:
+                self._by_tag.setdefault(tid, Bitmap()).add(slot)
+
+    def _clear(self, action_id, slot):
+        self._pending.discard(slot)
+        for tid in self._tags.pop(action_id, ()):
+            self._by_tag[tid].discard(slot)
+
+    def remove(self, action_id):
+        with self._lock:
+            if not self._loaded:
+                return
+            slot = self._slot_of.get(action_id)
+            if slot is not None:
+                self._clear(action_id, slot)
+
+    def drop_tag(self, tag_id):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._by_tag.pop(tag_id, None)
+            for aid, tags in self._tags.items():
+                if tag_id in tags:
+                    self._tags[aid] = tags - {tag_id}
+
+    def warm(self):
+        with self._lock:
+            self._ensure_loaded()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._reset()
+
+tag_bitmaps = TagBitmapIndex()
+
+ACTION_INDEXES = (next_actions, tag_bitmaps)
+
+def snapshot_path(name):
+    return f"{DB_PATH}.{name}.idx"
+
+def _rows_for_ids(conn, ids, pending=False):
+    # pending re-checks is_complete, so ids from an in-memory index that
+    # lags the DB never bring back completed actions.
+    rows = {}
+    status = "AND a.is_complete = 0" if pending else ""
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for r in conn.execute(f"""
+            SELECT a.*, p.name AS project_name, {_TAG_NAMES_SUBQUERY}
+            FROM actions a
+            JOIN projects p ON p.id = a.project_id
+            WHERE a.id IN ({placeholders}) {status}
+        """, chunk):
+            rows[r["id"]] = r
+    return [rows[aid] for aid in ids if aid in rows]
+
+@instrumented
+def find_actions_by_filter(tag_filter, after=None, limit=None):
+    # Pending actions matching tag_filter in creation order. Pages come from
+    # the bitmap index, so each one costs O(limit) however broad the filter.
+    if after is not None and not isinstance(after, tuple):
+        after = action_creation_key(after)
+    ids = tag_bitmaps.ids(tag_bitmaps.query(tag_filter), after=after, limit=limit)
+    with connection() as conn:
+        return _rows_for_ids(conn, ids, pending=True)
+
+@instrumented
+def find_next_action_by_filter(tag_filter, after=None):
+    if is_all_of_filter(tag_filter):
+        return find_next_action_by_tags(tag_filter.all_of, after=after)
+    if after is not None and not isinstance(after, tuple):
+        after = action_creation_key(after)
+    # Ids the bitmaps still hold but another process has completed are
+    # skipped until the change feed catches the index up.
+    bitmap = tag_bitmaps.query(tag_filter)
+    with connection() as conn:
+        while True:
+            ids = tag_bitmaps.ids(bitmap, after=after, limit=1)
+            if not ids:
+                return None
+            rows = _rows_for_ids(conn, ids, pending=True)
+            if rows:
+                return rows[0]
+            after = tag_bitmaps.creation_key(ids[0])
+
+
+# ---------------------------- Batch writes ---------------------------- #
+# ActionBatch records edits to many actions and applies them in a single
+# transaction, one executemany per kind of statement, instead of one helper
+# call (and transaction) per action.
+
+ChangeSet = namedtuple("ChangeSet", "created updated deleted tags", defaults=(None,))
+TagDiff = namedtuple("TagDiff", "added removed")
+
+def _tag_ids_by_action(conn, action_ids):
+    tags = {aid: [] for aid in action_ids}
+    for i in range(0, len(action_ids), 500):
+        chunk = action_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for r in conn.execute(f"SELECT action_id, tag_id FROM action_tags WHERE action_id IN ({placeholders})", chunk):
+            tags[r[0]].append(r[1])
+    return tags
+
+def _tag_diffs(current, wanted):
+    # {action_id: TagDiff} for the actions whose tag set actually changes.
+    diffs = {}
+    for aid, tag_ids in wanted.items():
+        have = current.get(aid, ())
+        added = tuple(t for t in tag_ids if t not in have)
+        removed = tuple(t for t in have if t not in tag_ids)
+        if added or removed:
+            diffs[aid] = TagDiff(added, removed)
+    return diffs
+
+def _notify_changes(changes, tags, statuses):
+    # Description-only edits do not affect the indexes.
+    updated = [r for r in changes.updated if r["id"] in statuses or r["id"] in changes.tags]
+    for row in changes.created + updated:
+        if row["is_complete"]:
+            notify_action_indexes("remove", row["id"])
+        else:
+            notify_action_indexes("upsert", row["id"], row["created_at"], tags[row["id"]])
+    for row in changes.deleted:
+        notify_action_indexes("remove", row["id"])
+
+class ActionBatch:
+    # Unit of work for action edits. Nothing touches the DB until commit(),
+    # which applies the recorded edits in a fixed order (create, description,
+    # status, set tags, add tags, remove tags, delete) and returns a
+    # ChangeSet of list-shaped rows: created and updated actions as they are
+    # now, deleted ones as they were, plus a TagDiff for every action whose
+    # tags changed. Tag edits are folded into one target set per action and
+    # only the difference from the stored tags is written. Edits of ids that
+    # do not exist are skipped, except added tags, which fail on the
+    # foreign key.
+    def __init__(self):
+        self.creates = []
+        self.descriptions = {}
+        self.statuses = {}
+        self.tag_sets = {}
+        self.tag_adds = {}
+        self.tag_removes = {}
+        self.deletes = {}
+
+    def __len__(self):
+        return (len(self.creates) + len(self.descriptions) + len(self.statuses) + len(self.tag_sets)
+                + len(self.tag_adds) + len(self.tag_removes) + len(self.deletes))
+
+    def create(self, project_id, description, tag_ids=()):
+        self.creates.append((project_id, description, list(tag_ids)))
+        return self
+
+    def set_description(self, action_id, description):
+        self.descriptions[action_id] = description
+        return self
+
+    def set_status(self, action_ids, is_complete):
+        for aid in action_ids:
+            self.statuses[aid] = 1 if is_complete else 0
+        return self
+
+    def set_tags(self, action_id, tag_ids):
+        self.tag_sets[action_id] = list(dict.fromkeys(tag_ids))
+        return self
+
+    def add_tags(self, action_ids, tag_ids):
+        for aid in action_ids:
+            self.tag_adds.setdefault(aid, {}).update(dict.fromkeys(tag_ids))
+        return self
+
+    def remove_tags(self, action_ids, tag_ids):
+        for aid in action_ids:
+            self.tag_removes.setdefault(aid, {}).update(dict.fromkeys(tag_ids))
+        return self
+
+    def delete(self, action_ids):
+        self.deletes.update(dict.fromkeys(action_ids))
+        return self
+
+    def commit(self):
+        return apply_action_batch(self)
+
+@instrumented
+def apply_action_batch(batch):
+    now = datetime.datetime.now().isoformat()
+    # Every batch reads (deleted rows, stored text and tags) before it
+    # writes, so it takes the write lock up front.
+    with transaction(immediate=True) as conn:
+        deleted = _rows_for_ids(conn, list(batch.deletes))
+
+        created_ids = []
+        if batch.creates:
+            next_id = _next_action_id(conn)
+            positions = {}
+            for project_id, count in Counter(c[0] for c in batch.creates).items():
+                positions[project_id] = position_allocator.allocate(conn, project_id, count)
+            action_rows, tag_rows = [], []
+            for project_id, description, tag_ids in batch.creates:
+                action_rows.append((next_id, project_id, description, positions[project_id], now))
+                positions[project_id] += POSITION_GAP
+                tag_rows.extend((next_id, tid) for tid in tag_ids)
+                created_ids.append(next_id)
+                next_id += 1
+            conn.executemany("""
+                INSERT INTO actions(id, project_id, description, is_complete, position, created_at)
+                VALUES (?, ?, ?, 0, ?, ?)
+            """, action_rows)
+            conn.executemany("INSERT OR IGNORE INTO action_tags(action_id, tag_id) VALUES (?, ?)", tag_rows)
+
+        if batch.descriptions:
+            # Unchanged text is not rewritten, so the FTS and change-feed
+            # triggers only fire for real edits.
+            stored = _rows_by_id(conn, "SELECT id, description FROM actions WHERE id IN ({})", list(batch.descriptions))
+            conn.executemany("UPDATE actions SET description=? WHERE id=?",
+                             [(d, aid) for aid, d in batch.descriptions.items()
+                              if aid in stored and stored[aid]["description"] != d])
+        if batch.statuses:
+            conn.executemany(SET_STATUS_SQL, [(s, now, aid) for aid, s in batch.statuses.items()])
+        tag_diffs = {}
+        tagged = list(dict.fromkeys([*batch.tag_sets, *batch.tag_adds, *batch.tag_removes]))
+        if tagged:
+            current = {aid: dict.fromkeys(tids) for aid, tids in _tag_ids_by_action(conn, tagged).items()}
+            wanted = {}
+            for aid in tagged:
+                tids = dict.fromkeys(batch.tag_sets[aid]) if aid in batch.tag_sets else dict(current[aid])
+                tids.update(batch.tag_adds.get(aid, {}))
+                for tid in batch.tag_removes.get(aid, ()):
+                    tids.pop(tid, None)
+                wanted[aid] = tids
+            tag_diffs = _tag_diffs(current, wanted)
+            conn.executemany("DELETE FROM action_tags WHERE action_id=? AND tag_id=?",
+                             [(aid, tid) for aid, d in tag_diffs.items() for tid in d.removed])
+            conn.executemany("INSERT INTO action_tags(action_id, tag_id) VALUES (?, ?)",
+                             [(aid, tid) for aid, d in tag_diffs.items() for tid in d.added])
+        if batch.deletes:
+            conn.executemany("DELETE FROM actions WHERE id=?", [(aid,) for aid in batch.deletes])
+
+        touched = {}
+        for edits in (batch.descriptions, batch.statuses, batch.tag_sets, batch.tag_adds, batch.tag_removes):
+            touched.update(dict.fromkeys(aid for aid in edits if aid not in batch.deletes))
+        changes = ChangeSet(
+            created=_rows_for_ids(conn, created_ids),
+            updated=_rows_for_ids(conn, list(touched)),
+            deleted=deleted,
+            tags={aid: d for aid, d in tag_diffs.items() if aid not in batch.deletes},
+        )
+        tags = _tag_ids_by_action(conn, [r["id"] for r in changes.created + changes.updated])
+        statuses = dict(batch.statuses)
+        after_commit(lambda: _notify_changes(changes, tags, statuses))
+        return changes
+
+
+# ---------------------------- Change feed ---------------------------- #
+# ChangeFeed follows the `changes` table that the triggers fill. poll() only
+# reads: it returns a FeedUpdate with the current rows of everything that
+# changed since the last poll (None for deleted rows). apply() brings the
+# process-wide caches in line with it. Writes made by this process come back
+# through the feed too; applying them again is a no-op. A consumer that
+# falls further behind than the pruned history, or sees a bulk "reload"
+# marker, gets reload=True and should rebuild from scratch.
+
+CHANGES_POLL_MS = 1000
+CHANGES_PAGE_SIZE = 1000
+CHANGES_KEEP = 10_000
+
+FeedUpdate = namedtuple("FeedUpdate", "seq reload projects tags actions action_tags")
+
+def latest_change_seq(conn):
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+def _rows_by_id(conn, sql, ids):
+    rows = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows.update((r["id"], r) for r in conn.execute(sql.format(placeholders), chunk))
+    return rows
 
-    # -------------------- Project CRUD -------------------- #
-    def _add_project(self):
-        name = simpledialog.askstring("Nuevo proyecto", "Nombre del proyecto:", parent=self)
-        if not name:
-            return
-        name = name.strip()
-        if not name:
-            return
-        try:
-            create_project(name)
-            self._load_projects()
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", f"Ya existe un proyecto llamado '{name}'.")
-
-    def _rename_project(self):
-        p = self._get_selected_project()
-        if not p:
-            messagebox.showinfo("Info", "Selecciona un proyecto para renombrar.")
-            return
-        new_name = simpledialog.askstring("Renombrar proyecto", "Nuevo nombre:", initialvalue=p["name"], parent=self)
-        if not new_name:
-            return
-        new_name = new_name.strip()
-        if not new_name:
-            return
-        try:
-            update_project(p["id"], new_name)
-            self._load_projects()
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", f"Ya existe un proyecto llamado '{new_name}'.")
-
-    def _delete_project(self):
-        p = self._get_selected_project()
-        if not p:
-            messagebox.showinfo("Info", "Selecciona un proyecto para eliminar.")
-            return
-        if messagebox.askyesno("Confirmar", f"¿Eliminar el proyecto '{p['name']}' y todas sus acciones?"):
-            delete_project(p["id"])
-            self._load_projects()
-
-    # -------------------- Action CRUD -------------------- #
-    def _get_selected_action_id(self):
-        sel = self.actions_tree.selection()
-        if not sel:
+@instrumented
+def prune_changes(keep=CHANGES_KEEP):
+    # Trims the feed to its last `keep` entries, but only once twice that
+    # many have piled up, so an idle database is never written to.
+    with connection() as conn:
+        first, last = conn.execute("SELECT MIN(seq), MAX(seq) FROM changes").fetchone()
+        if first is None or last - first < 2 * keep:
+            return 0
+        with transaction():
+            return conn.execute("DELETE FROM changes WHERE seq <= ?", (last - keep,)).rowcount
+
+class ChangeFeed:
+    def __init__(self):
+        self.seq = None
+
+    def start(self):
+        # Changes up to now are assumed to be in whatever the caller loads next.
+        with connection() as conn:
+            self.seq = latest_change_seq(conn)
+        return self.seq
+
+    @instrumented
+    def poll(self, limit=CHANGES_PAGE_SIZE):
+        if self.seq is None:
+            self.start()
             return None
-        values = self.actions_tree.item(sel[0], "values")
-        return int(values[0])
-
-    def _add_action(self):
-        p = self._get_selected_project()
-        if not p:
-            messagebox.showinfo("Info", "Primero crea o selecciona un proyecto.")
-            return
-        ActionEditor(self, p["id"], action=None, on_save=self._reload_actions_for_current_project, refresh_tags_cb=self._refresh_filter_tags)
+        with connection() as conn:
+            if latest_change_seq(conn) == self.seq:
+                return None
+            rows = conn.execute("SELECT seq, kind, row_id FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                                (self.seq, limit + 1)).fetchall()
+            if not rows:
+                return None
+            gap = rows[0]["seq"] != self.seq + 1 and conn.execute(
+                "SELECT 1 FROM changes WHERE seq <= ? LIMIT 1", (self.seq,)).fetchone() is None
+            if gap or len(rows) > limit or any(r["kind"] == "reload" for r in rows):
+                self.seq = latest_change_seq(conn)
+                return FeedUpdate(self.seq, True, {}, {}, {}, {})
+            changed = {"project": {}, "tag": {}, "action": {}}
+            for r in rows:
+                changed[r["kind"]][r["row_id"]] = None
+            projects = _rows_by_id(conn, "SELECT * FROM projects WHERE id IN ({})", list(changed["project"]))
+            tags = _rows_by_id(conn, "SELECT * FROM tags WHERE id IN ({})", list(changed["tag"]))
+            action_ids = list(changed["action"])
+            actions = {r["id"]: r for r in _rows_for_ids(conn, action_ids)}
+            action_tags = _tag_ids_by_action(conn, list(actions))
+            self.seq = rows[-1]["seq"]
+        return FeedUpdate(
+            self.seq, False,
+            {pid: projects.get(pid) for pid in changed["project"]},
+            {tid: tags.get(tid) for tid in changed["tag"]},
+            {aid: actions.get(aid) for aid in action_ids},
+            action_tags,
+        )
 
-    def _edit_selected_action(self, event=None):
-        p = self._get_selected_project()
-        if not p:
+    def apply(self, update):
+        if update.reload:
+            tag_catalog.invalidate()
+            notify_action_indexes("invalidate")
+            position_allocator.invalidate()
             return
-        aid = self._get_selected_action_id()
-        if not aid:
-            messagebox.showinfo("Info", "Selecciona una acción para editar.")
+        for tag_id, row in update.tags.items():
+            tag_catalog.sync(tag_id, row["name"] if row else None)
+        for action_id, row in update.actions.items():
+            if row is None or row["is_complete"]:
+                notify_action_indexes("remove", action_id)
+            else:
+                notify_action_indexes("upsert", action_id, row["created_at"], update.action_tags[action_id])
+            if row is not None:
+                position_allocator.invalidate(row["project_id"])
+
+
+# ---------------------------- Bulk import ---------------------------- #
+
+# One record per action: project, description, tags, is_complete,
+# created_at and completed_at (the import time if a completed record has
+# none). In CSV the tags are a single ";"-separated column; in NDJSON
+# a list or the same string. A record without description only ensures the
+# project exists. Unknown projects and tags are created.
+IMPORT_BATCH_SIZE = 20000
+CSV_TAG_SEPARATOR = ";"
+ImportStats = namedtuple("ImportStats", "records projects tags actions seconds")
+
+def import_rate(stats):
+    return stats.records / stats.seconds if stats.seconds else 0.0
+
+def read_csv_records(f):
+    import csv
+    yield from csv.DictReader(f)
+
+def read_ndjson_records(f):
+    import json
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+def record_format(path):
+    name = path.lower().removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    raise ValueError(f"No se reconoce el formato de '{path}' (se espera .csv o .ndjson, opcionalmente .gz).")
+
+GZIP_LEVEL = 6
+
+def open_text(path, mode="r"):
+    # "-" is stdin/stdout; a .gz suffix means gzip.
+    if path == "-":
+        return open((sys.stdin if "r" in mode else sys.stdout).fileno(), mode,
+                    encoding="utf-8", newline="", closefd=False)
+    if path.lower().endswith(".gz"):
+        import gzip
+        return gzip.open(path, mode + "t", compresslevel=GZIP_LEVEL, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+def read_records(path, fmt=None):
+    fmt = fmt or record_format(path)
+    reader = read_csv_records if fmt == "csv" else read_ndjson_records
+    with open_text(path) as f:
+        yield from reader(f)
+
+def _record_tags(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(CSV_TAG_SEPARATOR)
+    return [name for name in (str(t).strip() for t in value) if name]
+
+def _record_flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "sí", "si", "yes", "x")
+    return bool(value)
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert_names(conn, table, names, ids, now=None):
+    # Insert the names missing from `ids` and add their new ids to it.
+    missing = [n for n in dict.fromkeys(names) if n not in ids]
+    if not missing:
+        return 0
+    if table == "projects":
+        conn.executemany("INSERT INTO projects(name, created_at) VALUES (?, ?)", [(n, now) for n in missing])
+    else:
+        conn.executemany("INSERT INTO tags(name) VALUES (?)", [(n,) for n in missing])
+    for i in range(0, len(missing), 500):
+        chunk = missing[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        ids.update(conn.execute(f"SELECT name, id FROM {table} WHERE name IN ({placeholders})", chunk).fetchall())
+    return len(missing)
+
+def _next_action_id(conn):
+    # Ids are assigned up front so action_tags can be built without reading
+    # them back. Callers hold the write lock (transaction(immediate=True)),
+    # so no other process can take the same ids between this read and the
+    # insert. sqlite_sequence is the AUTOINCREMENT high-water mark; the
+    # archive is checked too so an archived id is never handed out again.
+    return conn.execute("""
+        SELECT MAX(COALESCE((SELECT MAX(id) FROM actions), 0),
+                   COALESCE((SELECT MAX(id) FROM archived_actions), 0),
+                   COALESCE((SELECT seq FROM sqlite_sequence WHERE name='actions'), 0))
+    """).fetchone()[0] + 1
+
+def _import_batch(conn, batch, projects, tags, positions, counts, offset):
+    now = datetime.datetime.now().isoformat()
+    parsed = []
+    for n, rec in enumerate(batch, start=offset + 1):
+        project = str(rec.get("project") or "").strip()
+        if not project:
+            raise ValueError(f"Registro {n}: falta el proyecto.")
+        parsed.append((project, rec.get("description") or "", _record_tags(rec.get("tags")), rec))
+    counts["projects"] += _insert_names(conn, "projects", [p for p, _, _, _ in parsed], projects, now)
+    counts["tags"] += _insert_names(conn, "tags", [t for _, _, names, _ in parsed for t in names], tags)
+
+    next_id = _next_action_id(conn)
+    action_rows, tag_rows = [], []
+    for project, description, names, rec in parsed:
+        if not description:
+            continue
+        project_id = projects[project]
+        position = (int(positions.get(project_id, 0)) // POSITION_GAP + 1) * POSITION_GAP
+        positions[project_id] = position
+        is_complete = 1 if _record_flag(rec.get("is_complete")) else 0
+        action_rows.append((next_id, project_id, description, is_complete, position, rec.get("created_at") or now,
+                            (rec.get("completed_at") or now) if is_complete else None))
+        tag_rows.extend((next_id, tags[t]) for t in names)
+        next_id += 1
+    if not action_rows:
+        counts["records"] += len(batch)
+        return
+    # The per-row insert triggers are held off (see _migration_bulk_load)
+    # for one set-based FTS insert and a single "reload" entry in the feed.
+    conn.execute("INSERT INTO bulk_load(id) VALUES (1)")
+    conn.executemany("""
+        INSERT INTO actions(id, project_id, description, is_complete, position, created_at, completed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, action_rows)
+    if has_fts(conn):
+        conn.execute("INSERT INTO actions_fts(rowid, description) SELECT id, description FROM actions WHERE id >= ?",
+                     (action_rows[0][0],))
+    conn.executemany("INSERT OR IGNORE INTO action_tags(action_id, tag_id) VALUES (?, ?)", tag_rows)
+    conn.execute("DELETE FROM bulk_load")
+    conn.execute("INSERT INTO changes(kind, row_id, op) VALUES ('reload', 0, 'reload')")
+    counts["records"] += len(batch)
+    counts["actions"] += len(action_rows)
+
+@instrumented
+def import_records(records, batch_size=IMPORT_BATCH_SIZE, on_progress=None):
+    # Streams `records` into the DB, one transaction per batch. Batches
+    # already committed stay if a later one fails.
+    t0 = time.perf_counter()
+    counts = {"records": 0, "projects": 0, "tags": 0, "actions": 0}
+
+    def stats():
+        return ImportStats(seconds=time.perf_counter() - t0, **counts)
+
+    with connection() as conn:
+        projects = dict(conn.execute("SELECT name, id FROM projects").fetchall())
+        tags = dict(conn.execute("SELECT name, id FROM tags").fetchall())
+        positions = dict(conn.execute(
+            "SELECT project_id, COALESCE(MAX(position), 0) FROM actions GROUP BY project_id"
+        ).fetchall())
+        for batch in _batches(records, batch_size):
+            tags_before = counts["tags"]
+            with transaction(immediate=True):
+                _import_batch(conn, batch, projects, tags, positions, counts, counts["records"])
+                after_commit(lambda: notify_action_indexes("invalidate"))
+                after_commit(position_allocator.invalidate)
+                if counts["tags"] != tags_before:
+                    after_commit(tag_catalog.invalidate)
+            if on_progress:
+                on_progress(stats())
+    return stats()
+
+def import_file(path, fmt=None, batch_size=IMPORT_BATCH_SIZE, on_progress=None):
+    return import_records(read_records(path, fmt), batch_size, on_progress)
+
+
+# ---------------------------- Export ---------------------------- #
+
+# Records use the import format, so an export can be loaded back with
+# import_file(). Memory stays flat: rows are pulled with fetchmany() and
+# each action's tags come from a second cursor walking action_tags in the
+# same action_id order (a merge join), inside one read transaction so both
+# cursors see the same snapshot. That transaction lives on a connection of
+# its own, closed when the generator finishes or is closed, so a slow or
+# abandoned consumer never holds a pooled connection or nests its
+# transaction into the caller's.
+EXPORT_FETCH_SIZE = 1000
+EXPORT_FIELDS = ("id", "project", "description", "tags", "is_complete", "created_at", "completed_at")
+ExportStats = namedtuple("ExportStats", "records seconds")
+
+def _fetch_iter(cursor, size=EXPORT_FETCH_SIZE):
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
             return
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM actions WHERE id=?", (aid,))
-        action_row = cur.fetchone()
+        yield from rows
+
+def export_records(selected_tag_ids=(), include_completed=True, include_projects=None, include_archived=None):
+    # Same filters as find_actions_by_tags(). Unfiltered exports start with
+    # one record per project so projects without actions survive a round
+    # trip. Archived actions are included whenever completed ones are,
+    # unless include_archived says otherwise.
+    if include_projects is None:
+        include_projects = not selected_tag_ids and include_completed
+    if include_archived is None:
+        include_archived = include_completed
+    status_clause = "" if include_completed else "AND a.is_complete = 0"
+    tag_clause, params = _all_tags_clause(selected_tag_ids)
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN")
+        if include_projects:
+            for p in _fetch_iter(conn.execute("SELECT name FROM projects ORDER BY id")):
+                yield {"project": p[0]}
+        # Hot and archived actions are walked one after the other, each in
+        # id order, so neither pass needs a sort.
+        for rewrite in (str, only_archive) if include_archived else (str,):
+            yield from _export_actions(conn, status_clause, tag_clause, params, rewrite)
+    finally:
         conn.close()
-        if not action_row:
-            return
-        ActionEditor(self, p["id"], action=action_row, on_save=self._reload_actions_for_current_project, refresh_tags_cb=self._refresh_filter_tags)
-
-    def _toggle_selected_action(self):
-        aid = self._get_selected_action_id()
-        if not aid:
-            messagebox.showinfo("Info", "Selecciona una acción para alternar su estado.")
-            return
-        toggle_action_status(aid)
-        self._reload_actions_for_current_project()
-
-    def _delete_selected_action(self):
-        aid = self._get_selected_action_id()
-        if not aid:
-            messagebox.showinfo("Info", "Selecciona una acción para eliminar.")
-            return
-        if messagebox.askyesno("Confirmar", "¿Eliminar esta acción?"):
-            delete_action(aid)
-            self._reload_actions_for_current_project()
-
 
-def main():
+def _export_actions(conn, status_clause, tag_clause, params, rewrite):
+    actions = conn.execute(rewrite(f"""
+        SELECT a.id, p.name, a.description, a.is_complete, a.created_at, a.completed_at
+        FROM actions a
+        JOIN projects p ON p.id = a.project_id
+        WHERE 1=1 {status_clause} {tag_clause}
+        ORDER BY a.id
+    """), params)
+    tag_where = ""
+    if status_clause or tag_clause:
+        tag_where = f"WHERE at.action_id IN (SELECT a.id FROM actions a WHERE 1=1 {status_clause} {tag_clause})"
+    tags = _fetch_iter(conn.execute(rewrite(f"""
+        SELECT at.action_id, t.name
+        FROM action_tags at
+        JOIN tags t ON t.id = at.tag_id
+        {tag_where}
+        ORDER BY at.action_id
+    """), params))
+    tag_row = next(tags, None)
+    for action_id, project, description, is_complete, created_at, completed_at in _fetch_iter(actions):
+        names = []
+        while tag_row is not None and tag_row[0] < action_id:
+            tag_row = next(tags, None)
+        while tag_row is not None and tag_row[0] == action_id:
+            names.append(tag_row[1])
+            tag_row = next(tags, None)
+        names.sort(key=str.lower)
+        yield {"id": action_id, "project": project, "description": description, "tags": names,
+               "is_complete": is_complete, "created_at": created_at, "completed_at": completed_at}
+
+def write_ndjson_records(records, f):
+    import json
+    n = 0
+    for rec in records:
+        f.write(json.dumps(rec, ensure_ascii=False))
+        f.write("\n")
+        n += 1
+    return n
+
+def write_csv_records(records, f):
+    import csv
+    writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    n = 0
+    for rec in records:
+        if "tags" in rec:
+            rec = dict(rec, tags=CSV_TAG_SEPARATOR.join(rec["tags"]))
+        writer.writerow(rec)
+        n += 1
+    return n
+
+@instrumented
+def export_file(path, fmt=None, selected_tag_ids=(), include_completed=True, include_archived=None):
+    t0 = time.perf_counter()
+    fmt = fmt or record_format(path)
+    writer = write_csv_records if fmt == "csv" else write_ndjson_records
+    records = export_records(selected_tag_ids, include_completed, include_archived=include_archived)
+    try:
+        with open_text(path, "w") as f:
+            n = writer(records, f)
+    finally:
+        records.close()
+    return ExportStats(n, time.perf_counter() - t0)
+
+
+# ---------------------------- Backups ---------------------------- #
+
+# Snapshots are taken with the SQLite online backup API, which copies a
+# consistent image of a live database. The copy advances BACKUP_PAGES_PER_STEP
+# pages at a time and pauses between steps, so writers are never locked out
+# for long. Snapshots live in a "backups" folder next to the database.
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_PAUSE = 0.005
+BACKUP_KEEP = 10
+BACKUP_INTERVAL_SECONDS = 24 * 60 * 60
+BACKUP_POLL_MS = 10 * 60 * 1000
+BACKUP_LOG_NAME = "backup-log.ndjson"
+BackupStats = namedtuple("BackupStats", "path pages steps bytes seconds")
+
+def copy_database(src_path, dest_path, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE):
+    # Writes to a temporary name and renames, so dest_path is either the old
+    # file or a complete copy. Returns (pages, steps).
+    tmp_path = dest_path + ".part"
+    progress = {"pages": 0, "steps": 0}
+
+    def on_step(status, remaining, total):
+        progress["pages"] = total
+        progress["steps"] += 1
+        if remaining and pause:
+            time.sleep(pause)
+
+    # A plain connection: no pragmas, so the source keeps its journal mode.
+    src = sqlite3.connect(src_path, isolation_level=None)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        # A backup restarts whenever another connection writes to the source.
+        # In WAL mode a read transaction held across the steps pins one
+        # snapshot without blocking writers, so the copy always finishes.
+        if src.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        src.backup(dst, pages=pages, progress=on_step)
+        # The copy inherits WAL mode from the header; make it one self-contained file.
+        dst.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        dst.close()
+        src.close()
+    os.replace(tmp_path, dest_path)
+    return progress["pages"], progress["steps"]
+
+def backup_dir(db_path=None):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path or DB_PATH)), "backups")
+
+def list_backups(dest_dir=None, db_path=None):
+    # Oldest first. Names embed a sortable timestamp.
+    dest_dir = dest_dir or backup_dir(db_path)
+    prefix = os.path.splitext(os.path.basename(db_path or DB_PATH))[0] + "-"
+    try:
+        names = os.listdir(dest_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(os.path.join(dest_dir, n) for n in names if n.startswith(prefix) and n.endswith(".db"))
+
+def backup_due(dest_dir=None, interval=BACKUP_INTERVAL_SECONDS):
+    backups = list_backups(dest_dir)
+    return not backups or time.time() - os.path.getmtime(backups[-1]) >= interval
+
+def _log_backup(dest_dir, stats):
+    import json
+    entry = dict(stats._asdict(), at=datetime.datetime.now().isoformat(timespec="seconds"))
+    with open(os.path.join(dest_dir, BACKUP_LOG_NAME), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+@instrumented
+def backup_db(dest_dir=None, keep=BACKUP_KEEP, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE):
+    # Takes a snapshot, drops the oldest ones beyond `keep` and appends the
+    # timing to backup-log.ndjson in the same folder.
+    dest_dir = dest_dir or backup_dir()
+    os.makedirs(dest_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(DB_PATH))[0]
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    dest_path = os.path.join(dest_dir, f"{base}-{stamp}.db")
+    t0 = time.perf_counter()
+    total_pages, steps = copy_database(DB_PATH, dest_path, pages, pause)
+    stats = BackupStats(dest_path, total_pages, steps, os.path.getsize(dest_path), time.perf_counter() - t0)
+    for old in list_backups(dest_dir)[:-keep] if keep else ():
+        try:
+            os.remove(old)
+        except OSError as e:
+            print(f"Advertencia: no se pudo borrar la copia {old}: {e}")
+    _log_backup(dest_dir, stats)
+    return stats
+
+
+# ---------------------------- Archive ---------------------------- #
+
+# archive_completed_actions() moves actions completed more than
+# ARCHIVE_AFTER_DAYS ago to the archive tables (see _migration_archive).
+# Each batch is its own short transaction followed by a pause, so the job
+# can run in the background next to the window and the API.
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_BATCH_PAUSE = 0.005
+ARCHIVE_POLL_MS = 10 * 60 * 1000
+ArchiveStats = namedtuple("ArchiveStats", "actions tags batches seconds")
+
+def archive_rate(stats):
+    return stats.actions / stats.seconds if stats.seconds else 0.0
+
+def _archive_batch(conn, cutoff, batch_size, now):
+    ids = [r[0] for r in conn.execute("""
+        SELECT id FROM actions
+        WHERE is_complete = 1 AND completed_at < ?
+        ORDER BY id
+        LIMIT ?
+    """, (cutoff, batch_size))]
+    if not ids:
+        return 0, 0
+    placeholders = ",".join("?" * len(ids))
+    conn.execute(f"""
+        INSERT INTO archived_actions({ARCHIVE_COLUMNS}, archived_at)
+        SELECT {ARCHIVE_COLUMNS}, ? FROM actions WHERE id IN ({placeholders})
+    """, [now, *ids])
+    tags = conn.execute(f"""
+        INSERT INTO archived_action_tags(action_id, tag_id)
+        SELECT action_id, tag_id FROM action_tags WHERE action_id IN ({placeholders})
+    """, ids).rowcount
+    # The feed reports each action as deleted; the changes_action_tags_d
+    # trigger skips the links the cascade removes.
+    conn.execute(f"DELETE FROM actions WHERE id IN ({placeholders})", ids)
+    return len(ids), tags
+
+@instrumented
+def archive_completed_actions(days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE,
+                              pause=ARCHIVE_BATCH_PAUSE, on_progress=None):
+    # Actions completed before the cutoff move with their tags. Batches
+    # already committed stay if a later one fails. Archived actions are completed, so the in-memory
+    # indexes of pending work are unaffected.
+    t0 = time.perf_counter()
+    counts = {"actions": 0, "tags": 0, "batches": 0}
+
+    def stats():
+        return ArchiveStats(seconds=time.perf_counter() - t0, **counts)
+
+    now = datetime.datetime.now()
+    cutoff = (now - datetime.timedelta(days=days)).isoformat()
+    with connection() as conn:
+        while True:
+            # Each batch selects its ids and then moves them, while the
+            # window's DB worker may be writing too: take the lock first.
+            with transaction(immediate=True):
+                moved, tags = _archive_batch(conn, cutoff, batch_size, now.isoformat())
+            if not moved:
+                break
+            counts["actions"] += moved
+            counts["tags"] += tags
+            counts["batches"] += 1
+            if on_progress:
+                on_progress(stats())
+            if moved < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return stats()
+
+@instrumented
+def restore_archived_actions(action_ids):
+    # Moves archived actions back to the hot tables, still completed, and
+    # returns their list rows. completed_at restarts, so a restored action
+    # is not archived again on the next run.
+    now = datetime.datetime.now().isoformat()
+    restored = []
+    with transaction(immediate=True) as conn:
+        for i in range(0, len(action_ids), 500):
+            chunk = action_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            ids = [r[0] for r in conn.execute(
+                f"SELECT id FROM archived_actions WHERE id IN ({placeholders})", chunk)]
+            if not ids:
+                continue
+            placeholders = ",".join("?" * len(ids))
+            conn.execute(f"""
+                INSERT INTO actions(id, project_id, description, is_complete, position, created_at, completed_at)
+                SELECT id, project_id, description, is_complete, position, created_at, ?
+                FROM archived_actions WHERE id IN ({placeholders})
+            """, [now, *ids])
+            conn.execute(f"""
+                INSERT INTO action_tags(action_id, tag_id)
+                SELECT action_id, tag_id FROM archived_action_tags WHERE action_id IN ({placeholders})
+            """, ids)
+            conn.execute(f"DELETE FROM archived_actions WHERE id IN ({placeholders})", ids)
+            restored.extend(ids)
+        return _rows_for_ids(conn, restored)
+
+
+# ---------------------------- Startup ---------------------------- #
+
+class StartupProfile:
+    # Wall-clock time of each startup phase, for --profile-startup.
+    def __init__(self, started=None):
+        self.started = self.last = started if started is not None else time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    def report(self):
+        lines = [f"{'fase':<28}{'ms':>10}"]
+        lines += [f"{phase:<28}{ms:>10.1f}" for phase, ms in self.phases]
+        lines.append(f"{'total':<28}{(self.last - self.started) * 1000:>10.1f}")
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    from personal_boss_cli import build_parser, run
+    args = build_parser().parse_args(argv)
+    if args.stats:
+        instrumentation.enable()
+    if args.command:
+        return run(args)
+
+    profile = StartupProfile(_STARTED)
+    profile.mark("importar módulos")
     ensure_db_location()
+    profile.mark("ubicar base de datos")
     init_db()
-    app = App()
-    app.mainloop()
+    profile.mark("esquema (user_version)")
+    # tkinter and the UI are only imported once we know a window is needed.
+    from personal_boss_gui import App
+    profile.mark("importar interfaz")
+
+    def on_ready():
+        profile.mark("cargar proyectos y etiquetas")
+        if args.profile_startup:
+            print(profile.report())
+            app.quit()
+
+    app = App(on_ready=on_ready)
+    profile.mark("construir ventana")
+    app.after_idle(lambda: profile.mark("mostrar ventana"))
+    try:
+        app.mainloop()
+    finally:
+        app.db.shutdown()
+        try:
+            tag_bitmaps.save_snapshot()
+        except OSError as e:
+            print(f"Advertencia: no se pudo guardar el índice de etiquetas: {e}")
+        close_pool()
 
 if __name__ == "__main__":
-    main()
+    # Let personal_boss_gui import this module instead of loading a second copy.
+    sys.modules.setdefault("personal_boss", sys.modules[__name__])
+    sys.exit(main())
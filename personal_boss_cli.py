@@ -0,0 +1,405 @@
+import argparse
+import json
+import shlex
+import sqlite3
+import sys
+import time
+
+from personal_boss import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    BACKUP_KEEP,
+    IMPORT_BATCH_SIZE,
+    ActionBatch,
+    TagFilter,
+    archive_completed_actions,
+    archive_rate,
+    backup_db,
+    close_pool,
+    configure_db,
+    create_action,
+    create_project,
+    create_tag,
+    ensure_db_location,
+    export_file,
+    find_actions_by_filter,
+    find_actions_by_tags,
+    get_pool,
+    import_file,
+    import_rate,
+    init_db,
+    instrumentation,
+    is_all_of_filter,
+    list_actions_with_tags,
+    list_all_tags,
+    list_projects,
+    move_action,
+    prune_changes,
+    restore_archived_actions,
+    tag_catalog,
+    transaction,
+)
+
+# Command-line front end over the same DB helpers the window uses. It never
+# imports tkinter, so a command costs a process start plus its queries.
+
+OUTPUT_FORMATS = ("text", "json", "ndjson")
+PROJECT_COLUMNS = ("id", "name", "created_at")
+ACTION_COLUMNS = ("id", "project_name", "description", "tag_names", "is_complete", "created_at")
+TAG_COLUMNS = ("id", "name")
+IMPORT_COLUMNS = ("records", "projects", "tags", "actions", "seconds", "rows_per_sec")
+EXPORT_COLUMNS = ("records", "seconds", "rows_per_sec")
+BACKUP_COLUMNS = ("path", "pages", "steps", "bytes", "seconds")
+ARCHIVE_COLUMNS = ("actions", "tags", "batches", "seconds", "rows_per_sec")
+
+
+class CommandError(Exception):
+    pass
+
+
+def _project_id(value):
+    for p in list_projects():
+        if p["name"] == value:
+            return p["id"]
+    if value.isdigit() and any(p["id"] == int(value) for p in list_projects()):
+        return int(value)
+    raise CommandError(f"No existe el proyecto '{value}'.")
+
+def _tag_ids(values):
+    ids = []
+    for value in values or ():
+        tag = tag_catalog.by_name(value)
+        if tag is None and value.isdigit():
+            tag = tag_catalog.get(int(value))
+        if tag is None:
+            raise CommandError(f"No existe la etiqueta '{value}'.")
+        ids.append(tag["id"])
+    return ids
+
+def _tag_filter(args):
+    return TagFilter(all_of=_tag_ids(args.tag), any_of=_tag_ids(args.any), none_of=_tag_ids(args.exclude))
+
+def _matching(tag_filter, limit=None):
+    # A one-shot process would pay to warm the in-memory indexes on every
+    # call; plain "all of" filters are answered by an index seek instead.
+    if is_all_of_filter(tag_filter):
+        return find_actions_by_tags(tag_filter.all_of, limit=limit)
+    return find_actions_by_filter(tag_filter, limit=limit)
+
+
+# ---------------------------- Commands ---------------------------- #
+
+def cmd_project_add(args):
+    return {"id": create_project(args.name), "name": args.name}
+
+def cmd_project_list(args):
+    return list_projects()
+
+def cmd_action_add(args):
+    return create_action(_project_id(args.project), args.description, _tag_ids(args.tag))
+
+def cmd_action_list(args):
+    rows = list_actions_with_tags(_project_id(args.project), include_archived=args.archived)
+    if args.pending:
+        rows = [r for r in rows if not r["is_complete"]]
+    return rows
+
+def _apply_batch(batch, ids):
+    # All or nothing: an unknown id rolls the whole batch back.
+    with transaction(immediate=True):
+        changes = batch.commit()
+        found = {r["id"] for r in changes.updated}
+        missing = [aid for aid in ids if aid not in found]
+        if missing:
+            raise CommandError(f"No existe la acción {missing[0]}.")
+    return changes.updated
+
+def cmd_action_done(args):
+    return _apply_batch(ActionBatch().set_status(args.ids, not args.undo), args.ids)
+
+def cmd_action_tag(args):
+    if not args.add and not args.remove:
+        raise CommandError("Indica etiquetas con --add o --remove.")
+    batch = ActionBatch().add_tags(args.ids, _tag_ids(args.add)).remove_tags(args.ids, _tag_ids(args.remove))
+    return _apply_batch(batch, args.ids)
+
+def cmd_action_move(args):
+    try:
+        row = move_action(args.id, before_id=args.before, after_id=args.after)
+    except ValueError as e:
+        raise CommandError(str(e))
+    if row is None:
+        raise CommandError(f"No existe la acción {args.id}.")
+    return row
+
+def cmd_tag_add(args):
+    return [{"id": create_tag(name), "name": name} for name in args.names]
+
+def cmd_tag_list(args):
+    return list_all_tags()
+
+def cmd_next(args):
+    rows = _matching(_tag_filter(args), limit=1)
+    return rows[0] if rows else None
+
+def cmd_matching(args):
+    return _matching(_tag_filter(args), limit=args.limit)
+
+def cmd_import(args):
+    def progress(stats):
+        print(f"{stats.records} registros, {import_rate(stats):.0f} filas/s", file=sys.stderr)
+
+    try:
+        stats = import_file(args.file, args.input_format, args.batch_size,
+                            on_progress=progress if args.progress else None)
+    except (OSError, ValueError) as e:
+        raise CommandError(str(e))
+    return dict(stats._asdict(), seconds=round(stats.seconds, 3), rows_per_sec=round(import_rate(stats)))
+
+def cmd_export(args):
+    if args.file == "-" and args.output_format is None:
+        raise CommandError("Indica --output-format al exportar a stdout.")
+    try:
+        stats = export_file(args.file, args.output_format, _tag_ids(args.tag), not args.pending)
+    except (OSError, ValueError) as e:
+        raise CommandError(str(e))
+    rate = stats.records / stats.seconds if stats.seconds else 0.0
+    return {"records": stats.records, "seconds": round(stats.seconds, 3), "rows_per_sec": round(rate)}
+
+def cmd_backup(args):
+    try:
+        stats = backup_db(args.dest, keep=args.keep)
+    except (OSError, sqlite3.Error) as e:
+        raise CommandError(f"No se pudo hacer la copia: {e}")
+    return dict(stats._asdict(), seconds=round(stats.seconds, 3))
+
+def cmd_archive_run(args):
+    def progress(stats):
+        print(f"{stats.actions} acciones, {archive_rate(stats):.0f} filas/s", file=sys.stderr)
+
+    stats = archive_completed_actions(args.days, args.batch_size, on_progress=progress if args.progress else None)
+    return dict(stats._asdict(), seconds=round(stats.seconds, 3), rows_per_sec=round(archive_rate(stats)))
+
+def cmd_archive_restore(args):
+    rows = restore_archived_actions(args.ids)
+    found = {r["id"] for r in rows}
+    missing = [aid for aid in args.ids if aid not in found]
+    if missing:
+        print(f"Advertencia: la acción {missing[0]} no está archivada.", file=sys.stderr)
+    return rows
+
+def cmd_batch(args):
+    # One command per line, e.g. `action add Casa "Pintar la reja" -t casa`.
+    # Output and timing options come from the batch invocation.
+    parser = build_parser()
+    for lineno, line in enumerate(args.input, start=1):
+        argv = shlex.split(line, comments=True)
+        if not argv:
+            continue
+        try:
+            line_args = parser.parse_args(argv)
+        except SystemExit:
+            raise CommandError(f"línea {lineno}: comando inválido: {line.strip()}")
+        if line_args.command in (None, "batch"):
+            raise CommandError(f"línea {lineno}: se esperaba un comando de datos: {line.strip()}")
+        line_args.format, line_args.time = args.format, args.time
+        status = execute(line_args)
+        if status:
+            raise CommandError(f"línea {lineno}: falló: {line.strip()}")
+    return None
+
+
+def cmd_serve(args):
+    # Imported here so the other commands do not pay for asyncio.
+    from personal_boss_server import serve
+
+    def ready(server):
+        print(f"API en http://{server.host}:{server.port}/ (Ctrl+C para detener)", file=sys.stderr)
+
+    try:
+        serve(args.host, args.port, on_ready=ready)
+    except (OSError, ValueError) as e:
+        raise CommandError(str(e))
+    return None
+
+
+def _add_filter_arguments(parser):
+    parser.add_argument("-t", "--tag", action="append", metavar="ETIQUETA",
+                        help="La acción debe tener esta etiqueta (repetible).")
+    parser.add_argument("--any", action="append", metavar="ETIQUETA",
+                        help="La acción debe tener al menos una de estas etiquetas (repetible).")
+    parser.add_argument("--exclude", action="append", metavar="ETIQUETA",
+                        help="La acción no debe tener esta etiqueta (repetible).")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="personal_boss",
+        description="Gestor de proyectos y próximas acciones. Sin comando abre la ventana.",
+    )
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Medir cada fase del arranque de la ventana, mostrarla y salir.")
+    parser.add_argument("--db", metavar="RUTA", help="Usar esta base de datos en lugar de personal_boss.db.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="text",
+                        help="Salida: texto separado por tabulaciones, un documento JSON o una fila JSON por línea.")
+    parser.add_argument("--time", action="store_true",
+                        help="Escribir en stderr la latencia de cada comando.")
+    parser.add_argument("--stats", action="store_true",
+                        help="Instrumentar las consultas. En la CLI escribe en stderr latencias por función y "
+                             "sentencia y las consultas lentas; en la ventana, F12 las muestra.")
+    commands = parser.add_subparsers(dest="command", metavar="comando")
+
+    project = commands.add_parser("project", help="Proyectos.").add_subparsers(dest="subcommand", required=True)
+    p = project.add_parser("add", help="Crear un proyecto.")
+    p.add_argument("name")
+    p.set_defaults(handler=cmd_project_add, columns=PROJECT_COLUMNS[:2])
+    p = project.add_parser("list", help="Listar proyectos.")
+    p.set_defaults(handler=cmd_project_list, columns=PROJECT_COLUMNS)
+
+    action = commands.add_parser("action", help="Acciones.").add_subparsers(dest="subcommand", required=True)
+    p = action.add_parser("add", help="Crear una acción.")
+    p.add_argument("project", help="Nombre o id del proyecto.")
+    p.add_argument("description")
+    p.add_argument("-t", "--tag", action="append", metavar="ETIQUETA", help="Etiqueta (repetible).")
+    p.set_defaults(handler=cmd_action_add, columns=ACTION_COLUMNS)
+    p = action.add_parser("list", help="Listar las acciones de un proyecto.")
+    p.add_argument("project", help="Nombre o id del proyecto.")
+    p.add_argument("--pending", action="store_true", help="Solo las pendientes.")
+    p.add_argument("--archived", action="store_true", help="Incluir las acciones archivadas.")
+    p.set_defaults(handler=cmd_action_list, columns=ACTION_COLUMNS)
+    p = action.add_parser("done", help="Marcar acciones como completadas.")
+    p.add_argument("ids", type=int, nargs="+", metavar="ID")
+    p.add_argument("--undo", action="store_true", help="Volver a marcarlas como pendientes.")
+    p.set_defaults(handler=cmd_action_done, columns=ACTION_COLUMNS)
+    p = action.add_parser("tag", help="Añadir o quitar etiquetas de varias acciones.")
+    p.add_argument("ids", type=int, nargs="+", metavar="ID")
+    p.add_argument("-a", "--add", action="append", metavar="ETIQUETA", help="Etiqueta a añadir (repetible).")
+    p.add_argument("-r", "--remove", action="append", metavar="ETIQUETA", help="Etiqueta a quitar (repetible).")
+    p.set_defaults(handler=cmd_action_tag, columns=ACTION_COLUMNS)
+    p = action.add_parser("move", help="Mover una acción dentro de su proyecto (sin destino: al final).")
+    p.add_argument("id", type=int, metavar="ID")
+    target = p.add_mutually_exclusive_group()
+    target.add_argument("--before", type=int, metavar="ID", help="Colocarla antes de esta acción.")
+    target.add_argument("--after", type=int, metavar="ID", help="Colocarla después de esta acción.")
+    p.set_defaults(handler=cmd_action_move, columns=ACTION_COLUMNS)
+
+    tag = commands.add_parser("tag", help="Etiquetas.").add_subparsers(dest="subcommand", required=True)
+    p = tag.add_parser("add", help="Crear etiquetas.")
+    p.add_argument("names", nargs="+", metavar="NOMBRE")
+    p.set_defaults(handler=cmd_tag_add, columns=TAG_COLUMNS)
+    p = tag.add_parser("list", help="Listar etiquetas.")
+    p.set_defaults(handler=cmd_tag_list, columns=TAG_COLUMNS)
+
+    p = commands.add_parser("next", help="Siguiente acción pendiente que cumple el filtro.")
+    _add_filter_arguments(p)
+    p.set_defaults(handler=cmd_next, columns=ACTION_COLUMNS)
+    p = commands.add_parser("matching", help="Acciones pendientes que cumplen el filtro.")
+    _add_filter_arguments(p)
+    p.add_argument("--limit", type=int, help="Máximo de filas.")
+    p.set_defaults(handler=cmd_matching, columns=ACTION_COLUMNS)
+
+    p = commands.add_parser("import", help="Importar acciones desde CSV o NDJSON (opcionalmente .gz).")
+    p.add_argument("file", help="Archivo a importar, o - para stdin.")
+    p.add_argument("--input-format", choices=("csv", "ndjson"),
+                   help="Formato de entrada (por defecto según la extensión).")
+    p.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Registros por transacción.")
+    p.add_argument("--progress", action="store_true", help="Informar en stderr el avance de cada lote.")
+    p.set_defaults(handler=cmd_import, columns=IMPORT_COLUMNS)
+
+    p = commands.add_parser("export", help="Exportar proyectos y acciones a CSV o NDJSON (opcionalmente .gz).")
+    p.add_argument("file", help="Archivo de salida, o - para stdout.")
+    p.add_argument("--output-format", choices=("csv", "ndjson"),
+                   help="Formato de salida (por defecto según la extensión).")
+    p.add_argument("-t", "--tag", action="append", metavar="ETIQUETA",
+                   help="Solo acciones con esta etiqueta (repetible).")
+    p.add_argument("--pending", action="store_true", help="Solo acciones pendientes.")
+    p.set_defaults(handler=cmd_export, columns=EXPORT_COLUMNS)
+
+    p = commands.add_parser("backup", help="Copia de seguridad en caliente junto a la base de datos.")
+    p.add_argument("--dest", metavar="CARPETA", help="Carpeta destino (por defecto backups/ junto a la DB).")
+    p.add_argument("--keep", type=int, default=BACKUP_KEEP, help="Copias a conservar (0 = todas).")
+    p.set_defaults(handler=cmd_backup, columns=BACKUP_COLUMNS)
+
+    archive = commands.add_parser("archive", help="Archivo de acciones completadas.").add_subparsers(
+        dest="subcommand", required=True)
+    p = archive.add_parser("run", help="Archivar las acciones completadas hace más de --days días.")
+    p.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="Antigüedad mínima de la compleción.")
+    p.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Acciones por transacción.")
+    p.add_argument("--progress", action="store_true", help="Informar en stderr el avance de cada lote.")
+    p.set_defaults(handler=cmd_archive_run, columns=ARCHIVE_COLUMNS)
+    p = archive.add_parser("restore", help="Devolver acciones archivadas a la lista.")
+    p.add_argument("ids", type=int, nargs="+", metavar="ID")
+    p.set_defaults(handler=cmd_archive_restore, columns=ACTION_COLUMNS)
+
+    p = commands.add_parser("batch", help="Ejecutar un comando por línea leído de un archivo o de stdin.")
+    p.add_argument("input", nargs="?", type=argparse.FileType("r", encoding="utf-8"), default="-",
+                   help="Archivo de comandos (por defecto stdin).")
+    p.set_defaults(handler=cmd_batch, columns=())
+
+    p = commands.add_parser("serve", help="Servir una API HTTP/JSON local (solo localhost).")
+    p.add_argument("--host", default="127.0.0.1", help="127.0.0.1, ::1 o localhost.")
+    p.add_argument("--port", type=int, default=8765)
+    p.set_defaults(handler=cmd_serve, columns=())
+    return parser
+
+
+# ---------------------------- Output ---------------------------- #
+
+def _as_rows(result):
+    if result is None:
+        return []
+    if isinstance(result, (list, tuple)):
+        return [dict(r) for r in result]
+    return [dict(result)]
+
+def emit(result, fmt, columns, out=None):
+    out = out or sys.stdout
+    if fmt == "json":
+        doc = _as_rows(result) if isinstance(result, (list, tuple)) else (dict(result) if result is not None else None)
+        out.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        return
+    for row in _as_rows(result):
+        if fmt == "ndjson":
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            out.write("\t".join("" if row.get(c) is None else str(row.get(c)) for c in columns) + "\n")
+
+def _command_name(args):
+    return " ".join(filter(None, (args.command, getattr(args, "subcommand", None))))
+
+def execute(args):
+    t0 = time.perf_counter()
+    try:
+        result = args.handler(args)
+    except (CommandError, sqlite3.IntegrityError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    if args.handler not in (cmd_batch, cmd_serve):
+        emit(result, args.format, args.columns)
+    if args.time:
+        name = _command_name(args)
+        if args.format == "text":
+            print(f"{name}: {elapsed_ms:.2f} ms", file=sys.stderr)
+        else:
+            print(json.dumps({"command": name, "ms": round(elapsed_ms, 3)}, ensure_ascii=False), file=sys.stderr)
+    return 0
+
+def run(args):
+    if args.db:
+        configure_db(args.db)
+    else:
+        ensure_db_location()
+    init_db()
+    try:
+        status = execute(args)
+        # The window is not necessarily running to trim the change feed.
+        if get_pool().last_write is not None:
+            prune_changes()
+        return status
+    finally:
+        close_pool()
+        if args.stats:
+            if args.format == "text":
+                print(instrumentation.report(), file=sys.stderr)
+            else:
+                print(json.dumps(instrumentation.snapshot(), ensure_ascii=False), file=sys.stderr)
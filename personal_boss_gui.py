@@ -0,0 +1,1602 @@
+import queue
+import sqlite3
+import unicodedata
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog
+
+from personal_boss import (
+    ACTIONS_PAGE_SIZE,
+    ActionBatch,
+    ChangeFeed,
+    APP_TITLE,
+    ARCHIVE_POLL_MS,
+    BACKUP_POLL_MS,
+    CHANGES_POLL_MS,
+    CHECKPOINT_POLL_MS,
+    SEARCH_PAGE_SIZE,
+    TagFilter,
+    action_creation_key,
+    action_list_key,
+    archive_completed_actions,
+    archive_rate,
+    backup_db,
+    backup_due,
+    create_action,
+    create_project,
+    create_tag,
+    delete_action,
+    delete_project,
+    delete_tag,
+    find_actions_by_filter,
+    find_next_action_by_filter,
+    get_action,
+    get_action_tags,
+    get_pool,
+    instrumentation,
+    is_archived,
+    list_actions_page,
+    list_projects,
+    move_action,
+    prune_changes,
+    rename_tag,
+    restore_archived_actions,
+    search_actions,
+    tag_bitmaps,
+    tag_catalog,
+    tag_sort_key,
+    toggle_action_status,
+    update_action,
+    ui_event,
+    update_project,
+)
+
+# ---------------------------- Background DB worker ---------------------------- #
+
+class DBExecutor:
+    # Runs DB helpers on a single worker thread (so jobs execute in submission
+    # order) and hands results back to the Tk thread by polling with after().
+    # Jobs submitted on a channel supersede earlier jobs on the same channel:
+    # their results are dropped when they arrive late. Long background jobs
+    # (backups) run on a second thread so they never queue ahead of UI work.
+    POLL_MS = 10
+
+    def __init__(self, root):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="personal-boss-db")
+        self._background = None
+        self._done = queue.SimpleQueue()
+        self._generations = {}
+        self._pending = 0
+        self._polling = False
+
+    def submit(self, fn, *args, on_done=None, on_error=None, channel=None, owner=None, background=False):
+        generation = None
+        if channel is not None:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+        job = (on_done, on_error, channel, generation, owner)
+        executor = self._executor
+        if background:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="personal-boss-bg")
+            executor = self._background
+        if instrumentation.enabled:
+            fn = instrumentation.bind(fn)
+        future = executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._done.put((f, job)))
+        self._pending += 1
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._poll)
+        return future
+
+    def _poll(self):
+        while True:
+            try:
+                future, job = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            self._deliver(future, *job)
+        if self._pending:
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _deliver(self, future, on_done, on_error, channel, generation, owner):
+        if channel is not None and self._generations.get(channel) != generation:
+            return
+        if owner is not None and not owner.winfo_exists():
+            return
+        exc = future.exception()
+        if exc is not None:
+            if on_error is not None:
+                on_error(exc)
+            else:
+                messagebox.showerror("Error de base de datos", str(exc), parent=owner or self.root)
+            return
+        if on_done is not None:
+            on_done(future.result())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        if self._background is not None:
+            self._background.shutdown(wait=True)
+
+
+# ---------------------------- UI Components ---------------------------- #
+
+def _find_tag_row(rows, tag_id, name=None):
+    if name is not None:
+        i = bisect_left(rows, (name.lower(), tag_id), key=tag_sort_key)
+        if i < len(rows) and rows[i]["id"] == tag_id:
+            return i
+    for i, row in enumerate(rows):
+        if row["id"] == tag_id:
+            return i
+    return None
+
+def apply_tag_event(rows, event, listbox=None, visible=None):
+    # Patch `rows` (tag dicts sorted by tag_sort_key) and the Listbox that
+    # mirrors it with one TagEvent. Returns False on "reloaded", where the
+    # caller has to rebuild from tag_catalog.all().
+    if event.kind == "reloaded":
+        return False
+    tag = event.tag
+    was_selected = False
+    if event.kind in ("renamed", "deleted"):
+        old_name = event.old_name if event.kind == "renamed" else tag["name"]
+        i = _find_tag_row(rows, tag["id"], old_name)
+        if i is not None:
+            del rows[i]
+            if listbox is not None:
+                was_selected = listbox.selection_includes(i)
+                listbox.delete(i)
+    if event.kind in ("created", "renamed") and (visible is None or visible(tag)):
+        i = bisect_left(rows, tag_sort_key(tag), key=tag_sort_key)
+        rows.insert(i, tag)
+        if listbox is not None:
+            listbox.insert(i, tag["name"])
+            if was_selected:
+                listbox.selection_set(i)
+    return True
+
+def patch_tag_names(tag_names, event):
+    # The tag_names column of a list row ("a, b, c", ordered by name) after
+    # a renamed or deleted TagEvent, or None if the row does not show it.
+    old_name = event.old_name if event.kind == "renamed" else event.tag["name"]
+    names = str(tag_names).split(", ") if tag_names else []
+    if old_name not in names:
+        return None
+    names.remove(old_name)
+    if event.kind == "renamed":
+        names.append(event.tag["name"])
+    return ", ".join(sorted(names, key=str.lower))
+
+def fold_text(text):
+    # Case- and accent-insensitive form used by the search boxes, so that
+    # "accion" finds "Acción".
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+class SearchIndex:
+    # Substring filter over a list of rows on their folded text, which is
+    # computed once per row rather than on every keystroke. A term that
+    # contains the previous one only rescans the previous matches. Call
+    # invalidate() after changing the rows in place.
+    def __init__(self, rows=(), text_of=lambda row: row["name"]):
+        self.text_of = text_of
+        self.set_rows(list(rows))
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.invalidate()
+
+    def invalidate(self):
+        self._folded = None
+        self._last_term = ""
+        self._last = None
+
+    @staticmethod
+    def fold_term(term):
+        return fold_text((term or "").strip())
+
+    def matches(self, row, term):
+        # term as returned by fold_term().
+        return term in fold_text(self.text_of(row))
+
+    def filter(self, term):
+        term = self.fold_term(term)
+        if self._folded is None:
+            self._folded = [fold_text(self.text_of(row)) for row in self.rows]
+        folded = self._folded
+        if not term:
+            positions = range(len(folded))
+        else:
+            if self._last is not None and self._last_term in term:
+                candidates = self._last
+            else:
+                candidates = range(len(folded))
+            positions = [i for i in candidates if term in folded[i]]
+        self._last_term, self._last = term, positions
+        return [self.rows[i] for i in positions]
+
+FILL_LISTBOX_MAX_RUNS = 64
+
+def fill_listbox(listbox, shown, rows, text_of=lambda row: row["name"]):
+    # Make a Listbox that currently shows `shown` show `rows` instead. When
+    # `rows` is a narrowing of `shown` only the dropped runs are deleted;
+    # otherwise the box is refilled with a single insert call.
+    if len(rows) <= len(shown):
+        runs = []
+        j = 0
+        for i, row in enumerate(shown):
+            if j < len(rows) and rows[j] is row:
+                j += 1
+            elif runs and runs[-1][1] == i - 1:
+                runs[-1][1] = i
+            else:
+                runs.append([i, i])
+        if j == len(rows) and len(runs) <= FILL_LISTBOX_MAX_RUNS:
+            for first, last in reversed(runs):
+                listbox.delete(first, last)
+            return
+    listbox.delete(0, tk.END)
+    if rows:
+        listbox.insert(tk.END, *(text_of(row) for row in rows))
+
+class Debouncer:
+    # Collapses calls that arrive within delay_ms of each other (keystrokes in
+    # a search box) into one call of fn once typing pauses.
+    DELAY_MS = 150
+
+    def __init__(self, widget, fn, delay_ms=None):
+        self.widget = widget
+        self.fn = fn
+        self.delay_ms = self.DELAY_MS if delay_ms is None else delay_ms
+        self._after = None
+
+    def __call__(self, *args):
+        self.cancel()
+        self._after = self.widget.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._after = None
+        self.fn()
+
+    def cancel(self):
+        if self._after is not None:
+            self.widget.after_cancel(self._after)
+            self._after = None
+
+    def flush(self):
+        # Runs a pending call now, e.g. before acting on the filtered list.
+        if self._after is not None:
+            self.cancel()
+            self.fn()
+
+class LazyTreeview:
+    # Fills a Treeview one keyset page at a time. The first page renders as
+    # soon as it arrives; the next one is fetched on the DB worker when the
+    # view is scrolled near the bottom. fetch_page(after, limit) returns rows
+    # ordered by key_of(row); the action id is used as the row iid.
+    PREFETCH_AT = 0.9
+
+    def __init__(self, tree, db, values_of, key_of, scrollbar=None, page_size=ACTIONS_PAGE_SIZE):
+        self.tree = tree
+        self.db = db
+        self.values_of = values_of
+        self.key_of = key_of
+        self.scrollbar = scrollbar
+        self.page_size = page_size
+        self.channel = ("lazy", id(self))
+        self._fetch = None
+        self._after = None
+        self._loading = False
+        self.has_more = False
+        # Keys of the rows currently in the tree, in tree order.
+        self._keys = []
+        self._key_by_iid = {}
+        tree.configure(yscrollcommand=self._on_yscroll)
+
+    def reset(self, fetch_page, then=None):
+        self._fetch = fetch_page
+        self._after = None
+        self.has_more = True
+        self._load(then, replace=True)
+
+    def clear(self):
+        # Supersede any in-flight page so it cannot repopulate the tree.
+        self._fetch = None
+        self.has_more = False
+        self._loading = False
+        self.db.submit(lambda: None, channel=self.channel)
+        self._forget_all()
+
+    def load_more(self, then=None):
+        if self._fetch is None or not self.has_more or self._loading:
+            return False
+        self._load(then, replace=False)
+        return True
+
+    def _load(self, then, replace):
+        self._loading = True
+        # One extra row tells whether another page exists.
+        self.db.submit(self._fetch, self._after, self.page_size + 1,
+                       on_done=lambda rows: self._render(rows, replace, then),
+                       on_error=self._on_error, channel=self.channel, owner=self.tree)
+
+    def _render(self, rows, replace, then):
+        self._loading = False
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if replace:
+            self._forget_all()
+        for r in rows:
+            iid = str(r["id"])
+            if iid not in self._key_by_iid:
+                key = self.key_of(r)
+                self._keys.append(key)
+                self._key_by_iid[iid] = key
+                self.tree.insert("", tk.END, iid=iid, values=self.values_of(r))
+        if rows:
+            self._after = self.key_of(rows[-1])
+        if then:
+            then()
+
+    def upsert(self, row):
+        # Patch a single changed row in place: update its values and, if its
+        # sort key moved, move it. A row whose new key falls past the last
+        # loaded page is dropped; it will arrive with that page.
+        iid = str(row["id"])
+        key = self.key_of(row)
+        old = self._key_by_iid.get(iid)
+        if old == key:
+            self.tree.item(iid, values=self.values_of(row))
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, old)]
+            del self._key_by_iid[iid]
+        if self.has_more and (self._after is None or key > self._after):
+            if old is not None:
+                self.tree.delete(iid)
+            return
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._key_by_iid[iid] = key
+        if old is None:
+            self.tree.insert("", index, iid=iid, values=self.values_of(row))
+        else:
+            self.tree.item(iid, values=self.values_of(row))
+            self.tree.move(iid, "", index)
+
+    def remove(self, row_id):
+        iid = str(row_id)
+        key = self._key_by_iid.pop(iid, None)
+        if key is None:
+            return
+        del self._keys[bisect_left(self._keys, key)]
+        self.tree.delete(iid)
+
+    def _forget_all(self):
+        self._keys = []
+        self._key_by_iid = {}
+        self.tree.delete(*self.tree.get_children())
+
+    def _on_error(self, exc):
+        self._loading = False
+        messagebox.showerror("Error de base de datos", str(exc), parent=self.tree.winfo_toplevel())
+
+    def _on_yscroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        # A page that does not fill the view reports last == 1.0, so this
+        # also keeps paging until the view is full.
+        if float(last) >= self.PREFETCH_AT:
+            self.load_more()
+
+
+class TagManager(tk.Toplevel):
+    def __init__(self, master, on_close=None):
+        super().__init__(master)
+        self.title("Gestionar etiquetas")
+        self.geometry("460x420")
+        self.on_close = on_close
+        self.configure(padx=10, pady=10)
+
+        ttk.Label(self, text="Buscar etiqueta:").grid(row=0, column=0, sticky="w")
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self, textvariable=self.search_var)
+        self.search_entry.grid(row=0, column=1, columnspan=2, sticky="ew")
+        self.grid_columnconfigure(1, weight=1)
+        self.filtered_tags = []
+        self.tag_index = SearchIndex()
+        self._filter_later = Debouncer(self, self._apply_filter)
+        self.search_var.trace_add("write", self._filter_later)
+
+        self.tag_list = tk.Listbox(self, height=12)
+        self.tag_list.grid(row=1, column=0, columnspan=3, sticky="nsew", pady=(6,10))
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=0)
+
+        self.refresh_tags()
+
+        ttk.Label(self, text="Nueva etiqueta:").grid(row=2, column=0, sticky="w")
+        self.new_tag_entry = ttk.Entry(self)
+        self.new_tag_entry.grid(row=2, column=1, sticky="ew")
+        ttk.Button(self, text="Agregar", command=self.add_tag).grid(row=2, column=2, sticky="e")
+
+        ttk.Label(self, text="Renombrar seleccionada a:").grid(row=3, column=0, sticky="w", pady=(10,0))
+        self.rename_entry = ttk.Entry(self)
+        self.rename_entry.grid(row=3, column=1, sticky="ew", pady=(10,0))
+        ttk.Button(self, text="Renombrar", command=self.rename_selected).grid(row=3, column=2, pady=(10,0))
+
+        ttk.Button(self, text="Eliminar seleccionada", command=self.delete_selected).grid(row=4, column=0, columnspan=3, pady=(12,0))
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        tag_catalog.subscribe(self._on_tag_event)
+
+    def destroy(self):
+        self._filter_later.cancel()
+        tag_catalog.unsubscribe(self._on_tag_event)
+        super().destroy()
+
+    def _on_close(self):
+        if self.on_close:
+            self.on_close()
+        self.destroy()
+
+    def refresh_tags(self):
+        self.all_tags = tag_catalog.all()
+        self.tag_index.set_rows(self.all_tags)
+        self._apply_filter()
+
+    def _on_tag_event(self, event):
+        if not apply_tag_event(self.all_tags, event):
+            self.refresh_tags()
+            return
+        self.tag_index.invalidate()
+        term = self.tag_index.fold_term(self.search_var.get())
+        apply_tag_event(self.filtered_tags, event, self.tag_list,
+                        visible=lambda t: self.tag_index.matches(t, term))
+
+    @ui_event
+    def _apply_filter(self):
+        self._filter_later.cancel()
+        tags = self.tag_index.filter(self.search_var.get())
+        fill_listbox(self.tag_list, self.filtered_tags, tags)
+        self.filtered_tags = tags
+
+    @ui_event
+    def add_tag(self):
+        name = self.new_tag_entry.get().strip()
+        if not name:
+            return
+        try:
+            create_tag(name)
+            self.new_tag_entry.delete(0, tk.END)
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", f"La etiqueta '{name}' ya existe.")
+
+    def _get_selected_tag_row(self):
+        idx = self.tag_list.curselection()
+        if not idx:
+            return None
+        return self.filtered_tags[idx[0]]
+
+    @ui_event
+    def rename_selected(self):
+        t = self._get_selected_tag_row()
+        if not t:
+            messagebox.showinfo("Info", "Selecciona una etiqueta para renombrar.")
+            return
+        new_name = self.rename_entry.get().strip()
+        if not new_name:
+            messagebox.showinfo("Info", "Ingresá el nuevo nombre.")
+            return
+        try:
+            rename_tag(t["id"], new_name)
+            self.rename_entry.delete(0, tk.END)
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", f"Ya existe una etiqueta con el nombre '{new_name}'.")
+
+    @ui_event
+    def delete_selected(self):
+        t = self._get_selected_tag_row()
+        if not t:
+            messagebox.showinfo("Info", "Selecciona una etiqueta para eliminar.")
+            return
+        if messagebox.askyesno("Confirmar", f"¿Eliminar etiqueta '{t['name']}'?\nEsto la quitará de las acciones que la tengan."):
+            delete_tag(t["id"])
+
+
+class ActionEditor(tk.Toplevel):
+    def __init__(self, master, project_id, action=None, on_save=None):
+        super().__init__(master)
+        self.title("Acción")
+        self.geometry("620x520")
+        self.project_id = project_id
+        self.action = action
+        self.on_save = on_save
+        self.db = master.db
+
+        self.configure(padx=10, pady=10)
+        ttk.Label(self, text="Descripción:").grid(row=0, column=0, sticky="w")
+        self.desc_entry = ttk.Entry(self, width=60)
+        self.desc_entry.grid(row=0, column=1, columnspan=3, sticky="ew")
+        self.grid_columnconfigure(1, weight=1)
+
+        ttk.Label(self, text="Buscar etiqueta:").grid(row=1, column=0, sticky="w", pady=(10,0))
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self, textvariable=self.search_var)
+        self.search_entry.grid(row=1, column=1, sticky="ew", pady=(10,0))
+        self.filtered_available = []
+        self.tag_index = SearchIndex()
+        self._refresh_later = Debouncer(self, self._refresh_results)
+        self.search_var.trace_add("write", self._refresh_later)
+
+        ttk.Button(self, text="Nueva etiqueta…", command=self.create_new_tag).grid(row=1, column=2, sticky="w", padx=(8,0), pady=(10,0))
+
+        ttk.Label(self, text="Etiquetas disponibles (doble clic para añadir):").grid(row=2, column=0, columnspan=2, sticky="w", pady=(8,0))
+        results_frame = ttk.Frame(self)
+        results_frame.grid(row=3, column=0, columnspan=3, sticky="nsew")
+        self.grid_rowconfigure(3, weight=1)
+        self.available_list = tk.Listbox(results_frame, height=10, selectmode=tk.BROWSE)
+        vscroll_av = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.available_list.yview)
+        self.available_list.configure(yscrollcommand=vscroll_av.set)
+        self.available_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vscroll_av.pack(side=tk.RIGHT, fill=tk.Y)
+        self.available_list.bind("<Double-1>", lambda e: self.add_selected_from_results())
+        self.search_entry.bind("<Return>", lambda e: self.add_selected_from_results(first_only=True))
+
+        ttk.Button(self, text="Añadir seleccionada", command=self.add_selected_from_results).grid(row=4, column=0, sticky="w", pady=(6,0))
+
+        ttk.Label(self, text="Etiquetas de la acción:").grid(row=5, column=0, sticky="w", pady=(10,0))
+        self.selected_tags_list = tk.Listbox(self, height=8, selectmode=tk.SINGLE)
+        self.selected_tags_list.grid(row=6, column=0, columnspan=2, sticky="nsew")
+        self.grid_rowconfigure(6, weight=1)
+        ttk.Button(self, text="Quitar etiqueta", command=self.remove_selected_tag).grid(row=6, column=2, sticky="n", padx=(8,0))
+
+        self.status_var = tk.BooleanVar(value=False)
+        self.status_check = ttk.Checkbutton(self, text="Marcar como completada", variable=self.status_var)
+        self.status_check.grid(row=7, column=0, columnspan=2, sticky="w", pady=(10,0))
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.grid(row=8, column=0, columnspan=3, sticky="e", pady=(12,0))
+        self.save_btn = ttk.Button(btn_frame, text="Guardar", command=self.save)
+        self.save_btn.grid(row=0, column=0, padx=(0,6))
+        ttk.Button(btn_frame, text="Cancelar", command=self.destroy).grid(row=0, column=1)
+
+        self.selected_tag_ids = []
+        self._load_all_tags()
+        tag_catalog.subscribe(self._on_tag_event)
+
+        if self.action:
+            self.desc_entry.insert(0, self.action["description"])
+            self.status_var.set(bool(self.action["is_complete"]))
+            # Saving replaces the action's tags, so it waits until they load.
+            self.save_btn.state(["disabled"])
+            self.db.submit(get_action_tags, self.action["id"], on_done=self._show_current_tags,
+                           on_error=self._on_load_error, owner=self)
+
+    def _show_current_tags(self, current):
+        # Tags added while these were loading stay after them.
+        added = list(zip(self.selected_tag_ids, self.selected_tags_list.get(0, tk.END)))
+        self.selected_tags_list.delete(0, tk.END)
+        self.selected_tag_ids = []
+        for tag_id, name in [(t["id"], t["name"]) for t in current] + added:
+            if tag_id not in self.selected_tag_ids:
+                self.selected_tags_list.insert(tk.END, name)
+                self.selected_tag_ids.append(tag_id)
+        self._refresh_results()
+        self.save_btn.state(["!disabled"])
+
+    def _on_load_error(self, exc):
+        messagebox.showerror("Error", f"No se pudieron cargar las etiquetas: {exc}", parent=self)
+        self.destroy()
+
+    def destroy(self):
+        self._refresh_later.cancel()
+        tag_catalog.unsubscribe(self._on_tag_event)
+        super().destroy()
+
+    def _load_all_tags(self):
+        self.all_tags = tag_catalog.all()
+        self.tag_index.set_rows(self.all_tags)
+        self._refresh_results()
+
+    def _on_tag_event(self, event):
+        if event.kind in ("renamed", "deleted") and event.tag["id"] in self.selected_tag_ids:
+            i = self.selected_tag_ids.index(event.tag["id"])
+            self.selected_tags_list.delete(i)
+            if event.kind == "renamed":
+                self.selected_tags_list.insert(i, event.tag["name"])
+            else:
+                del self.selected_tag_ids[i]
+        if not apply_tag_event(self.all_tags, event):
+            self._load_all_tags()
+            return
+        self.tag_index.invalidate()
+        term = self.tag_index.fold_term(self.search_var.get())
+        apply_tag_event(self.filtered_available, event, self.available_list,
+                        visible=lambda t: t["id"] not in self.selected_tag_ids and self.tag_index.matches(t, term))
+
+    @ui_event
+    def _refresh_results(self):
+        self._refresh_later.cancel()
+        selected = set(self.selected_tag_ids)
+        available = [t for t in self.tag_index.filter(self.search_var.get()) if t["id"] not in selected]
+        fill_listbox(self.available_list, self.filtered_available, available)
+        self.filtered_available = available
+
+    @ui_event
+    def add_selected_from_results(self, first_only=False):
+        self._refresh_later.flush()
+        idx = None
+        if first_only:
+            if self.filtered_available:
+                idx = 0
+        else:
+            sel = self.available_list.curselection()
+            if sel:
+                idx = sel[0]
+        if idx is None:
+            return
+        t = self.filtered_available[idx]
+        if t["id"] in self.selected_tag_ids:
+            return
+        self.selected_tag_ids.append(t["id"])
+        self.selected_tags_list.insert(tk.END, t["name"])
+        self._refresh_results()
+
+    @ui_event
+    def create_new_tag(self):
+        name = simpledialog.askstring("Nueva etiqueta", "Nombre de la etiqueta:", parent=self)
+        if not name:
+            return
+        name = name.strip()
+        if not name:
+            return
+        try:
+            create_tag(name)
+            self.search_var.set(name)
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", f"Ya existe la etiqueta '{name}'.")
+
+    @ui_event
+    def remove_selected_tag(self):
+        idx = self.selected_tags_list.curselection()
+        if not idx:
+            return
+        self.selected_tags_list.delete(idx[0])
+        del self.selected_tag_ids[idx[0]]
+        self._refresh_results()
+
+    @ui_event
+    def save(self):
+        desc = self.desc_entry.get().strip()
+        if not desc:
+            messagebox.showinfo("Info", "La descripción no puede estar vacía.")
+            return
+        self.save_btn.state(["disabled"])
+        if self.action:
+            job = (update_action, self.action["id"], desc, list(self.selected_tag_ids), self.status_var.get())
+        else:
+            job = (create_action, self.project_id, desc, list(self.selected_tag_ids))
+        self.db.submit(*job, on_done=self._on_saved, on_error=self._on_save_error, owner=self)
+
+    def _on_saved(self, row):
+        if self.on_save:
+            self.on_save(row)
+        self.destroy()
+
+    def _on_save_error(self, exc):
+        self.save_btn.state(["!disabled"])
+        messagebox.showerror("Error", f"No se pudo guardar la acción: {exc}", parent=self)
+
+
+class NextActionDialog(tk.Toplevel):
+    def __init__(self, master, action_row, tags_for_action, focus_project_cb, mark_done_cb, skip_cb=None):
+        super().__init__(master)
+        self.title("Siguiente acción")
+        self.geometry("520x240")
+        self.configure(padx=12, pady=12)
+
+        ttk.Label(self, text="Proyecto:", font=("TkDefaultFont", 10, "bold")).grid(row=0, column=0, sticky="w")
+        ttk.Label(self, text=action_row["project_name"]).grid(row=0, column=1, sticky="w")
+
+        ttk.Label(self, text="Acción:", font=("TkDefaultFont", 10, "bold")).grid(row=1, column=0, sticky="w", pady=(6,0))
+        ttk.Label(self, text=action_row["description"], wraplength=380).grid(row=1, column=1, sticky="w", pady=(6,0))
+
+        ttk.Label(self, text="Etiquetas:", font=("TkDefaultFont", 10, "bold")).grid(row=2, column=0, sticky="w", pady=(6,0))
+        ttk.Label(self, text=", ".join(tags_for_action)).grid(row=2, column=1, sticky="w", pady=(6,0))
+
+        btnf = ttk.Frame(self)
+        btnf.grid(row=3, column=0, columnspan=2, sticky="e", pady=(16,0))
+        ttk.Button(btnf, text="Marcar como completada", command=lambda: (mark_done_cb(action_row["id"]), self._close())).grid(row=0, column=0, padx=(0,8))
+        ttk.Button(btnf, text="Ir al proyecto", command=lambda: (focus_project_cb(action_row["project_id"], action_row["id"]), self._close())).grid(row=0, column=1)
+        if skip_cb:
+            ttk.Button(btnf, text="Saltar", command=lambda: (skip_cb(action_row), self._close())).grid(row=0, column=2, padx=(8,0))
+        ttk.Button(btnf, text="Cerrar", command=self._close).grid(row=0, column=3, padx=(8,0))
+
+    def _close(self):
+        self.destroy()
+
+
+class MatchingActionsDialog(tk.Toplevel):
+    def __init__(self, master, tag_filter, focus_project_cb, mark_done_cb):
+        super().__init__(master)
+        self.title("Acciones coincidentes (pendientes)")
+        self.geometry("900x420")
+        self.configure(padx=12, pady=12)
+        self.tag_filter = tag_filter
+        self.db = master.db
+        self.focus_project_cb = focus_project_cb
+        self.mark_done_cb = mark_done_cb
+
+        self.results_label = ttk.Label(self, text="Resultados", font=("TkDefaultFont", 10, "bold"))
+        self.results_label.pack(anchor="w")
+
+        cols = ("id", "proyecto", "descripcion", "tags", "creada")
+        self.tree = ttk.Treeview(self, columns=cols, show="headings", height=14)
+        self.tree.heading("id", text="ID")
+        self.tree.heading("proyecto", text="Proyecto")
+        self.tree.heading("descripcion", text="Descripción")
+        self.tree.heading("tags", text="Etiquetas")
+        self.tree.heading("creada", text="Creada")
+        self.tree.column("id", width=50, anchor="center")
+        self.tree.column("proyecto", width=160)
+        self.tree.column("descripcion", width=320)
+        self.tree.column("tags", width=200)
+        self.tree.column("creada", width=150, anchor="center")
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill=tk.BOTH, expand=True, pady=(6,8))
+        vscroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.pack(in_=tree_frame, side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vscroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results = LazyTreeview(
+            self.tree, self.db,
+            values_of=lambda r: (r["id"], r["project_name"], r["description"], r["tag_names"] or "", r["created_at"]),
+            key_of=action_creation_key,
+            scrollbar=vscroll,
+        )
+
+        self.btn_frame = ttk.Frame(self)
+        self.btn_frame.pack(fill=tk.X)
+        ttk.Button(self.btn_frame, text="Marcar como completada", command=self._mark_selected).pack(side=tk.LEFT)
+        ttk.Button(self.btn_frame, text="Ir al proyecto", command=self._goto_selected).pack(side=tk.LEFT, padx=(8,0))
+        ttk.Button(self.btn_frame, text="Cerrar", command=self.destroy).pack(side=tk.RIGHT)
+
+        self._load_results()
+
+    @ui_event
+    def _load_results(self):
+        tag_filter = self.tag_filter
+        self.results.reset(lambda after, limit: find_actions_by_filter(tag_filter, after, limit),
+                           then=self._on_first_page)
+
+    def _on_first_page(self):
+        if not self.tree.get_children():
+            messagebox.showinfo("Sin resultados", "No hay acciones pendientes que coincidan con las etiquetas seleccionadas.")
+            self.destroy()
+
+    def _get_selected_action_id(self):
+        sel = self.tree.selection()
+        if not sel:
+            return None
+        vals = self.tree.item(sel[0], "values")
+        return int(vals[0])
+
+    @ui_event
+    def _mark_selected(self):
+        aid = self._get_selected_action_id()
+        if not aid:
+            messagebox.showinfo("Info", "Selecciona una acción en la lista.")
+            return
+        self.mark_done_cb(aid)
+        self._after_mark_done(aid)
+
+    def _after_mark_done(self, aid):
+        # Only pending actions are listed, so the row simply leaves the view.
+        self.results.remove(aid)
+
+    @ui_event
+    def _goto_selected(self):
+        aid = self._get_selected_action_id()
+        if not aid:
+            messagebox.showinfo("Info", "Selecciona una acción en la lista.")
+            return
+        self.db.submit(get_action, aid, on_done=self._goto, owner=self)
+
+    def _goto(self, row):
+        if row:
+            self.focus_project_cb(row["project_id"], row["id"])
+            self.destroy()
+
+
+class SearchResultsDialog(MatchingActionsDialog):
+    def __init__(self, master, text, focus_project_cb, mark_done_cb):
+        self.search_text = text
+        self.offset = 0
+        self.include_completed_var = tk.BooleanVar(master=master, value=False)
+        super().__init__(master, TagFilter(), focus_project_cb, mark_done_cb)
+        self.title("Buscar acciones")
+
+        search_row = ttk.Frame(self)
+        search_row.pack(fill=tk.X, pady=(0,6), before=self.results_label)
+        self.search_var = tk.StringVar(value=text)
+        search_entry = ttk.Entry(search_row, textvariable=self.search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        search_entry.bind("<Return>", lambda e: self._new_search())
+        ttk.Checkbutton(search_row, text="Incluir completadas", variable=self.include_completed_var,
+                        command=self._new_search).pack(side=tk.LEFT, padx=(8,0))
+        ttk.Button(search_row, text="Buscar", command=self._new_search).pack(side=tk.LEFT, padx=(8,0))
+        search_entry.focus_set()
+
+        self.more_btn = ttk.Button(self.btn_frame, text="Más resultados", command=self._fetch_page)
+        self.more_btn.pack(side=tk.LEFT, padx=(8,0))
+        self.more_btn.state(["disabled"])
+
+    @ui_event
+    def _new_search(self):
+        self.search_text = self.search_var.get().strip()
+        self._load_results()
+
+    def _load_results(self):
+        self.offset = 0
+        self.tree.delete(*self.tree.get_children())
+        self._fetch_page()
+
+    @ui_event
+    def _fetch_page(self):
+        # One extra row tells whether another page exists.
+        self.db.submit(search_actions, self.search_text, self.include_completed_var.get(),
+                       SEARCH_PAGE_SIZE + 1, self.offset,
+                       on_done=self._render_page, channel=("search", id(self)), owner=self)
+
+    def _after_mark_done(self, aid):
+        self._load_results()
+
+    def _render_page(self, rows):
+        has_more = len(rows) > SEARCH_PAGE_SIZE
+        rows = rows[:SEARCH_PAGE_SIZE]
+        for r in rows:
+            self.tree.insert("", tk.END, values=(r["id"], r["project_name"], r["description"], r["tag_names"] or "", r["created_at"]))
+        self.offset += len(rows)
+        suffix = "+" if has_more else ""
+        self.results_label.configure(text=f"Resultados: {self.offset}{suffix}")
+        self.more_btn.state(["!disabled"] if has_more else ["disabled"])
+
+
+class BulkTagDialog(tk.Toplevel):
+    # Adds or removes the chosen tags on every selected action at once.
+    def __init__(self, master, count, on_apply):
+        super().__init__(master)
+        self.title("Etiquetar acciones")
+        self.geometry("360x400")
+        self.configure(padx=10, pady=10)
+        self.on_apply = on_apply
+        ttk.Label(self, text=f"Etiquetas para {count} acciones seleccionadas:").pack(anchor="w")
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=(6,8))
+        self.tags = tag_catalog.all()
+        self.tag_list = tk.Listbox(list_frame, selectmode=tk.EXTENDED, exportselection=False)
+        vscroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tag_list.yview)
+        self.tag_list.configure(yscrollcommand=vscroll.set)
+        self.tag_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vscroll.pack(side=tk.RIGHT, fill=tk.Y)
+        if self.tags:
+            self.tag_list.insert(tk.END, *(t["name"] for t in self.tags))
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill=tk.X)
+        ttk.Button(btn_frame, text="Añadir", command=lambda: self._apply(add=True)).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Quitar", command=lambda: self._apply(add=False)).pack(side=tk.LEFT, padx=(8,0))
+        ttk.Button(btn_frame, text="Cerrar", command=self.destroy).pack(side=tk.RIGHT)
+
+    def _apply(self, add):
+        tag_ids = [self.tags[i]["id"] for i in self.tag_list.curselection()]
+        if not tag_ids:
+            messagebox.showinfo("Info", "Selecciona al menos una etiqueta.", parent=self)
+            return
+        self.on_apply(tag_ids, add)
+        self.destroy()
+
+
+class StatsWindow(tk.Toplevel):
+    # Instrumentation report (F12): per-function and per-statement latencies,
+    # queries per UI event and the slow-query log with its plans.
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Estadísticas de la base de datos")
+        self.geometry("980x560")
+        text_frame = ttk.Frame(self, padding=(10,10,10,0))
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        self.text = tk.Text(text_frame, wrap="none", font="TkFixedFont")
+        vscroll = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=vscroll.set)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vscroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        btn_frame = ttk.Frame(self, padding=10)
+        btn_frame.pack(fill=tk.X)
+        self.toggle_btn = ttk.Button(btn_frame, command=self._toggle)
+        self.toggle_btn.pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Actualizar", command=self.refresh).pack(side=tk.LEFT, padx=(8,0))
+        ttk.Button(btn_frame, text="Reiniciar", command=self._reset).pack(side=tk.LEFT, padx=(8,0))
+        ttk.Button(btn_frame, text="Cerrar", command=self.destroy).pack(side=tk.RIGHT)
+        self.refresh()
+
+    def refresh(self):
+        self.toggle_btn.configure(text="Desactivar" if instrumentation.enabled else "Activar")
+        if instrumentation.enabled:
+            report = instrumentation.report()
+        else:
+            report = "La instrumentación está desactivada (actívala aquí o con --stats / PERSONAL_BOSS_INSTRUMENT=1)."
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", report)
+        self.text.configure(state=tk.DISABLED)
+
+    def _toggle(self):
+        # Reopening the pool must not race a job on the DB worker.
+        toggle = instrumentation.disable if instrumentation.enabled else instrumentation.enable
+        self.master.db.submit(toggle, on_done=lambda _: self.refresh(), owner=self)
+
+    def _reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+
+FILTER_MODES = ("todas (Y)", "alguna (O)")
+
+class App(tk.Tk):
+    def __init__(self, on_ready=None):
+        super().__init__()
+        self.title(APP_TITLE)
+        self.geometry("1100x640")
+        self.minsize(980, 560)
+
+        self.db = DBExecutor(self)
+        self._projects_cache = []
+        self._filtered_projects = []
+        self._project_index = SearchIndex()
+        self._shown_project_id = None
+        self._drag_iid = None
+        self.change_feed = ChangeFeed()
+        self.all_tags = []
+        self.exclude_tags = []
+        self._backup_running = False
+        self._archive_running = False
+        self._build_main_area()
+        tag_catalog.subscribe(self._on_tag_event)
+        # The window is drawn while projects and tags load on the DB worker.
+        self.db.submit(self._load_startup_data, on_done=lambda data: self._render_startup_data(data, on_ready))
+        self.db.submit(tag_bitmaps.warm)
+        self.after(CHECKPOINT_POLL_MS, self._idle_checkpoint)
+        self.after(BACKUP_POLL_MS, self._scheduled_backup)
+        self.after(ARCHIVE_POLL_MS, self._scheduled_archive)
+        self.bind("<F12>", lambda e: StatsWindow(self))
+
+    def _load_startup_data(self):
+        # The feed position is taken first, so nothing committed while the
+        # lists load is missed.
+        self.change_feed.start()
+        return list_projects(), tag_catalog.all()
+
+    def _render_startup_data(self, data, on_ready=None):
+        self._projects_cache, _tags = data
+        self._project_index.set_rows(self._projects_cache)
+        self._apply_project_filter()
+        self._refresh_filter_tags()
+        self.after(CHANGES_POLL_MS, self._poll_changes)
+        if on_ready:
+            on_ready()
+
+    @staticmethod
+    def _idle_maintenance():
+        get_pool().checkpoint_if_idle()
+        prune_changes()
+
+    def _idle_checkpoint(self):
+        self.db.submit(self._idle_maintenance,
+                       on_error=lambda e: print(f"Advertencia: checkpoint fallido: {e}"))
+        self.after(CHECKPOINT_POLL_MS, self._idle_checkpoint)
+
+    # -------- Changes made by other processes -------- #
+    def _poll_changes(self):
+        # The next poll is scheduled once this one is delivered, so polls
+        # never pile up behind a busy worker.
+        def schedule(_=None):
+            self.after(CHANGES_POLL_MS, self._poll_changes)
+
+        def done(update):
+            try:
+                if update is not None:
+                    self._apply_feed_update(update)
+            finally:
+                schedule()
+
+        def failed(exc):
+            print(f"Advertencia: no se pudieron leer los cambios: {exc}")
+            schedule()
+
+        self.db.submit(self.change_feed.poll, on_done=done, on_error=failed)
+
+    def _apply_feed_update(self, update):
+        self.change_feed.apply(update)
+        if update.reload:
+            self._load_projects()
+            self._reload_actions_for_current_project()
+            return
+        if update.projects:
+            self._apply_project_changes(update.projects)
+        for action_id, row in update.actions.items():
+            if row is None:
+                self.actions_view.remove(action_id)
+            else:
+                self._patch_action_row(row)
+
+    def _apply_project_changes(self, changes):
+        projects = {p["id"]: p for p in self._projects_cache}
+        changed = False
+        for project_id, row in changes.items():
+            cached = projects.get(project_id)
+            if row is None:
+                changed |= projects.pop(project_id, None) is not None
+            elif cached is None or tuple(cached) != tuple(row):
+                projects[project_id] = row
+                changed = True
+        if changed:
+            self._projects_cache = sorted(projects.values(), key=lambda p: (p["created_at"], p["id"]))
+            self._project_index.set_rows(self._projects_cache)
+            self._apply_project_filter()
+
+    def _scheduled_backup(self):
+        # Checked on every poll, so a missed day is caught up soon after start.
+        if not self._backup_running and backup_due():
+            self._backup_running = True
+            self.db.submit(backup_db, background=True,
+                           on_done=self._on_backup_done, on_error=self._on_backup_error)
+        self.after(BACKUP_POLL_MS, self._scheduled_backup)
+
+    def _on_backup_done(self, stats):
+        self._backup_running = False
+        print(f"Copia de seguridad: {stats.path} ({stats.pages} páginas en {stats.seconds:.2f} s)")
+
+    def _on_backup_error(self, exc):
+        self._backup_running = False
+        print(f"Advertencia: copia de seguridad fallida: {exc}")
+
+    def _scheduled_archive(self):
+        # Nothing due costs one index search, so the job just runs on every poll.
+        if not self._archive_running:
+            self._archive_running = True
+            self.db.submit(archive_completed_actions, background=True,
+                           on_done=self._on_archive_done, on_error=self._on_archive_error)
+        self.after(ARCHIVE_POLL_MS, self._scheduled_archive)
+
+    def _on_archive_done(self, stats):
+        self._archive_running = False
+        if not stats.actions:
+            return
+        print(f"Archivo: {stats.actions} acciones en {stats.batches} lotes, "
+              f"{stats.seconds:.2f} s ({archive_rate(stats):.0f} filas/s)")
+        # The change feed drops the archived rows from the list; bring them
+        # back when archived actions are being shown.
+        if self.show_archived_var.get():
+            self._reload_actions_for_current_project()
+
+    def _on_archive_error(self, exc):
+        self._archive_running = False
+        print(f"Advertencia: archivo fallido: {exc}")
+
+    def _build_main_area(self):
+        main = ttk.Panedwindow(self, orient=tk.HORIZONTAL)
+        main.pack(fill=tk.BOTH, expand=True)
+
+        left = ttk.Frame(main, padding=(10,10))
+        main.add(left, weight=1)
+
+        ttk.Label(left, text="Proyectos").pack(anchor="w")
+
+        # --- Project search ---
+        search_row = ttk.Frame(left)
+        search_row.pack(fill=tk.X, pady=(2,4))
+        self.project_search_var = tk.StringVar()
+        self.project_search_entry = ttk.Entry(search_row, textvariable=self.project_search_var)
+        self.project_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        clear_btn = ttk.Button(search_row, text="Limpiar", width=8, command=lambda: self.project_search_var.set(""))
+        clear_btn.pack(side=tk.LEFT, padx=(6,0))
+        self._project_filter_later = Debouncer(self, self._apply_project_filter)
+        self.project_search_var.trace_add("write", self._project_filter_later)
+
+        self.projects_list = tk.Listbox(left, height=12, exportselection=False)
+        self.projects_list.pack(fill=tk.BOTH, expand=True, pady=(4,6))
+        self.projects_list.bind("<<ListboxSelect>>", self._on_project_selected)
+
+        proj_btns = ttk.Frame(left)
+        proj_btns.pack(fill=tk.X, pady=(0,6))
+        ttk.Button(proj_btns, text="Agregar proyecto", command=self._add_project).pack(side=tk.LEFT)
+        ttk.Button(proj_btns, text="Renombrar", command=self._rename_project).pack(side=tk.LEFT, padx=(6,0))
+        ttk.Button(proj_btns, text="Eliminar", command=self._delete_project).pack(side=tk.LEFT, padx=(6,0))
+
+        center = ttk.Frame(main, padding=(10,10))
+        main.add(center, weight=3)
+
+        # --- Global action search ---
+        action_search_row = ttk.Frame(center)
+        action_search_row.pack(fill=tk.X, pady=(0,8))
+        self.action_search_var = tk.StringVar()
+        action_search_entry = ttk.Entry(action_search_row, textvariable=self.action_search_var)
+        action_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        action_search_entry.bind("<Return>", lambda e: self._search_actions())
+        ttk.Button(action_search_row, text="Buscar acciones", command=self._search_actions).pack(side=tk.LEFT, padx=(6,0))
+
+        ttk.Label(center, text="Acciones del proyecto seleccionado").pack(anchor="w")
+        columns = ("id", "descripcion", "tags", "estado", "creada")
+        self.actions_tree = ttk.Treeview(center, columns=columns, show="headings", height=16)
+        self.actions_tree.heading("id", text="ID")
+        self.actions_tree.heading("descripcion", text="Descripción")
+        self.actions_tree.heading("tags", text="Etiquetas")
+        self.actions_tree.heading("estado", text="Estado")
+        self.actions_tree.heading("creada", text="Creada")
+        self.actions_tree.column("id", width=40, anchor="center")
+        self.actions_tree.column("descripcion", width=360)
+        self.actions_tree.column("tags", width=240)
+        self.actions_tree.column("estado", width=100, anchor="center")
+        self.actions_tree.column("creada", width=180, anchor="center")
+        actions_frame = ttk.Frame(center)
+        actions_frame.pack(fill=tk.BOTH, expand=True, pady=(4,6))
+        actions_vscroll = ttk.Scrollbar(actions_frame, orient=tk.VERTICAL, command=self.actions_tree.yview)
+        self.actions_tree.pack(in_=actions_frame, side=tk.LEFT, fill=tk.BOTH, expand=True)
+        actions_vscroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.actions_view = LazyTreeview(
+            self.actions_tree, self.db,
+            values_of=self._action_values,
+            key_of=action_list_key,
+            scrollbar=actions_vscroll,
+        )
+
+        self.actions_tree.bind("<Double-1>", self._edit_selected_action)
+        self.actions_tree.bind("<ButtonPress-1>", self._on_drag_start, add="+")
+        self.actions_tree.bind("<B1-Motion>", self._on_drag_motion, add="+")
+        self.actions_tree.bind("<ButtonRelease-1>", self._on_drag_drop, add="+")
+
+        act_btns = ttk.Frame(center)
+        act_btns.pack(fill=tk.X)
+        ttk.Button(act_btns, text="Agregar acción", command=self._add_action).pack(side=tk.LEFT)
+        ttk.Button(act_btns, text="Editar", command=self._edit_selected_action).pack(side=tk.LEFT, padx=(6,0))
+        ttk.Button(act_btns, text="Alternar completa", command=self._toggle_selected_action).pack(side=tk.LEFT, padx=(6,0))
+        ttk.Button(act_btns, text="Eliminar", command=self._delete_selected_action).pack(side=tk.LEFT, padx=(6,0))
+        ttk.Button(act_btns, text="Etiquetar…", command=self._tag_selected_actions).pack(side=tk.LEFT, padx=(6,0))
+        self.show_archived_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(act_btns, text="Mostrar archivadas", variable=self.show_archived_var,
+                        command=self._reload_actions_for_current_project).pack(side=tk.RIGHT)
+
+        right = ttk.Frame(main, padding=(10,10))
+        main.add(right, weight=1)
+
+        ttk.Label(right, text="Filtrar por etiquetas").pack(anchor="w")
+
+        list_frame = ttk.Frame(right)
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=(4,6))
+
+        self.filter_tags_list = tk.Listbox(list_frame, selectmode=tk.EXTENDED, exportselection=False)
+        vscroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.filter_tags_list.yview)
+        self.filter_tags_list.configure(yscrollcommand=vscroll.set)
+
+        self.filter_tags_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vscroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        mode_row = ttk.Frame(right)
+        mode_row.pack(fill=tk.X)
+        ttk.Label(mode_row, text="Coincidir con:").pack(side=tk.LEFT)
+        self.filter_mode_var = tk.StringVar(value=FILTER_MODES[0])
+        ttk.Combobox(mode_row, textvariable=self.filter_mode_var, values=FILTER_MODES,
+                     state="readonly", width=18).pack(side=tk.LEFT, padx=(6,0))
+
+        ttk.Label(right, text="Excluir etiquetas").pack(anchor="w", pady=(8,0))
+        exclude_frame = ttk.Frame(right)
+        exclude_frame.pack(fill=tk.BOTH, pady=(4,6))
+        self.exclude_tags_list = tk.Listbox(exclude_frame, selectmode=tk.EXTENDED, exportselection=False, height=6)
+        vscroll_ex = ttk.Scrollbar(exclude_frame, orient=tk.VERTICAL, command=self.exclude_tags_list.yview)
+        self.exclude_tags_list.configure(yscrollcommand=vscroll_ex.set)
+        self.exclude_tags_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vscroll_ex.pack(side=tk.RIGHT, fill=tk.Y)
+
+        ttk.Button(right, text="Siguiente acción", command=self._show_next_action).pack(fill=tk.X, pady=(6,4))
+        ttk.Button(right, text="Ver acciones coincidentes", command=self._show_matching_actions).pack(fill=tk.X, pady=(0,4))
+        ttk.Button(right, text="Gestionar etiquetas…", command=self._open_tag_manager).pack(fill=tk.X)
+
+    # -------- Projects filtering -------- #
+    @ui_event
+    def _apply_project_filter(self):
+        self._project_filter_later.cancel()
+        current = self._get_selected_project()
+        current_id = current["id"] if current else None
+
+        projects = self._project_index.filter(self.project_search_var.get())
+        fill_listbox(self.projects_list, self._filtered_projects, projects)
+        self._filtered_projects = projects
+
+        target_index = None
+        if current_id is not None:
+            for i, p in enumerate(projects):
+                if p["id"] == current_id:
+                    target_index = i
+                    break
+        if target_index is None and projects:
+            target_index = 0
+        self.projects_list.selection_clear(0, tk.END)
+        if target_index is not None:
+            self.projects_list.selection_set(target_index)
+            self.projects_list.see(target_index)
+        self._on_project_selected(None)
+
+    def _refresh_projects_view_only(self):
+        self.projects_list.delete(0, tk.END)
+        for p in self._filtered_projects:
+            self.projects_list.insert(tk.END, p["name"])
+
+    def _load_projects(self):
+        self.db.submit(list_projects, on_done=self._render_projects, channel="projects")
+
+    def _render_projects(self, projects):
+        self._projects_cache = projects
+        self._project_index.set_rows(self._projects_cache)
+        self._apply_project_filter()
+
+    def _get_selected_project(self):
+        idxs = self.projects_list.curselection()
+        if not idxs:
+            return None
+        return self._filtered_projects[idxs[0]]
+
+    @ui_event
+    def _on_project_selected(self, event):
+        # Filtering and re-clicking keep the selection; only a different
+        # project needs its actions reloaded.
+        p = self._get_selected_project()
+        if (p["id"] if p else None) != self._shown_project_id:
+            self._reload_actions_for_current_project()
+
+    def _reload_actions_for_current_project(self, then=None):
+        p = self._get_selected_project()
+        self._shown_project_id = p["id"] if p else None
+        if not p:
+            self.actions_view.clear()
+            return
+        project_id = p["id"]
+        include_archived = self.show_archived_var.get()
+        self.actions_view.reset(lambda after, limit: list_actions_page(project_id, after, limit, include_archived),
+                                then=then)
+
+    def _patch_action_row(self, row):
+        # Apply one changed action returned by a mutation helper to the list.
+        if row is None:
+            return
+        p = self._get_selected_project()
+        if p and row["project_id"] == p["id"]:
+            self.actions_view.upsert(row)
+        else:
+            self.actions_view.remove(row["id"])
+
+    @staticmethod
+    def _action_values(a):
+        if is_archived(a):
+            estado = "Archivada"
+        else:
+            estado = "Completada" if a["is_complete"] else "Pendiente"
+        return (a["id"], a["description"], a["tag_names"] or "", estado, a["created_at"])
+
+    # -------- Drag to reorder -------- #
+    def _on_drag_start(self, event):
+        self._drag_iid = self.actions_tree.identify_row(event.y) or None
+
+    def _on_drag_motion(self, event):
+        if self._drag_iid and self.actions_tree.identify_row(event.y) not in ("", self._drag_iid):
+            self.actions_tree.configure(cursor="sb_v_double_arrow")
+
+    @ui_event
+    def _on_drag_drop(self, event):
+        source, self._drag_iid = self._drag_iid, None
+        self.actions_tree.configure(cursor="")
+        target = self.actions_tree.identify_row(event.y)
+        if not source or not target or source == target:
+            return
+        # Dropped below its old place the action lands after the target row,
+        # above it before; only the moved row gets a new position.
+        if self.actions_tree.index(target) > self.actions_tree.index(source):
+            anchor = {"after_id": int(target)}
+        else:
+            anchor = {"before_id": int(target)}
+        self.db.submit(lambda: move_action(int(source), **anchor), on_done=self._patch_action_row)
+
+    def _refresh_filter_tags(self):
+        self.all_tags = tag_catalog.all()
+        self.exclude_tags = list(self.all_tags)
+        for listbox in (self.filter_tags_list, self.exclude_tags_list):
+            selected_names = [listbox.get(i) for i in listbox.curselection()]
+            listbox.delete(0, tk.END)
+            for t in self.all_tags:
+                listbox.insert(tk.END, t["name"])
+            to_select = []
+            for i, t in enumerate(self.all_tags):
+                if t["name"] in selected_names:
+                    to_select.append(i)
+            for i in to_select:
+                listbox.selection_set(i)
+
+    def _on_tag_event(self, event):
+        if event.kind in ("renamed", "deleted"):
+            self._patch_listed_tag_names(event)
+        if not apply_tag_event(self.all_tags, event, self.filter_tags_list):
+            self._refresh_filter_tags()
+            return
+        apply_tag_event(self.exclude_tags, event, self.exclude_tags_list)
+
+    def _patch_listed_tag_names(self, event):
+        # Renaming a tag changes no action, so the feed reports no action
+        # rows; the names already shown in the list are patched here.
+        for iid in self.actions_tree.get_children():
+            values = list(self.actions_tree.item(iid, "values"))
+            tag_names = patch_tag_names(values[2], event)
+            if tag_names is not None:
+                values[2] = tag_names
+                self.actions_tree.item(iid, values=values)
+
+    def _get_selected_filter_tag_ids(self):
+        indices = self.filter_tags_list.curselection()
+        ids = []
+        for i in indices:
+            ids.append(self.all_tags[i]["id"])
+        return ids
+
+    def _get_tag_filter(self):
+        tag_ids = self._get_selected_filter_tag_ids()
+        excluded = [self.exclude_tags[i]["id"] for i in self.exclude_tags_list.curselection()]
+        if self.filter_mode_var.get() == FILTER_MODES[1]:
+            return TagFilter(any_of=tag_ids, none_of=excluded)
+        return TagFilter(all_of=tag_ids, none_of=excluded)
+
+    @ui_event
+    def _show_next_action(self, tag_filter=None, after=None):
+        if tag_filter is None:
+            tag_filter = self._get_tag_filter()
+
+        def load():
+            row = find_next_action_by_filter(tag_filter, after=after)
+            if not row:
+                return None, []
+            return row, [t["name"] for t in get_action_tags(row["id"])]
+
+        self.db.submit(load, on_done=lambda result: self._render_next_action(tag_filter, after, result), channel="next")
+
+    def _render_next_action(self, tag_filter, after, result):
+        row, tags = result
+        if not row:
+            if after is not None:
+                messagebox.showinfo("Sin resultados", "No hay más acciones pendientes que coincidan con las etiquetas seleccionadas.")
+            else:
+                messagebox.showinfo("Sin resultados", "No hay acciones pendientes que coincidan con las etiquetas seleccionadas.")
+            return
+        NextActionDialog(
+            self,
+            row,
+            tags,
+            focus_project_cb=self._focus_project_and_action,
+            mark_done_cb=self._mark_action_done_and_refresh,
+            skip_cb=lambda current: self._show_next_action(tag_filter, after=current),
+        )
+
+    @ui_event
+    def _show_matching_actions(self):
+        MatchingActionsDialog(
+            self,
+            self._get_tag_filter(),
+            focus_project_cb=self._focus_project_and_action,
+            mark_done_cb=self._mark_action_done_and_refresh
+        )
+
+    @ui_event
+    def _search_actions(self):
+        text = self.action_search_var.get().strip()
+        if not text:
+            return
+        SearchResultsDialog(
+            self,
+            text,
+            focus_project_cb=self._focus_project_and_action,
+            mark_done_cb=self._mark_action_done_and_refresh
+        )
+
+    def _open_tag_manager(self):
+        TagManager(self, on_close=self._refresh_after_tag_manager)
+
+    def _refresh_after_tag_manager(self):
+        self._reload_actions_for_current_project()
+
+    @ui_event
+    def _mark_action_done_and_refresh(self, action_id):
+        self.db.submit(toggle_action_status, action_id, on_done=self._patch_action_row)
+
+    @ui_event
+    def _focus_project_and_action(self, project_id, action_id):
+        target_index = None
+        for idx, p in enumerate(getattr(self, "_filtered_projects", [])):
+            if p["id"] == project_id:
+                target_index = idx
+                break
+        if target_index is None:
+            self.project_search_var.set("")
+            self._project_filter_later.flush()
+            for idx, p in enumerate(self._filtered_projects):
+                if p["id"] == project_id:
+                    target_index = idx
+                    break
+
+        if target_index is not None:
+            self.projects_list.selection_clear(0, tk.END)
+            self.projects_list.selection_set(target_index)
+            self.projects_list.see(target_index)
+            self._reload_actions_for_current_project(then=lambda: self._select_action_row(action_id))
+
+    def _select_action_row(self, action_id):
+        iid = str(action_id)
+        if self.actions_tree.exists(iid):
+            self.actions_tree.selection_set(iid)
+            self.actions_tree.see(iid)
+        else:
+            # The action may be on a page that is not loaded yet.
+            self.actions_view.load_more(then=lambda: self._select_action_row(action_id))
+
+    # -------------------- Project CRUD -------------------- #
+    @ui_event
+    def _add_project(self):
+        name = simpledialog.askstring("Nuevo proyecto", "Nombre del proyecto:", parent=self)
+        if not name:
+            return
+        name = name.strip()
+        if not name:
+            return
+        self.db.submit(create_project, name, on_done=lambda _: self._load_projects(),
+                       on_error=lambda e: self._on_project_error(e, name))
+
+    def _on_project_error(self, exc, name):
+        if isinstance(exc, sqlite3.IntegrityError):
+            messagebox.showerror("Error", f"Ya existe un proyecto llamado '{name}'.")
+        else:
+            messagebox.showerror("Error de base de datos", str(exc))
+
+    @ui_event
+    def _rename_project(self):
+        p = self._get_selected_project()
+        if not p:
+            messagebox.showinfo("Info", "Selecciona un proyecto para renombrar.")
+            return
+        new_name = simpledialog.askstring("Renombrar proyecto", "Nuevo nombre:", initialvalue=p["name"], parent=self)
+        if not new_name:
+            return
+        new_name = new_name.strip()
+        if not new_name:
+            return
+        self.db.submit(update_project, p["id"], new_name, on_done=lambda _: self._load_projects(),
+                       on_error=lambda e: self._on_project_error(e, new_name))
+
+    @ui_event
+    def _delete_project(self):
+        p = self._get_selected_project()
+        if not p:
+            messagebox.showinfo("Info", "Selecciona un proyecto para eliminar.")
+            return
+        if messagebox.askyesno("Confirmar", f"¿Eliminar el proyecto '{p['name']}' y todas sus acciones?"):
+            # The cascade can touch many actions; it runs on the DB worker.
+            self.db.submit(delete_project, p["id"], on_done=lambda _: self._load_projects())
+
+    # -------------------- Action CRUD -------------------- #
+    def _get_selected_action_id(self):
+        sel = self.actions_tree.selection()
+        if not sel:
+            return None
+        values = self.actions_tree.item(sel[0], "values")
+        return int(values[0])
+
+    @ui_event
+    def _add_action(self):
+        p = self._get_selected_project()
+        if not p:
+            messagebox.showinfo("Info", "Primero crea o selecciona un proyecto.")
+            return
+        ActionEditor(self, p["id"], action=None, on_save=self._patch_action_row)
+
+    @ui_event
+    def _edit_selected_action(self, event=None):
+        p = self._get_selected_project()
+        if not p:
+            return
+        aid = self._get_selected_action_id()
+        if not aid:
+            messagebox.showinfo("Info", "Selecciona una acción para editar.")
+            return
+        if self._offer_restore([aid]):
+            return
+        project_id = p["id"]
+
+        def open_editor(action_row):
+            if action_row:
+                ActionEditor(self, project_id, action=action_row, on_save=self._patch_action_row)
+        self.db.submit(get_action, aid, on_done=open_editor)
+
+    def _get_selected_action_ids(self):
+        return [int(self.actions_tree.item(iid, "values")[0]) for iid in self.actions_tree.selection()]
+
+    def _offer_restore(self, ids):
+        # Archived actions are read-only. Returns True when the selection had
+        # some, after offering to move them back to the list.
+        archived = [aid for aid in ids if self.actions_tree.set(str(aid), "estado") == "Archivada"]
+        if not archived:
+            return False
+        if messagebox.askyesno("Acciones archivadas",
+                               f"{len(archived)} de las acciones seleccionadas están archivadas y no se pueden "
+                               "modificar. ¿Restaurarlas?"):
+            self.db.submit(restore_archived_actions, archived,
+                           on_done=lambda rows: [self._patch_action_row(r) for r in rows])
+        return True
+
+    def _apply_change_set(self, changes):
+        for row in changes.created + changes.updated:
+            self._patch_action_row(row)
+        for row in changes.deleted:
+            self.actions_view.remove(row["id"])
+
+    @ui_event
+    def _toggle_selected_action(self):
+        ids = self._get_selected_action_ids()
+        if not ids:
+            messagebox.showinfo("Info", "Selecciona una acción para alternar su estado.")
+            return
+        if self._offer_restore(ids):
+            return
+        if len(ids) == 1:
+            self.db.submit(toggle_action_status, ids[0], on_done=self._patch_action_row)
+            return
+        # A mixed selection is completed; an all-completed one is reopened.
+        all_complete = all(self.actions_tree.set(str(aid), "estado") == "Completada" for aid in ids)
+        batch = ActionBatch().set_status(ids, not all_complete)
+        self.db.submit(batch.commit, on_done=self._apply_change_set)
+
+    @ui_event
+    def _delete_selected_action(self):
+        ids = self._get_selected_action_ids()
+        if not ids:
+            messagebox.showinfo("Info", "Selecciona una acción para eliminar.")
+            return
+        if self._offer_restore(ids):
+            return
+        if len(ids) == 1:
+            if messagebox.askyesno("Confirmar", "¿Eliminar esta acción?"):
+                aid = ids[0]
+                self.db.submit(delete_action, aid, on_done=lambda row: self.actions_view.remove(aid))
+            return
+        if messagebox.askyesno("Confirmar", f"¿Eliminar las {len(ids)} acciones seleccionadas?"):
+            self.db.submit(ActionBatch().delete(ids).commit, on_done=self._apply_change_set)
+
+    @ui_event
+    def _tag_selected_actions(self):
+        ids = self._get_selected_action_ids()
+        if not ids:
+            messagebox.showinfo("Info", "Selecciona una o más acciones para etiquetar.")
+            return
+        if self._offer_restore(ids):
+            return
+
+        def apply(tag_ids, add):
+            batch = ActionBatch()
+            (batch.add_tags if add else batch.remove_tags)(ids, tag_ids)
+            self.db.submit(batch.commit, on_done=self._apply_change_set)
+        BulkTagDialog(self, len(ids), apply)
@@ -0,0 +1,493 @@
+import asyncio
+import json
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from personal_boss import (
+    ActionBatch,
+    ChangeFeed,
+    TagFilter,
+    connection,
+    create_action,
+    create_project,
+    create_tag,
+    delete_action,
+    delete_project,
+    delete_tag,
+    find_actions_by_filter,
+    find_actions_by_tags,
+    get_action,
+    is_all_of_filter,
+    latest_change_seq,
+    list_actions_with_tags,
+    list_all_tags,
+    list_projects,
+    move_action,
+    prune_changes,
+    rename_tag,
+    tag_catalog,
+    transaction,
+    update_project,
+)
+
+# Local HTTP/JSON front end over the DB helpers, for scripts and tools on the
+# same machine. Every DB call runs on one thread that keeps a single pooled
+# connection checked out. Writes go through a queue; whatever is queued when
+# the writer wakes up commits as one transaction, with a savepoint per
+# request so a failing request only undoes its own changes. List endpoints
+# carry an ETag derived from the database version, so a poller that sends
+# If-None-Match gets a 304 without the list being queried.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_OPERATIONS = 1000
+MAX_WRITE_GROUP = 256
+KEEP_ALIVE_SECONDS = 30
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 304: "Not Modified", 400: "Bad Request", 403: "Forbidden",
+    404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class BatchFailed(Exception):
+    # An atomic batch stopped at a failing operation and was rolled back.
+    def __init__(self, results):
+        super().__init__("Lote atómico revertido.")
+        self.results = results
+
+
+def _plain(result):
+    if isinstance(result, sqlite3.Row):
+        return dict(result)
+    if isinstance(result, (list, tuple)):
+        return [_plain(r) for r in result]
+    return result
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' debe ser un entero.")
+
+def _flag(query, name):
+    return query.get(name, ["0"])[-1] not in ("", "0", "false")
+
+def _field(body, name):
+    if not isinstance(body, dict) or name not in body:
+        raise ApiError(400, f"Falta el campo '{name}'.")
+    return body[name]
+
+def _tag_ids(values):
+    # Tags by id or by name, as in the CLI.
+    ids = []
+    for value in values or ():
+        tag = tag_catalog.get(value) if isinstance(value, int) else tag_catalog.by_name(str(value))
+        if tag is None and str(value).isdigit():
+            tag = tag_catalog.get(int(value))
+        if tag is None:
+            raise ApiError(400, f"No existe la etiqueta '{value}'.")
+        ids.append(tag["id"])
+    return ids
+
+def _exists(table, row_id):
+    with connection() as conn:
+        if conn.execute(f"SELECT 1 FROM {table} WHERE id=?", (row_id,)).fetchone() is None:
+            raise ApiError(404, f"No existe el id {row_id} en {table}.")
+
+def _host_name(value):
+    # "localhost:8765" -> "localhost", "[::1]:8765" -> "::1".
+    if value.startswith("["):
+        return value[1:].split("]", 1)[0]
+    return value.rsplit(":", 1)[0] if value.count(":") == 1 else value
+
+def _matching(query, limit=None):
+    tag_filter = TagFilter(all_of=_tag_ids(query.get("tag")), any_of=_tag_ids(query.get("any")),
+                           none_of=_tag_ids(query.get("exclude")))
+    if is_all_of_filter(tag_filter):
+        return find_actions_by_tags(tag_filter.all_of, limit=limit)
+    return find_actions_by_filter(tag_filter, limit=limit)
+
+
+# ---------------------------- Handlers ---------------------------- #
+# handler(ids, query, body) runs on the DB thread; ids are the integers
+# captured from the path.
+
+def get_projects(ids, query, body):
+    return list_projects()
+
+def post_project(ids, query, body):
+    name = str(_field(body, "name")).strip()
+    return {"id": create_project(name), "name": name}
+
+def patch_project(ids, query, body):
+    _exists("projects", ids[0])
+    name = str(_field(body, "name")).strip()
+    update_project(ids[0], name)
+    return {"id": ids[0], "name": name}
+
+def delete_project_handler(ids, query, body):
+    _exists("projects", ids[0])
+    delete_project(ids[0])
+    return {"id": ids[0]}
+
+def get_project_actions(ids, query, body):
+    rows = list_actions_with_tags(ids[0], include_archived=_flag(query, "archived"))
+    if _flag(query, "pending"):
+        rows = [r for r in rows if not r["is_complete"]]
+    return rows
+
+def get_action_handler(ids, query, body):
+    row = get_action(ids[0], include_archived=_flag(query, "archived"))
+    if row is None:
+        raise ApiError(404, f"No existe la acción {ids[0]}.")
+    return row
+
+def post_action(ids, query, body):
+    project_id = _int(_field(body, "project_id"), "project_id")
+    _exists("projects", project_id)
+    return create_action(project_id, str(_field(body, "description")), _tag_ids(body.get("tags")))
+
+def patch_action(ids, query, body):
+    # Any of description, tags, is_complete, before_id / after_id.
+    action_id = ids[0]
+    if not isinstance(body, dict):
+        raise ApiError(400, "Se esperaba un objeto JSON.")
+    _exists("actions", action_id)
+    batch = ActionBatch()
+    if "description" in body:
+        batch.set_description(action_id, str(body["description"]))
+    if "tags" in body:
+        batch.set_tags(action_id, _tag_ids(body["tags"]))
+    if "is_complete" in body:
+        batch.set_status([action_id], bool(body["is_complete"]))
+    changes = batch.commit() if len(batch) else None
+    row = changes.updated[0] if changes and changes.updated else None
+    if "before_id" in body or "after_id" in body:
+        before_id = body.get("before_id")
+        after_id = body.get("after_id")
+        row = move_action(action_id,
+                          before_id=_int(before_id, "before_id") if before_id is not None else None,
+                          after_id=_int(after_id, "after_id") if after_id is not None else None)
+    return row if row is not None else get_action(action_id)
+
+def delete_action_handler(ids, query, body):
+    row = delete_action(ids[0])
+    if row is None:
+        raise ApiError(404, f"No existe la acción {ids[0]}.")
+    return row
+
+def get_tags(ids, query, body):
+    return list_all_tags()
+
+def post_tag(ids, query, body):
+    name = str(_field(body, "name")).strip()
+    return {"id": create_tag(name), "name": name}
+
+def patch_tag(ids, query, body):
+    if tag_catalog.get(ids[0]) is None:
+        raise ApiError(404, f"No existe la etiqueta {ids[0]}.")
+    name = str(_field(body, "name")).strip()
+    rename_tag(ids[0], name)
+    return {"id": ids[0], "name": name}
+
+def delete_tag_handler(ids, query, body):
+    if tag_catalog.get(ids[0]) is None:
+        raise ApiError(404, f"No existe la etiqueta {ids[0]}.")
+    delete_tag(ids[0])
+    return {"id": ids[0]}
+
+def get_next(ids, query, body):
+    rows = _matching(query, limit=1)
+    return rows[0] if rows else None
+
+def get_matching(ids, query, body):
+    limit = query.get("limit")
+    return _matching(query, limit=_int(limit[-1], "limit") if limit else None)
+
+# (method, path pattern, handler, kind). Reads run directly on the DB
+# thread, writes through the write queue; "list" reads also get an ETag.
+ROUTES = [
+    ("GET", r"/projects", get_projects, "list"),
+    ("POST", r"/projects", post_project, "write"),
+    ("PATCH", r"/projects/(\d+)", patch_project, "write"),
+    ("DELETE", r"/projects/(\d+)", delete_project_handler, "write"),
+    ("GET", r"/projects/(\d+)/actions", get_project_actions, "list"),
+    ("GET", r"/actions/(\d+)", get_action_handler, "read"),
+    ("POST", r"/actions", post_action, "write"),
+    ("PATCH", r"/actions/(\d+)", patch_action, "write"),
+    ("DELETE", r"/actions/(\d+)", delete_action_handler, "write"),
+    ("GET", r"/tags", get_tags, "list"),
+    ("POST", r"/tags", post_tag, "write"),
+    ("PATCH", r"/tags/(\d+)", patch_tag, "write"),
+    ("DELETE", r"/tags/(\d+)", delete_tag_handler, "write"),
+    ("GET", r"/next", get_next, "read"),
+    ("GET", r"/matching", get_matching, "list"),
+]
+ROUTES = [(method, re.compile(pattern + r"/?"), handler, kind) for method, pattern, handler, kind in ROUTES]
+
+def resolve(method, path):
+    allowed = False
+    for route_method, pattern, handler, kind in ROUTES:
+        m = pattern.fullmatch(path)
+        if m is None:
+            continue
+        if route_method == method:
+            return handler, kind, [int(g) for g in m.groups()]
+        allowed = True
+    if allowed:
+        raise ApiError(405, f"Método {method} no permitido en {path}.")
+    raise ApiError(404, f"Ruta desconocida: {path}")
+
+def error_status(exc):
+    if isinstance(exc, ApiError):
+        return exc.status
+    if isinstance(exc, sqlite3.IntegrityError):
+        return 409
+    if isinstance(exc, ValueError):
+        return 400
+    return 500
+
+
+# ---------------------------- Server ---------------------------- #
+
+class ApiServer:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"El servidor solo escucha en localhost, no en {host!r}.")
+        self.host = host
+        self.port = port
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="personal-boss-api",
+                                            initializer=self._open_connection)
+        self._queue = None
+        self._held = None
+        self.change_feed = ChangeFeed()
+        self._data_version = None
+
+    # -------- DB thread -------- #
+    def _open_connection(self):
+        # Keep one connection checked out for the thread's lifetime; every
+        # helper run on this thread reuses it.
+        self._held = connection()
+        conn = self._held.__enter__()
+        self.change_feed.start()
+        self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync(self):
+        # The in-memory indexes and the tag catalogue only hear about this
+        # process's own writes, so commits made by the window or the CLI are
+        # read from the change feed before every request. data_version only
+        # moves when another connection commits, so an idle database costs
+        # a single PRAGMA.
+        with connection() as conn:
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return data_version
+        self._data_version = data_version
+        update = self.change_feed.poll()
+        while update is not None:
+            self.change_feed.apply(update)
+            update = self.change_feed.poll()
+        return data_version
+
+    def _close_connection(self):
+        if self._held is not None:
+            self._held.__exit__(None, None, None)
+            self._held = None
+
+    def _etag(self):
+        # Every write, from any process, appends to the change feed and its
+        # seq never goes back, so the latest seq names the data across
+        # connections and server restarts.
+        with connection() as conn:
+            return f'W/"{latest_change_seq(conn)}"'
+
+    def _read(self, handler, ids, query, body, etag_match=None):
+        self._sync()
+        etag = None
+        if etag_match is not None:
+            etag = self._etag()
+            if etag in etag_match or "*" in etag_match:
+                return etag, None, True
+        return etag, _plain(handler(ids, query, body)), False
+
+    def _commit_group(self, jobs):
+        self._sync()
+        outcomes = []
+        with transaction(immediate=True):
+            for fn, args, _ in jobs:
+                try:
+                    with transaction():
+                        outcomes.append((True, fn(*args)))
+                except Exception as e:
+                    outcomes.append((False, e))
+        # Every write appends to the change feed; nothing else trims it
+        # while the window is closed.
+        prune_changes()
+        return outcomes
+
+    def _write_call(self, handler, ids, query, body):
+        return _plain(handler(ids, query, body))
+
+    def _run_batch(self, operations, atomic):
+        # Operations run in order, each in its own savepoint; an atomic
+        # batch is rolled back as a whole at the first failure.
+        results = []
+        for op in operations:
+            try:
+                if not isinstance(op, dict):
+                    raise ApiError(400, "Cada operación debe ser un objeto.")
+                method = str(op.get("method", "GET")).upper()
+                url = urlsplit(str(_field(op, "path")))
+                handler, kind, ids = resolve(method, url.path)
+                with transaction():
+                    result = _plain(handler(ids, parse_qs(url.query), op.get("body")))
+                results.append({"status": 201 if method == "POST" else 200, "body": result})
+            except Exception as e:
+                results.append({"status": error_status(e), "body": {"error": str(e)}})
+                if atomic:
+                    raise BatchFailed(results)
+        return {"results": results}
+
+    # -------- Event loop -------- #
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _write(self, fn, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, args, future))
+        return await future
+
+    async def _writer(self):
+        while True:
+            jobs = [await self._queue.get()]
+            while len(jobs) < MAX_WRITE_GROUP and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+            try:
+                outcomes = await self._call(self._commit_group, jobs)
+            except Exception as e:
+                outcomes = [(False, e)] * len(jobs)
+            for (_, _, future), (ok, value) in zip(jobs, outcomes):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    async def dispatch(self, method, target, headers, body):
+        # Returns (status, payload, extra headers).
+        url = urlsplit(target)
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return 400, {"error": "El cuerpo no es JSON válido."}, {}
+        try:
+            if url.path.rstrip("/") == "/batch":
+                if method != "POST":
+                    raise ApiError(405, "El lote se envía con POST.")
+                operations = _field(payload, "operations")
+                if not isinstance(operations, list) or len(operations) > MAX_BATCH_OPERATIONS:
+                    raise ApiError(400, f"'operations' debe ser una lista de hasta {MAX_BATCH_OPERATIONS}.")
+                try:
+                    return 200, await self._write(self._run_batch, operations, bool(payload.get("atomic"))), {}
+                except BatchFailed as e:
+                    return 409, {"results": e.results}, {}
+            handler, kind, ids = resolve(method, url.path)
+            query = parse_qs(url.query, keep_blank_values=True)
+            if kind == "write":
+                result = await self._write(self._write_call, handler, ids, query, payload)
+                return (201 if method == "POST" else 200), result, {}
+            etag_match = None
+            if kind == "list":
+                etag_match = [t.strip() for t in headers.get("if-none-match", "").split(",") if t.strip()]
+            etag, result, not_modified = await self._call(self._read, handler, ids, query, payload, etag_match)
+            extra = {"ETag": etag} if etag else {}
+            return (304 if not_modified else 200), result, extra
+        except Exception as e:
+            return error_status(e), {"error": str(e)}, {}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(_response(400, {"error": "Petición mal formada."}, {}, False))
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(413, {"error": "Cuerpo demasiado grande."}, {}, False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                # Reject other Host names so a web page cannot reach the API
+                # through DNS rebinding.
+                if _host_name(headers.get("host", "")) not in LOOPBACK_HOSTS:
+                    status, payload, extra = 403, {"error": "Solo se aceptan peticiones a localhost."}, {}
+                else:
+                    status, payload, extra = await self.dispatch(method.upper(), target, headers, body)
+                writer.write(_response(status, payload, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, on_ready=None):
+        self._queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self._writer())
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        try:
+            if on_ready:
+                on_ready(self)
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+            self._executor.submit(self._close_connection)
+            self._executor.shutdown(wait=True)
+
+
+def _response(status, payload, headers, keep_alive):
+    body = b"" if status == 304 else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    if status != 304:
+        lines.append("Content-Type: application/json; charset=utf-8")
+    lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    lines.extend(f"{k}: {v}" for k, v in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, on_ready=None):
+    server = ApiServer(host, port)
+    try:
+        asyncio.run(server.run(on_ready))
+    except KeyboardInterrupt:
+        pass
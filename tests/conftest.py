@@ -0,0 +1,27 @@
+import sqlite3
+
+import pytest
+
+import personal_boss as pb
+
+
+@pytest.fixture
+def db(tmp_path):
+    # A fresh database per test; the module-level caches and indexes are
+    # reset by configure_db().
+    original = pb.DB_PATH
+    path = str(tmp_path / "personal_boss.db")
+    pb.configure_db(path)
+    pb.init_db()
+    yield path
+    pb.configure_db(original)
+
+
+@pytest.fixture
+def other_process(db):
+    # A plain connection standing in for another process (the CLI, the
+    # window): its commits reach this process only through the database.
+    conn = sqlite3.connect(db, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON")
+    yield conn
+    conn.close()
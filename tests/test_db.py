@@ -0,0 +1,608 @@
+import datetime
+import os
+import sqlite3
+
+import pytest
+
+import personal_boss as pb
+
+
+def tag_id(name):
+    return pb.tag_catalog.by_name(name)["id"]
+
+
+def tag_names(action_id):
+    return [t["name"] for t in pb.get_action_tags(action_id)]
+
+
+def table_ids(conn, table):
+    return [r[0] for r in conn.execute(f"SELECT id FROM {table} ORDER BY id")]
+
+
+def complete_long_ago(action_id, days=pb.ARCHIVE_AFTER_DAYS + 1):
+    # Archiving goes by completed_at, so a test backdates it instead of waiting.
+    pb.set_action_status(action_id, True)
+    when = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    with pb.transaction() as conn:
+        conn.execute("UPDATE actions SET completed_at=? WHERE id=?", (when, action_id))
+
+
+# ---------------------------- Query plans ---------------------------- #
+
+@pytest.mark.parametrize("name, query, required, forbidden", pb.HOT_QUERY_PLANS,
+                         ids=[p[0] for p in pb.HOT_QUERY_PLANS])
+def test_hot_query_plans_use_their_indexes(db, name, query, required, forbidden):
+    project_id = pb.create_project("Casa")
+    tag_ids = [t["id"] for t in pb.list_all_tags()]
+    batch = pb.ActionBatch()
+    for i in range(200):
+        batch.create(project_id, f"Acción {i}", tag_ids[i % len(tag_ids):][:2])
+    batch.commit()
+    sql, params = query
+    plan, problems = pb.query_plan_problems(sql, params, required, forbidden)
+    assert not problems, "\n".join(plan)
+
+
+# ---------------------------- Migrations ---------------------------- #
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    # A database left at schema v1 (the original tables, no indexes, FTS,
+    # positions, change feed or archive) with some data in it.
+    original = pb.DB_PATH
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path, isolation_level=None)
+    pb._migration_base_schema(conn)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute("INSERT INTO projects(name, created_at) VALUES ('Casa', '2024-01-01')")
+    conn.executemany("INSERT INTO actions(project_id, description, is_complete, created_at) VALUES (1, ?, ?, ?)",
+                     [("Regar las plantas", 0, "2024-01-02"), ("Pintar la cerca", 1, "2024-01-01")])
+    conn.execute("INSERT INTO tags(name) VALUES ('casa')")
+    conn.execute("INSERT INTO action_tags(action_id, tag_id) VALUES (1, 1)")
+    conn.close()
+    pb.configure_db(path)
+    yield path
+    pb.configure_db(original)
+
+
+def test_migrations_upgrade_an_old_database(legacy_db):
+    assert pb.init_db() is True
+    with pb.connection() as conn:
+        assert pb.get_schema_version(conn) == pb.SCHEMA_VERSION
+        rows = {r["description"]: r for r in conn.execute("SELECT * FROM actions")}
+    # Positions follow the old creation order; completed actions are dated
+    # at the upgrade, so none of them is archived right away.
+    assert rows["Pintar la cerca"]["position"] < rows["Regar las plantas"]["position"]
+    assert rows["Pintar la cerca"]["completed_at"] is not None
+    assert rows["Regar las plantas"]["completed_at"] is None
+    assert [r["id"] for r in pb.search_actions("plantas")] == [1]
+    assert pb.archive_completed_actions(pause=0).actions == 0
+    assert pb.tag_catalog.by_name("casa")["id"] == 1
+    assert pb.init_db() is False
+
+
+def test_each_migration_runs_once(db):
+    with pb.connection() as conn:
+        assert pb.get_schema_version(conn) == pb.SCHEMA_VERSION
+        assert pb.migrate(conn) == pb.SCHEMA_VERSION
+
+
+def test_newer_schema_is_refused(db):
+    with pb.connection() as conn:
+        conn.execute(f"PRAGMA user_version = {pb.SCHEMA_VERSION + 1}")
+        with pytest.raises(RuntimeError):
+            pb.migrate(conn)
+
+
+# ---------------------------- Import ---------------------------- #
+
+def test_import_runs_no_ddl_and_leaves_the_triggers_working(db):
+    with pb.connection() as conn:
+        cookie = conn.execute("PRAGMA schema_version").fetchone()[0]
+        seq = pb.latest_change_seq(conn)
+    stats = pb.import_records([{"project": "Casa", "description": "Regar las plantas", "tags": "casa"},
+                               {"project": "Casa", "description": "Pintar la cerca"}], batch_size=1)
+    assert stats.actions == 2
+    with pb.connection() as conn:
+        assert conn.execute("PRAGMA schema_version").fetchone()[0] == cookie
+        kinds = [r[0] for r in conn.execute("SELECT kind FROM changes WHERE seq > ?", (seq,))]
+        assert kinds.count("action") == 0 and kinds.count("reload") == 2
+        assert conn.execute("SELECT COUNT(*) FROM bulk_load").fetchone()[0] == 0
+    assert [r["description"] for r in pb.search_actions("plantas")] == ["Regar las plantas"]
+
+    project_id = pb.list_projects()[0]["id"]
+    action_id = pb.create_action(project_id, "Barrer el patio", [tag_id("casa")])["id"]
+    assert [r["id"] for r in pb.search_actions("patio")] == [action_id]
+    with pb.connection() as conn:
+        rows = conn.execute("SELECT kind, row_id FROM changes ORDER BY seq DESC LIMIT 2").fetchall()
+    assert [tuple(r) for r in rows] == [("action", action_id)] * 2
+
+
+# ---------------------------- Action batches ---------------------------- #
+
+def test_failing_batch_is_rolled_back_as_a_whole(db):
+    project_id = pb.create_project("Casa")
+    first = pb.create_action(project_id, "Regar", [tag_id("casa")])["id"]
+    with pb.connection() as conn:
+        seq = conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0]
+
+    batch = (pb.ActionBatch()
+             .set_status([first], True)
+             .set_description(first, "Regar el jardín")
+             .remove_tags([first], [tag_id("casa")])
+             .create(project_id + 1, "Sin proyecto"))
+    with pytest.raises(sqlite3.IntegrityError):
+        batch.commit()
+
+    action = pb.get_action(first)
+    assert action["is_complete"] == 0
+    assert action["description"] == "Regar"
+    assert tag_names(first) == ["casa"]
+    with pb.connection() as conn:
+        assert table_ids(conn, "actions") == [first]
+        assert conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0] == seq
+
+
+def test_batch_inside_a_transaction_rolls_back_with_it(db):
+    project_id = pb.create_project("Casa")
+    with pytest.raises(RuntimeError):
+        with pb.transaction():
+            pb.ActionBatch().create(project_id, "Regar").create(project_id, "Barrer").commit()
+            raise RuntimeError
+    assert pb.list_actions(project_id) == []
+
+
+@pytest.fixture
+def impatient_writer(db):
+    # Another process that gives up at once instead of waiting for the lock.
+    conn = sqlite3.connect(db, isolation_level=None, timeout=0)
+    yield conn
+    conn.close()
+
+
+def blocked_while(impatient_writer, monkeypatch, name):
+    # Wraps pb.<name> so another process tries to write when it is first
+    # called; the returned list is non-empty if the write lock was taken.
+    blocked, calls = [], []
+    real = getattr(pb, name)
+
+    def wrapper(*args, **kwargs):
+        if not calls:
+            try:
+                impatient_writer.execute("UPDATE projects SET name = name")
+            except sqlite3.OperationalError:
+                blocked.append(name)
+        calls.append(name)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(pb, name, wrapper)
+    return blocked
+
+
+def test_batches_take_the_write_lock_before_their_first_read(db, impatient_writer, monkeypatch):
+    project_id = pb.create_project("Casa")
+    first = pb.create_action(project_id, "Regar", [])["id"]
+    second = pb.create_action(project_id, "Barrer", [])["id"]
+    blocked = blocked_while(impatient_writer, monkeypatch, "_rows_for_ids")
+    pb.ActionBatch().set_status([first], True).delete([second]).commit()
+    assert blocked
+    assert [r["id"] for r in pb.list_actions(project_id)] == [first]
+
+
+def test_delete_action_takes_the_write_lock_before_reading(db, impatient_writer, monkeypatch):
+    project_id = pb.create_project("Casa")
+    action_id = pb.create_action(project_id, "Regar", [])["id"]
+    blocked = blocked_while(impatient_writer, monkeypatch, "_action_row")
+    assert pb.delete_action(action_id)["id"] == action_id
+    assert blocked
+
+
+# ---------------------------- Archive ---------------------------- #
+
+def test_archive_and_restore_round_trip(db):
+    project_id = pb.create_project("Casa")
+    casa, noche = tag_id("casa"), tag_id("noche")
+    old = pb.create_action(project_id, "Pintar la cerca", [casa, noche])["id"]
+    recent = pb.create_action(project_id, "Regar", [casa])["id"]
+    pending = pb.create_action(project_id, "Barrer", [])["id"]
+    complete_long_ago(old)
+    pb.set_action_status(recent, True)
+
+    stats = pb.archive_completed_actions(pause=0)
+    assert (stats.actions, stats.tags, stats.batches) == (1, 2, 1)
+    assert [r["id"] for r in pb.list_actions(project_id)] == [pending, recent]
+    assert pb.get_action(old) is None
+    archived = pb.get_action(old, include_archived=True)
+    assert pb.is_archived(archived)
+    listed = {r["id"]: r for r in pb.list_actions_with_tags(project_id, include_archived=True)}
+    assert set(listed) == {old, recent, pending}
+    assert listed[old]["tag_names"] == "casa, noche"
+
+    restored = pb.restore_archived_actions([old])
+    assert [r["id"] for r in restored] == [old]
+    assert restored[0]["is_complete"] == 1
+    assert tag_names(old) == ["casa", "noche"]
+    with pb.connection() as conn:
+        assert table_ids(conn, "archived_actions") == []
+        assert conn.execute("SELECT COUNT(*) FROM archived_action_tags").fetchone()[0] == 0
+    # completed_at restarts, so the next run leaves it in place.
+    assert pb.archive_completed_actions(pause=0).actions == 0
+
+
+def test_archive_batches_take_the_write_lock_before_selecting(db, impatient_writer, monkeypatch):
+    project_id = pb.create_project("Casa")
+    complete_long_ago(pb.create_action(project_id, "Pintar la cerca", [])["id"])
+    blocked = blocked_while(impatient_writer, monkeypatch, "_archive_batch")
+    assert pb.archive_completed_actions(pause=0).actions == 1
+    assert blocked
+
+
+def test_archived_ids_are_never_reused(db):
+    project_id = pb.create_project("Casa")
+    last = pb.create_action(project_id, "Pintar la cerca", [])["id"]
+    complete_long_ago(last)
+    pb.archive_completed_actions(pause=0)
+
+    created = pb.ActionBatch().create(project_id, "Regar").commit().created
+    assert created[0]["id"] > last
+    stats = pb.import_records([{"project": "Casa", "description": "Barrer"}])
+    assert stats.actions == 1
+    with pb.connection() as conn:
+        assert min(table_ids(conn, "actions")) > last
+    assert pb.restore_archived_actions([last])[0]["id"] == last
+
+
+# ---------------------------- Change feed ---------------------------- #
+
+def fill_changes(conn, n):
+    conn.executemany("INSERT INTO changes(kind, row_id, op) VALUES ('tag', 0, 'update')", [()] * n)
+
+
+def change_count():
+    with pb.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+
+
+def test_cli_writes_trim_the_change_feed(db, other_process, capsys):
+    fill_changes(other_process, 2 * pb.CHANGES_KEEP)
+    assert pb.main(["--db", db, "project", "list"]) == 0
+    assert change_count() > 2 * pb.CHANGES_KEEP
+    assert pb.main(["--db", db, "project", "add", "Casa"]) == 0
+    assert change_count() == pb.CHANGES_KEEP
+
+
+# ---------------------------- Tag bitmaps ---------------------------- #
+
+def tagged_actions(n, tag="casa"):
+    project_id = pb.create_project("Casa")
+    return [pb.create_action(project_id, f"Acción {i}", [tag_id(tag)])["id"] for i in range(n)]
+
+
+def matching(tag="casa"):
+    return [r["id"] for r in pb.find_actions_by_filter(pb.TagFilter(any_of=[tag_id(tag)]))]
+
+
+def test_snapshot_is_dropped_after_writes_from_another_process(db, other_process):
+    first, second, third = tagged_actions(3)
+    pb.set_action_status(third, True)
+    pb.tag_bitmaps.warm()
+    assert pb.tag_bitmaps.save_snapshot()
+
+    # Same pending count and id total as before, but different actions.
+    other_process.execute("UPDATE actions SET is_complete = id IN (?, ?)", (first, second))
+    pb.tag_bitmaps.invalidate()
+    assert not pb.tag_bitmaps.load_snapshot()
+    assert matching() == [third]
+
+
+def test_snapshot_catches_up_before_it_is_saved(db, other_process):
+    first, second = tagged_actions(2)
+    pb.tag_bitmaps.warm()
+    other_process.execute("UPDATE actions SET is_complete = 1 WHERE id = ?", (first,))
+    assert pb.tag_bitmaps.save_snapshot()
+
+    pb.tag_bitmaps.invalidate()
+    assert pb.tag_bitmaps.load_snapshot()
+    assert matching() == [second]
+
+
+def test_stale_bitmaps_never_return_completed_actions(db, other_process):
+    first, second = tagged_actions(2)
+    pb.tag_bitmaps.warm()
+    other_process.execute("UPDATE actions SET is_complete = 1 WHERE id = ?", (first,))
+    assert matching() == [second]
+    assert pb.find_next_action_by_filter(pb.TagFilter(any_of=[tag_id("casa")]))["id"] == second
+
+
+# ---------------------------- Tag catalogue ---------------------------- #
+
+@pytest.fixture
+def tag_events(db):
+    events = []
+    pb.tag_catalog.subscribe(events.append)
+    yield events
+    pb.tag_catalog.unsubscribe(events.append)
+
+
+def test_tag_writes_patch_the_catalogue_and_publish_events(tag_events):
+    pb.tag_catalog.all()
+    new = pb.create_tag("jardín")
+    pb.rename_tag(new, "huerto")
+    pb.delete_tag(new)
+    assert [(e.kind, e.tag["name"], e.old_name) for e in tag_events] == [
+        ("created", "jardín", None), ("renamed", "huerto", "jardín"), ("deleted", "huerto", None)]
+    assert [e.version for e in tag_events] == sorted(e.version for e in tag_events)
+    assert pb.tag_catalog.get(new) is None
+    assert pb.tag_catalog.by_name("huerto") is None
+    assert [t["name"] for t in pb.tag_catalog.all()] == sorted(
+        (t["name"] for t in pb.list_all_tags()), key=str.lower)
+
+
+def test_a_rolled_back_tag_write_publishes_nothing(tag_events):
+    with pytest.raises(RuntimeError):
+        with pb.transaction():
+            pb.create_tag("jardín")
+            raise RuntimeError
+    assert tag_events == []
+    assert pb.tag_catalog.by_name("jardín") is None
+
+
+def test_feed_brings_tag_changes_from_another_process(tag_events, other_process):
+    feed = pb.ChangeFeed()
+    feed.start()
+    pb.tag_catalog.all()
+    casa = tag_id("casa")
+    with other_process:
+        other_process.execute("UPDATE tags SET name = 'hogar' WHERE id = ?", (casa,))
+        other_process.execute("INSERT INTO tags(name) VALUES ('jardín')")
+    feed.apply(feed.poll())
+    assert sorted((e.kind, e.tag["name"]) for e in tag_events) == [("created", "jardín"), ("renamed", "hogar")]
+    assert pb.tag_catalog.get(casa)["name"] == "hogar"
+
+    # Applying the same rows again changes nothing and publishes nothing.
+    tag_events.clear()
+    pb.tag_catalog.sync(casa, "hogar")
+    assert tag_events == []
+
+
+def test_invalidate_publishes_reloaded(tag_events):
+    pb.tag_catalog.invalidate()
+    assert [e.kind for e in tag_events] == ["reloaded"]
+    assert pb.tag_catalog.by_name("casa") is not None
+
+
+# ---------------------------- Next-action index ---------------------------- #
+
+def walk_next_actions(tag_ids):
+    # Every action "Siguiente acción" steps through, starting from the first.
+    ids, row = [], pb.find_next_action_by_tags(tag_ids)
+    while row is not None:
+        ids.append(row["id"])
+        row = pb.find_next_action_by_tags(tag_ids, after=row)
+    return ids
+
+
+def assert_index_matches_sql(*combos):
+    for tag_ids in combos:
+        assert walk_next_actions(tag_ids) == [r["id"] for r in pb.find_actions_by_tags(tag_ids)]
+
+
+def test_next_action_index_follows_every_kind_of_write(db):
+    project_id = pb.create_project("Casa")
+    casa, noche = tag_id("casa"), tag_id("noche")
+    combos = ([], [casa], [casa, noche], [noche])
+    a = pb.create_action(project_id, "Regar", [casa])["id"]
+    b = pb.create_action(project_id, "Cerrar", [casa, noche])["id"]
+    c = pb.create_action(project_id, "Dormir", [noche])["id"]
+    assert_index_matches_sql(*combos)
+
+    pb.toggle_action_status(a)
+    assert_index_matches_sql(*combos)
+    pb.update_action(c, "Dormir", [casa, noche])
+    assert_index_matches_sql(*combos)
+    pb.ActionBatch().set_status([a], False).remove_tags([b], [noche]).create(project_id, "Leer", [noche]).commit()
+    assert_index_matches_sql(*combos)
+    pb.delete_action(b)
+    assert_index_matches_sql(*combos)
+    pb.delete_tag(noche)
+    assert_index_matches_sql([], [casa])
+    assert walk_next_actions([casa]) == [a, c]
+
+
+def test_next_action_index_catches_up_through_the_feed(db, other_process):
+    project_id = pb.create_project("Casa")
+    casa = tag_id("casa")
+    first = pb.create_action(project_id, "Regar", [casa])["id"]
+    second = pb.create_action(project_id, "Cerrar", [casa])["id"]
+    feed = pb.ChangeFeed()
+    feed.start()
+    assert walk_next_actions([casa]) == [first, second]
+    with other_process:
+        other_process.execute("UPDATE actions SET is_complete = 1 WHERE id = ?", (first,))
+    feed.apply(feed.poll())
+    assert walk_next_actions([casa]) == [second]
+
+
+# ---------------------------- Paging ---------------------------- #
+
+def all_pages(fetch_page, key_of, limit):
+    # Concatenate keyset pages until one comes back short.
+    rows, after = [], None
+    while True:
+        page = fetch_page(after, limit)
+        rows += page
+        if len(page) < limit:
+            return [r["id"] for r in rows]
+        after = key_of(page[-1])
+
+
+def test_keyset_pages_add_up_to_the_full_list(db):
+    project_id = pb.create_project("Casa")
+    casa = tag_id("casa")
+    batch = pb.ActionBatch()
+    for i in range(25):
+        batch.create(project_id, f"Acción {i}", [casa] if i % 3 else [])
+    ids = [r["id"] for r in batch.commit().created]
+    pb.ActionBatch().set_status(ids[::4], True).commit()
+    pb.move_action(ids[-1], before_id=ids[1])
+    complete_long_ago(ids[5])
+    pb.archive_completed_actions(pause=0)
+
+    for include_archived in (False, True):
+        expected = [r["id"] for r in pb.list_actions_with_tags(project_id, include_archived=include_archived)]
+        paged = all_pages(lambda after, limit: pb.list_actions_page(project_id, after, limit, include_archived),
+                          pb.action_list_key, 4)
+        assert paged == expected
+    assert all_pages(lambda after, limit: pb.find_actions_by_tags([casa], after=after, limit=limit),
+                     pb.action_creation_key, 4) == [r["id"] for r in pb.find_actions_by_tags([casa])]
+    assert all_pages(lambda after, limit: pb.find_actions_by_filter(pb.TagFilter(none_of=[casa]), after, limit),
+                     pb.action_creation_key, 4) == [r["id"] for r in pb.find_actions_by_tags([])
+                                                    if "casa" not in (r["tag_names"] or "")]
+
+
+# ---------------------------- Export ---------------------------- #
+
+def action_summary():
+    return sorted((r["project"], r["description"], tuple(r["tags"]), r["is_complete"])
+                  for r in pb.export_records() if "description" in r)
+
+
+@pytest.mark.parametrize("name", ["export.ndjson", "export.csv.gz"])
+def test_export_round_trips_through_import(db, tmp_path, name):
+    casa = pb.create_project("Casa")
+    pb.create_project("Vacío")
+    first = pb.create_action(casa, "Regar", [tag_id("casa"), tag_id("noche")])["id"]
+    pb.create_action(casa, "Pintar; con coma, y \"comillas\"", [])
+    old = pb.create_action(casa, "Barrer", [tag_id("casa")])["id"]
+    pb.set_action_status(first, True)
+    complete_long_ago(old)
+    pb.archive_completed_actions(pause=0)
+    expected = action_summary()
+    path = str(tmp_path / name)
+    assert pb.export_file(path).records == 5
+
+    pb.configure_db(str(tmp_path / "copy.db"))
+    pb.init_db()
+    pb.import_file(path)
+    assert action_summary() == expected
+    assert sorted(p["name"] for p in pb.list_projects()) == ["Casa", "Vacío"]
+
+
+def test_export_reads_one_snapshot_on_its_own_connection(db):
+    project_id = pb.create_project("Casa")
+    first = pb.create_action(project_id, "Regar", [])["id"]
+    records = pb.export_records()
+    assert next(records) == {"project": "Casa"}
+    # The pool is free to write while the export is half read, and the
+    # export keeps the snapshot it started with.
+    later = pb.create_action(project_id, "Barrer", [])["id"]
+    with pb.connection() as conn:
+        assert not conn.in_transaction
+    assert [r["id"] for r in records] == [first]
+    assert pb.get_action(later) is not None
+
+
+# ---------------------------- Backups ---------------------------- #
+
+def test_backups_are_complete_copies_and_rotate(db, tmp_path):
+    project_id = pb.create_project("Casa")
+    pb.create_action(project_id, "Regar", [tag_id("casa")])
+    dest = str(tmp_path / "backups")
+    assert pb.backup_due(dest)
+    paths = [pb.backup_db(dest, keep=2, pages=1, pause=0).path for _ in range(3)]
+    assert not pb.backup_due(dest)
+    assert pb.list_backups(dest) == paths[1:]
+    with open(os.path.join(dest, pb.BACKUP_LOG_NAME), encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+    copy = sqlite3.connect(paths[-1])
+    try:
+        assert copy.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert copy.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert copy.execute("SELECT description FROM actions").fetchall() == [("Regar",)]
+    finally:
+        copy.close()
+
+
+# ---------------------------- Action edits ---------------------------- #
+
+def changes_since(seq):
+    with pb.connection() as conn:
+        return [tuple(r) for r in conn.execute(
+            "SELECT kind, row_id, op FROM changes WHERE seq > ? ORDER BY seq", (seq,))]
+
+
+def test_edits_write_only_what_changed(db):
+    project_id = pb.create_project("Casa")
+    casa, noche, trabajo = tag_id("casa"), tag_id("noche"), tag_id("trabajo")
+    action_id = pb.create_action(project_id, "Regar", [casa, noche])["id"]
+    with pb.connection() as conn:
+        seq = pb.latest_change_seq(conn)
+
+    assert pb.update_action(action_id, "Regar", [noche, casa])["id"] == action_id
+    assert changes_since(seq) == []
+
+    changes = pb.ActionBatch().set_description(action_id, "Regar").set_tags(action_id, [noche, trabajo]).commit()
+    assert changes.tags[action_id] == pb.TagDiff(added=(trabajo,), removed=(casa,))
+    assert changes_since(seq) == [("action", action_id, "update")] * 2
+    assert tag_names(action_id) == ["noche", "trabajo"]
+
+    with pb.connection() as conn:
+        seq = pb.latest_change_seq(conn)
+    pb.update_action(action_id, "Regar el jardín", [noche, trabajo])
+    assert changes_since(seq) == [("action", action_id, "update")]
+    assert [r["id"] for r in pb.search_actions("jardín")] == [action_id]
+
+
+# ---------------------------- Positions ---------------------------- #
+
+def listed(project_id):
+    return [r["id"] for r in pb.list_actions(project_id)]
+
+
+def test_moves_reorder_by_writing_one_row(db):
+    project_id = pb.create_project("Casa")
+    a, b, c, d = (pb.create_action(project_id, name, [])["id"] for name in "abcd")
+    with pb.connection() as conn:
+        seq = pb.latest_change_seq(conn)
+    assert pb.move_action(d, before_id=b)["id"] == d
+    assert listed(project_id) == [a, d, b, c]
+    assert changes_since(seq) == [("action", d, "update")]
+    pb.move_action(a, after_id=c)
+    assert listed(project_id) == [d, b, c, a]
+    pb.move_action(d)
+    assert listed(project_id) == [b, c, a, d]
+    pb.move_action(b, before_id=b)
+    assert listed(project_id) == [b, c, a, d]
+    assert pb.move_action(12345, before_id=b) is None
+
+    other = pb.create_action(pb.create_project("Trabajo"), "e", [])["id"]
+    with pytest.raises(ValueError):
+        pb.move_action(other, before_id=b)
+
+
+def test_positions_are_renumbered_once_a_gap_is_used_up(db):
+    project_id = pb.create_project("Casa")
+    a, b, c = (pb.create_action(project_id, name, [])["id"] for name in "abc")
+    for _ in range(40):
+        pb.move_action(c, before_id=b)
+        assert listed(project_id) == [a, c, b]
+        pb.move_action(b, before_id=c)
+        assert listed(project_id) == [a, b, c]
+    positions = [r["position"] for r in pb.list_actions(project_id)]
+    assert len(set(positions)) == 3
+
+
+def test_new_actions_go_after_the_last_one_written_anywhere(db, other_process):
+    project_id = pb.create_project("Casa")
+    first = pb.create_action(project_id, "Regar", [])["id"]
+    feed = pb.ChangeFeed()
+    feed.start()
+    with other_process:
+        other_process.execute(
+            "INSERT INTO actions(project_id, description, position, created_at) VALUES (?, 'Cerrar', ?, '2030-01-01')",
+            (project_id, 10 * pb.POSITION_GAP))
+    feed.apply(feed.poll())
+    created = pb.ActionBatch().create(project_id, "Barrer").create(project_id, "Leer").commit().created
+    last = pb.create_action(project_id, "Dormir", [])["id"]
+    assert listed(project_id)[0] == first
+    assert listed(project_id)[2:] == [r["id"] for r in created] + [last]
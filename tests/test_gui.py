@@ -0,0 +1,271 @@
+import pytest
+
+import personal_boss as pb
+from personal_boss_gui import (
+    Debouncer,
+    LazyTreeview,
+    SearchIndex,
+    apply_tag_event,
+    fill_listbox,
+    patch_tag_names,
+)
+
+
+def event(kind, tag_id, name, old_name=None):
+    return pb.TagEvent(1, kind, {"id": tag_id, "name": name}, old_name)
+
+
+@pytest.mark.parametrize("tag_names, tag_event, expected", [
+    ("casa, noche", event("renamed", 1, "hogar", "casa"), "hogar, noche"),
+    ("casa, noche", event("renamed", 1, "Alba", "noche"), "Alba, casa"),
+    ("casa, noche", event("deleted", 1, "casa"), "noche"),
+    ("casa", event("deleted", 1, "casa"), ""),
+    ("casa, noche", event("renamed", 3, "x", "casita"), None),
+    ("", event("deleted", 1, "casa"), None),
+])
+def test_patch_tag_names(tag_names, tag_event, expected):
+    assert patch_tag_names(tag_names, tag_event) == expected
+
+
+class FakeListbox:
+    # The part of tk.Listbox that apply_tag_event and fill_listbox use;
+    # selection indexes shift with inserts and deletes as in Tk.
+    def __init__(self, items=()):
+        self.items = list(items)
+        self.selected = set()
+        self.deleted = []
+
+    def _index(self, i):
+        return len(self.items) if i == "end" else i
+
+    def insert(self, index, *items):
+        index = self._index(index)
+        self.items[index:index] = items
+        self.selected = {s + len(items) if s >= index else s for s in self.selected}
+
+    def delete(self, first, last=None):
+        first = self._index(first)
+        last = len(self.items) - 1 if last == "end" else (first if last is None else last)
+        self.deleted.append((first, last))
+        del self.items[first:last + 1]
+        n = last - first + 1
+        self.selected = {s - n if s > last else s for s in self.selected if not first <= s <= last}
+
+    def selection_includes(self, index):
+        return index in self.selected
+
+    def selection_set(self, index):
+        self.selected.add(index)
+
+
+def tag_rows(*names):
+    return [{"id": i, "name": n} for i, n in enumerate(names, start=1)]
+
+
+def test_apply_tag_event_keeps_rows_sorted_and_the_selection():
+    rows = tag_rows("casa", "noche", "trabajo")
+    listbox = FakeListbox(t["name"] for t in rows)
+    listbox.selection_set(0)
+    assert apply_tag_event(rows, event("renamed", 1, "zona", "casa"), listbox)
+    assert listbox.items == [t["name"] for t in rows] == ["noche", "trabajo", "zona"]
+    assert listbox.selected == {2}
+
+    assert apply_tag_event(rows, event("created", 4, "Alba"), listbox)
+    assert listbox.items == ["Alba", "noche", "trabajo", "zona"]
+    assert listbox.selected == {3}
+
+    assert apply_tag_event(rows, event("deleted", 2, "noche"), listbox)
+    assert listbox.items == [t["name"] for t in rows] == ["Alba", "trabajo", "zona"]
+    assert listbox.selected == {2}
+    assert not apply_tag_event(rows, pb.TagEvent(5, "reloaded", None, None), listbox)
+
+
+def test_apply_tag_event_leaves_out_rows_the_filter_hides():
+    rows = tag_rows("casa", "noche")
+    listbox = FakeListbox(t["name"] for t in rows)
+    visible = lambda t: "a" in t["name"]
+    apply_tag_event(rows, event("created", 3, "luz"), listbox, visible)
+    apply_tag_event(rows, event("renamed", 2, "mañana", "noche"), listbox, visible)
+    assert listbox.items == [t["name"] for t in rows] == ["casa", "mañana"]
+
+
+class FakeTree:
+    # The part of ttk.Treeview that LazyTreeview uses, flat.
+    def __init__(self):
+        self.order = []
+        self.values = {}
+
+    def configure(self, **options):
+        pass
+
+    def insert(self, parent, index, iid, values):
+        self.order.insert(len(self.order) if index == "end" else index, iid)
+        self.values[iid] = tuple(values)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.order.remove(iid)
+            del self.values[iid]
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def item(self, iid, values):
+        self.values[iid] = tuple(values)
+
+    def move(self, iid, parent, index):
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+
+class InlineDB:
+    # DBExecutor stand-in that runs every job at once on the calling thread.
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, fn, *args, on_done=None, on_error=None, channel=None, owner=None, background=False):
+        self.calls += 1
+        result = fn(*args)
+        if on_done:
+            on_done(result)
+
+
+def lazy_view(rows, page_size=3):
+    # A LazyTreeview over the list `rows` of dicts with an id and a sort
+    # key; later changes to the list show up in the pages fetched after.
+    def fetch_page(after, limit):
+        return [r for r in sorted(rows, key=lambda r: r["key"]) if after is None or r["key"] > after][:limit]
+
+    view = LazyTreeview(FakeTree(), InlineDB(), values_of=lambda r: (r["id"], r["text"]),
+                        key_of=lambda r: r["key"], page_size=page_size)
+    view.reset(fetch_page)
+    return view
+
+
+def action(action_id, key, text=None):
+    return {"id": action_id, "key": key, "text": text or f"acción {action_id}"}
+
+
+def shown(view):
+    return [int(iid) for iid in view.tree.get_children()]
+
+
+def test_lazy_treeview_renders_one_page_at_a_time():
+    view = lazy_view([action(i, i * 10) for i in range(1, 8)])
+    assert shown(view) == [1, 2, 3]
+    assert view.has_more
+    assert view.load_more()
+    assert shown(view) == [1, 2, 3, 4, 5, 6]
+    view.load_more()
+    assert shown(view) == [1, 2, 3, 4, 5, 6, 7]
+    assert not view.has_more
+    calls = view.db.calls
+    assert not view.load_more()
+    assert view.db.calls == calls
+
+
+def test_lazy_treeview_clear_empties_the_tree():
+    view = lazy_view([action(i, i) for i in range(1, 5)])
+    view.clear()
+    assert shown(view) == []
+    assert not view.load_more()
+
+
+def test_lazy_treeview_patches_single_rows():
+    view = lazy_view([action(i, i * 10) for i in range(1, 6)])
+    view.load_more()
+    assert shown(view) == [1, 2, 3, 4, 5]
+
+    view.upsert(action(2, 20, "regar"))
+    assert shown(view) == [1, 2, 3, 4, 5]
+    assert view.tree.values["2"] == (2, "regar")
+    view.upsert(action(1, 45))
+    assert shown(view) == [2, 3, 4, 1, 5]
+    view.upsert(action(9, 5))
+    assert shown(view) == [9, 2, 3, 4, 1, 5]
+    view.remove(3)
+    view.remove(42)
+    assert shown(view) == [9, 2, 4, 1, 5]
+
+
+def test_lazy_treeview_drops_rows_that_move_past_the_loaded_pages():
+    rows = [action(i, i * 10) for i in range(1, 8)]
+    view = lazy_view(rows)
+    assert shown(view) == [1, 2, 3]
+    rows[0] = action(1, 55)
+    rows.append(action(8, 80))
+    view.upsert(rows[0])
+    view.upsert(rows[-1])
+    assert shown(view) == [2, 3]
+    # They come back with the page they now belong to.
+    view.load_more()
+    view.load_more()
+    assert shown(view) == [2, 3, 4, 5, 1, 6, 7, 8]
+
+
+def test_search_index_folds_case_and_accents_and_narrows():
+    rows = tag_rows("Acción", "accesorio", "Casa", "cañón")
+    index = SearchIndex(rows)
+    assert index.filter("ACCION") == [rows[0]]
+    assert index.filter("  ac ") == [rows[0], rows[1]]
+    assert index.filter("acc") == [rows[0], rows[1]]
+    assert index.filter("cano") == [rows[3]]
+    assert index.filter("") == rows
+
+    rows[2]["name"] = "acceso"
+    index.invalidate()
+    assert index.filter("acces") == [rows[1], rows[2]]
+
+
+def test_fill_listbox_deletes_only_what_a_narrower_filter_drops():
+    rows = tag_rows("uno", "dos", "tres", "cuatro", "cinco")
+    listbox = FakeListbox(t["name"] for t in rows)
+    fill_listbox(listbox, rows, [rows[0], rows[3], rows[4]])
+    assert listbox.deleted == [(1, 2)]
+    assert listbox.items == ["uno", "cuatro", "cinco"]
+
+    fill_listbox(listbox, [rows[0], rows[3], rows[4]], rows[1:3])
+    assert listbox.items == ["dos", "tres"]
+
+
+class FakeWidget:
+    # after()/after_cancel() with a clock the test advances by hand.
+    def __init__(self):
+        self.now = 0
+        self.pending = {}
+
+    def after(self, delay_ms, fn):
+        handle = object()
+        self.pending[handle] = (self.now + delay_ms, fn)
+        return handle
+
+    def after_cancel(self, handle):
+        del self.pending[handle]
+
+    def advance(self, ms):
+        self.now += ms
+        for handle, (at, fn) in list(self.pending.items()):
+            if at <= self.now and handle in self.pending:
+                del self.pending[handle]
+                fn()
+
+
+def test_debouncer_collapses_a_burst_into_one_call():
+    widget, calls = FakeWidget(), []
+    debounce = Debouncer(widget, lambda: calls.append(widget.now), delay_ms=150)
+    for _ in range(5):
+        debounce()
+        widget.advance(100)
+    assert calls == []
+    widget.advance(50)
+    assert calls == [550]
+
+    debounce()
+    debounce.flush()
+    assert calls == [550, 550]
+    widget.advance(500)
+    debounce.flush()
+    debounce()
+    debounce.cancel()
+    widget.advance(500)
+    assert calls == [550, 550]
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import pytest
+
+import personal_boss as pb
+from personal_boss_server import ApiServer
+
+
+@pytest.fixture
+def server(db):
+    api = ApiServer()
+    yield api
+    api._executor.submit(api._close_connection).result()
+    api._executor.shutdown(wait=True)
+
+
+def call(api, method, target, body=None, headers=None):
+    async def go():
+        api._queue = asyncio.Queue()
+        writer = asyncio.create_task(api._writer())
+        try:
+            return await api.dispatch(method, target, headers or {},
+                                      json.dumps(body).encode() if body is not None else b"")
+        finally:
+            writer.cancel()
+    return asyncio.run(go())
+
+
+def ids(response):
+    status, payload, _ = response
+    assert status == 200, payload
+    return sorted(r["id"] for r in payload)
+
+
+def test_reads_follow_writes_from_another_process(server, other_process):
+    project_id = pb.create_project("Casa")
+    casa = pb.tag_catalog.by_name("casa")["id"]
+    noche = pb.tag_catalog.by_name("noche")["id"]
+    first = pb.create_action(project_id, "Regar", [casa])["id"]
+    # Warm the bitmap index and the tag catalogue in the server.
+    assert ids(call(server, "GET", "/matching?any=casa&any=noche")) == [first]
+    status, _, headers = call(server, "GET", "/matching?any=casa&any=noche")
+    etag = headers["ETag"]
+
+    with other_process:
+        second = other_process.execute(
+            "INSERT INTO actions(project_id, description, position, created_at) VALUES (?, 'Cerrar', 2048, ?)",
+            (project_id, "2030-01-01T00:00:00")).lastrowid
+        other_process.execute("INSERT INTO action_tags(action_id, tag_id) VALUES (?, ?)", (second, noche))
+        other_process.execute("UPDATE actions SET is_complete = 1 WHERE id = ?", (first,))
+        other_process.execute("INSERT INTO tags(name) VALUES ('jardín')")
+
+    assert ids(call(server, "GET", "/matching?any=casa&any=noche")) == [second]
+    assert ids(call(server, "GET", "/matching?tag=noche")) == [second]
+    status, _, _ = call(server, "GET", "/matching?any=casa&any=noche", headers={"if-none-match": etag})
+    assert status == 200
+    assert ids(call(server, "GET", "/matching?tag=jardín")) == []
+
+
+def test_list_etag_answers_304_until_something_changes(server, other_process):
+    project_id = pb.create_project("Casa")
+    _, _, headers = call(server, "GET", f"/projects/{project_id}/actions")
+    etag = headers["ETag"]
+    assert call(server, "GET", f"/projects/{project_id}/actions", headers={"if-none-match": etag})[0] == 304
+    with other_process:
+        other_process.execute("UPDATE projects SET name = 'Hogar' WHERE id = ?", (project_id,))
+    assert call(server, "GET", f"/projects/{project_id}/actions", headers={"if-none-match": etag})[0] == 200
+
+
+def test_etag_survives_a_server_restart_only_while_nothing_changes(db, other_process):
+    def list_projects(api, headers=None):
+        return call(api, "GET", "/projects", headers=headers)
+
+    def restarted(api):
+        api._executor.submit(api._close_connection).result()
+        api._executor.shutdown(wait=True)
+        # A new process starts with new connections.
+        pb.configure_db(db)
+        return ApiServer()
+
+    api = ApiServer()
+    try:
+        list_projects(api)
+        with other_process:
+            other_process.execute("INSERT INTO projects(name, created_at) VALUES ('Casa', '2030-01-01')")
+        etag = list_projects(api)[2]["ETag"]
+        api = restarted(api)
+        assert list_projects(api, {"if-none-match": etag})[0] == 304
+        with other_process:
+            other_process.execute("INSERT INTO projects(name, created_at) VALUES ('Trabajo', '2030-01-02')")
+        status, payload, headers = list_projects(api, {"if-none-match": etag})
+        assert status == 200 and [p["name"] for p in payload] == ["Casa", "Trabajo"]
+        assert headers["ETag"] != etag
+    finally:
+        api._executor.submit(api._close_connection).result()
+        api._executor.shutdown(wait=True)
+
+
+def test_writes_trim_the_change_feed(server, other_process):
+    other_process.executemany("INSERT INTO changes(kind, row_id, op) VALUES ('tag', 0, 'update')",
+                              [()] * (2 * pb.CHANGES_KEEP))
+    status, _, _ = call(server, "POST", "/projects", {"name": "Casa"})
+    assert status == 201
+    count = other_process.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+    assert count == pb.CHANGES_KEEP
+
+
+def test_atomic_batch_is_rolled_back_as_a_whole(server):
+    pb.create_project("Casa")
+    status, payload, _ = call(server, "POST", "/batch", {"atomic": True, "operations": [
+        {"method": "POST", "path": "/projects", "body": {"name": "Trabajo"}},
+        {"method": "POST", "path": "/projects", "body": {"name": "Casa"}},
+    ]})
+    assert status == 409
+    assert [r["status"] for r in payload["results"]] == [201, 409]
+    assert [p["name"] for p in pb.list_projects()] == ["Casa"]